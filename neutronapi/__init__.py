@@ -8,6 +8,9 @@ _EXPORTS = {
     "API": ("neutronapi.base", "API"),
     "Response": ("neutronapi.base", "Response"),
     "StreamingResponse": ("neutronapi.responses", "StreamingResponse"),
+    "EventSourceResponse": ("neutronapi.sse", "EventSourceResponse"),
+    "FileResponse": ("neutronapi.responses", "FileResponse"),
+    "StaticFiles": ("neutronapi.staticfiles", "StaticFiles"),
     "Endpoint": ("neutronapi.base", "Endpoint"),
     "Application": ("neutronapi.application", "Application"),
     "Background": ("neutronapi.background", "Background"),
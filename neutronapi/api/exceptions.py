@@ -1,6 +1,6 @@
 """API-specific exceptions."""
 
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 class APIException(Exception):
@@ -23,20 +23,33 @@ class APIException(Exception):
 
 
 class ValidationError(APIException):
-    """Raised when validation fails."""
+    """Raised when validation fails.
+
+    ``errors`` optionally lists field-level problems as dicts with ``field``,
+    ``code`` and ``message`` keys; they are returned under ``error.errors``.
+    """
     status_code = 400
 
-    def __init__(self, message: str = "Validation error", error_type: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        message: str = "Validation error",
+        error_type: Optional[str] = None,
+        errors: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
         self.error_type = error_type or "validation_error"
+        self.errors = errors or []
         super().__init__(message)
 
-    def to_dict(self) -> Dict[str, Dict[str, str]]:
-        return {
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        body: Dict[str, Dict[str, Any]] = {
             "error": {
                 "type": self.error_type,
                 "message": self.message,
             }
         }
+        if self.errors:
+            body["error"]["errors"] = self.errors
+        return body
 
 
 class NotFound(APIException):
@@ -1,6 +1,6 @@
 import logging
 import re
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 if TYPE_CHECKING:
     from neutronapi.base import API
@@ -8,13 +8,18 @@ if TYPE_CHECKING:
 
 T = TypeVar('T')
 
-from neutronapi.base import API, Response
+from neutronapi.base import API, JSON_RENDER_SCOPE_KEY, Response, validate_json_render
 from neutronapi.api import exceptions
 from neutronapi.event_bus import events
+from neutronapi.headers import get_headers
+from neutronapi.metrics.multiprocess import default_collector
+from neutronapi.metrics.registry import REGISTRY
 from neutronapi.middleware.cors import CorsMiddleware
 from neutronapi.middleware.routing import RoutingMiddleware
-from neutronapi.middleware.allowed_hosts import AllowedHostsMiddleware, is_host_allowed
+from neutronapi.middleware.allowed_hosts import AllowedHostsMiddleware, HostMatcher
+from neutronapi.middleware.pipeline import fuse_middleware
 from neutronapi.middleware.request_logging import RequestLoggingMiddleware
+from neutronapi.router import PrefixTree
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +77,9 @@ class Application:
         static_hosts: Optional[List[str]] = None,
         static_resolver: Optional[Callable] = None,
         cors_allow_all: bool = False,
+        json_render: Optional[str] = None,
+        server_timing: bool = False,
+        metrics: bool = False,
     ) -> None:
         """
         Create a new ASGI application with dependency injection support.
@@ -87,10 +95,25 @@ class Application:
             version: Application version string
             allowed_hosts: List of allowed host names for security
             static_hosts: Static file hosting configuration
-            static_resolver: Custom static file resolver
+            static_resolver: Resolver for ``static_hosts``, e.g. a ``StaticFiles``
+                             instance. A ``startup()`` method on it runs with the
+                             other startup handlers.
             cors_allow_all: Whether to allow all CORS origins (default: False).
                            Explicit allowlist CORS should be configured by passing
                            a CorsMiddleware instance in middlewares.
+            json_render: Default JSON response rendering: "auto" (compact unless DEBUG
+                         or ``?pretty=1``), "compact" or "pretty". Endpoints may
+                         override it with ``@API.endpoint(json_render=...)``.
+            server_timing: Record per-phase durations (routing, auth, body, parse,
+                           handler, serialize, ...) and send them in a ``Server-Timing``
+                           header and on ``RequestCompleted.phases`` (default: False).
+                           The header exposes internal timings; enable deliberately.
+            metrics: Record request, background task and database query metrics
+                     in ``neutronapi.metrics.REGISTRY`` (default: False). Serve them
+                     by mounting ``MetricsAPI``, which is unauthenticated unless
+                     given ``authentication_class``/``permission_classes``; with
+                     ``METRICS_MULTIPROCESS_DIR`` set, worker snapshots are flushed
+                     there for aggregation.
 
         Example:
             >>> app = Application(
@@ -141,6 +164,7 @@ class Application:
         self._validate_unique_route_names()
 
         self.version = version
+        self.json_render = validate_json_render(json_render)
         self.events = events
 
         # Initialize registry for universal dependency injection
@@ -158,39 +182,23 @@ class Application:
         for api in self.apis.values():
             setattr(api, 'registry', self.registry)
 
-        def select_api(path: str, host: str) -> Optional["API"]:
-            host_surface_apis = [
-                api
-                for api in self._routing_apis
-                if api.hosts and host and is_host_allowed(host, api.hosts)
-            ]
-            base_candidates = (
-                host_surface_apis
-                if host_surface_apis
-                else [api for api in self._routing_apis if not api.hosts]
-            )
-            candidate_apis = [
-                api
-                for api in base_candidates
-                if not self._is_path_excluded(api, path)
-            ]
-
-            for api in candidate_apis:
-                if self._path_equals_resource(path, api.resource):
-                    return api
-
-            for api in candidate_apis:
-                if self._path_matches_resource(path, api.resource):
-                    return api
-
-            return None
+        # Resource prefix tree built once; each entry remembers its registration
+        # order so ties resolve exactly as a linear scan would.
+        self._resource_tree: PrefixTree[Tuple[int, "API"]] = PrefixTree()
+        for order, api in enumerate(self._routing_apis):
+            self._resource_tree.insert(api.resource or "", (order, api))
+        self._host_scoped_apis = [api for api in self._routing_apis if api.hosts]
+        self._host_index = HostMatcher()
+        for api in self._host_scoped_apis:
+            for pattern in api.hosts:
+                self._host_index.add(pattern, api)
 
         # Simple handler that routes to APIs
         async def app(scope, receive, send):
             if scope["type"] == "http":
                 path = scope.get("path", "/")
                 host = self._extract_host(scope)
-                api = select_api(path, host)
+                api = self._select_api(path, host)
                 if api is not None:
                     await api.handle(scope, receive, send)
                     return
@@ -204,7 +212,7 @@ class Application:
                 path = scope.get("path", "/")
                 host = self._extract_host(scope)
                 logger.debug("Routing websocket for path=%s", path)
-                api = select_api(path, host)
+                api = self._select_api(path, host)
                 if api is not None:
                     logger.debug("Matched websocket API=%s", api.name)
                     await api.handle(scope, receive, send)
@@ -225,10 +233,23 @@ class Application:
             static_resolver=static_resolver,
         )
 
-        # Compose middleware stack. AllowedHosts is always enforced when configured.
-        # cors_allow_all wraps the final user/application stack with a single
-        # allow-all CorsMiddleware; explicit allowlist CORS remains middleware-driven.
-        composed = base_router
+        # Compose middleware stack, outermost first. AllowedHosts is always enforced
+        # when configured. cors_allow_all wraps the final user/application stack with
+        # a single allow-all CorsMiddleware; explicit allowlist CORS remains
+        # middleware-driven. Consecutive hook-based middlewares (RequestLogging,
+        # AllowedHosts, CORS, compression, idempotency, ...) are fused into a
+        # single pipeline instead of nesting one send wrapper per layer.
+        layers: List[Any] = [
+            RequestLoggingMiddleware(server_timing=server_timing, metrics=metrics)
+        ]
+
+        # AllowedHosts sits outside user middleware and outside CORS so host
+        # validation cannot be accidentally bypassed
+        if allowed_hosts:
+            layers.append(AllowedHostsMiddleware(allowed_hosts=allowed_hosts))
+
+        if cors_allow_all:
+            layers.append(CorsMiddleware(allow_all_origins=True))
 
         if middlewares:
             if cors_allow_all and any(isinstance(mw, CorsMiddleware) for mw in middlewares):
@@ -236,27 +257,30 @@ class Application:
                     "Ambiguous CORS configuration: cors_allow_all=True cannot be used "
                     "together with a user-supplied CorsMiddleware."
                 )
-            # User-provided middlewares are declared outermost-first; apply in reverse to wrap
-            for mw in reversed(middlewares):
-                mw.app = composed
+            # User-provided middlewares are declared outermost-first
+            for mw in middlewares:
                 mw.registry = self.registry
-                composed = mw
+                layers.append(mw)
 
-        if cors_allow_all:
-            composed = CorsMiddleware(composed, allow_all_origins=True)
-
-        # Always apply AllowedHosts when configured — wraps outside user middleware
-        # and outside CORS so host validation cannot be accidentally bypassed
-        if allowed_hosts:
-            composed = AllowedHostsMiddleware(composed, allowed_hosts=allowed_hosts)
-
-        self.app = RequestLoggingMiddleware(composed)
+        self.app = fuse_middleware(layers, base_router)
 
         # Expose lifecycle hooks on Application instance for compatibility
         # (handlers are already set on the app function above)
         self.on_startup = app.on_startup
         self.on_shutdown = app.on_shutdown
 
+        resolver_startup = getattr(static_resolver, "startup", None)
+        if resolver_startup is not None and not isinstance(static_resolver, type):
+            app.on_startup.append(resolver_startup)
+
+        if metrics:
+            # Task and query instrumentation is process-wide.
+            REGISTRY.enabled = True
+        collector = default_collector() if metrics else None
+        if collector is not None:
+            app.on_startup.append(collector.start)
+            app.on_shutdown.append(collector.stop)
+
         # Handle tasks dict - clean API-like pattern
         if tasks:
             from neutronapi.background import Background
@@ -275,9 +299,40 @@ class Application:
             app.on_startup.append(_start_background)
             app.on_shutdown.append(_stop_background)
 
+    def _select_api(self, path: str, host: str) -> Optional["API"]:
+        """Pick the API serving ``path`` for ``host`` from the resource tree."""
+        host_surface_apis = (
+            self._host_index.match(host)
+            if host and self._host_scoped_apis
+            else None
+        )
+
+        exact: Optional[Tuple[int, "API"]] = None
+        prefix: Optional[Tuple[int, "API"]] = None
+        for _depth, entries in self._resource_tree.walk(path):
+            for entry in entries:
+                api = entry[1]
+                if host_surface_apis:
+                    if api not in host_surface_apis:
+                        continue
+                elif api.hosts:
+                    continue
+                if not self._path_matches_resource(path, api.resource):
+                    continue
+                if self._is_path_excluded(api, path):
+                    continue
+                if self._path_equals_resource(path, api.resource):
+                    if exact is None or entry[0] < exact[0]:
+                        exact = entry
+                elif prefix is None or entry[0] < prefix[0]:
+                    prefix = entry
+
+        chosen = exact or prefix
+        return chosen[1] if chosen is not None else None
+
     @staticmethod
     def _extract_host(scope: Dict[str, Any]) -> str:
-        headers = dict(scope.get("headers", []))
+        headers = get_headers(scope)
         return headers.get(b"host", b"").decode("utf-8", "ignore")
 
     @staticmethod
@@ -488,4 +543,6 @@ class Application:
         return self.apis[api_name].reverse(endpoint_name, **kwargs)
 
     async def __call__(self, scope, receive, send, **kwargs):
+        if self.json_render is not None and scope["type"] == "http":
+            scope.setdefault(JSON_RENDER_SCOPE_KEY, self.json_render)
         return await self.app(scope, receive, send, **kwargs)
@@ -1,11 +1,14 @@
 import asyncio
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Callable, Awaitable, Optional, List
 from dataclasses import dataclass, field
 from enum import Enum
 
+from neutronapi.metrics.registry import REGISTRY, TASK_DURATION, TASK_RUNS
+
 
 __all__ = [
     'Background',
@@ -225,6 +228,7 @@ class Background:
             success=False,
             start_time=datetime.now(timezone.utc),
         )
+        started = time.perf_counter()
 
         try:
             self.logger.info(f"Executing task: {task.name}")
@@ -265,6 +269,9 @@ class Background:
                     )
 
         result.end_time = datetime.now(timezone.utc)
+        if REGISTRY.enabled:
+            TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+            TASK_RUNS.labels(task.name, "success" if result.success else "failure").inc()
         self._results[task.task_id] = result
 
         # Evict oldest results when limit exceeded to prevent unbounded memory growth
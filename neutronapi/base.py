@@ -1,6 +1,8 @@
 # core/api.py
+import copy
 import logging
 import re
+import types
 from dataclasses import dataclass
 from functools import wraps
 from typing import (
@@ -12,6 +14,7 @@ from typing import (
     Optional,
     Dict,
     TypeVar,
+    Sequence,
     Union,
     Type,
     TYPE_CHECKING,
@@ -22,8 +25,29 @@ if TYPE_CHECKING:
 from urllib.parse import parse_qs
 
 from neutronapi.api import exceptions
+from neutronapi.conf import settings
+from neutronapi.crud import crud_routes
 from neutronapi.encoders import json_dumps_bytes, json_dumps_text, json_loads
+from neutronapi.headers import get_headers, merge_headers
+from neutronapi.metrics.registry import ROUTE_SCOPE_KEY
+from neutronapi.middleware.coalescing import coalesce_app
+from neutronapi.middleware.pipeline import PIPELINE_SCOPE_KEY, Middleware, fuse_middleware
+from neutronapi.middleware.response_cache import RESPONSE_CACHE_SCOPE_KEY, CachePolicy
 from neutronapi.db.models import Model
+from neutronapi.db.pagination import InvalidCursor, decode_cursor, paginate as paginate_queryset
+from neutronapi.parsers import BaseParser, JSONParser, LazyBody, close_uploads
+from neutronapi.permissions import bind, instance_for_request, permissions_allow
+from neutronapi.responses import FileResponse, StreamingResponse
+from neutronapi.router import RouteTree
+from neutronapi.serializers import (
+    fields_from_schema,
+    is_model_payload,
+    serialize_models,
+    serializer_for,
+)
+from neutronapi.streams import AsyncByteStream, parse_content_length
+from neutronapi.timing import TIMING_SCOPE_KEY
+from neutronapi.validation import compile_schema
 
 T = TypeVar("T", bound="Model")
 
@@ -40,26 +64,6 @@ Send = Callable[[Dict[str, Any]], None]
 logger = logging.getLogger(__name__)
 
 
-def _merge_headers(
-    existing: List[Tuple[bytes, bytes]],
-    extra: List[Tuple[bytes, bytes]],
-) -> List[Tuple[bytes, bytes]]:
-    if not extra:
-        return list(existing)
-
-    overrides: Dict[bytes, Tuple[bytes, bytes]] = {
-        name.lower(): (name, value)
-        for name, value in extra
-    }
-    merged = [
-        (name, value)
-        for name, value in existing
-        if name.lower() not in overrides
-    ]
-    merged.extend(overrides.values())
-    return merged
-
-
 def _header_tuples_from_mapping(headers: Dict[str, str]) -> List[Tuple[bytes, bytes]]:
     return [
         (name.lower().encode("utf-8"), str(value).encode("utf-8"))
@@ -71,15 +75,19 @@ def _append_scope_headers(scope: Scope, headers: List[Tuple[bytes, bytes]]) -> N
     if not headers:
         return
     current = list(scope.get("_response_headers", []))
-    scope["_response_headers"] = _merge_headers(current, headers)
+    scope["_response_headers"] = merge_headers(current, headers)
 
 
 def _wrap_send_with_scope_headers(scope: Scope, send: Send) -> Send:
+    if PIPELINE_SCOPE_KEY in scope:
+        # The enclosing middleware pipeline merges them when the response starts
+        return send
+
     async def wrapped(message: Dict[str, Any]) -> None:
         if message.get("type") == "http.response.start":
             message = {
                 **message,
-                "headers": _merge_headers(
+                "headers": merge_headers(
                     list(message.get("headers", [])),
                     list(scope.get("_response_headers", [])),
                 ),
@@ -89,10 +97,45 @@ def _wrap_send_with_scope_headers(scope: Scope, send: Send) -> Send:
     return wrapped
 
 
+JSON_RENDER_SCOPE_KEY = "_neutronapi_json_render"
+# (field names, strict) projection applied to Model bodies for the current endpoint
+RESPONSE_FIELDS_SCOPE_KEY = "_neutronapi_response_fields"
+JSON_RENDER_MODES = ("auto", "compact", "pretty")
+_PRETTY_QUERY_VALUES = frozenset(("1", "true", "yes"))
+
+
+def validate_json_render(mode: Optional[str]) -> Optional[str]:
+    if mode is not None and mode not in JSON_RENDER_MODES:
+        raise ValueError(
+            f"Invalid json_render {mode!r}; expected one of {', '.join(JSON_RENDER_MODES)}"
+        )
+    return mode
+
+
+def _pretty_requested(scope: Scope) -> bool:
+    query = scope.get("query_string") or b""
+    if b"pretty" not in query:
+        return False
+    if isinstance(query, bytes):
+        query = query.decode("latin-1")
+    values = parse_qs(query).get("pretty", [])
+    return any(value.lower() in _PRETTY_QUERY_VALUES for value in values)
+
+
 class Response:
     """HTTP Response handler for API responses.
     
     Handles JSON serialization, status codes, and headers for HTTP responses.
+
+    JSON bodies are rendered compact and unsorted unless pretty output is
+    asked for: explicitly via ``pretty=True``, by a "pretty" json_render mode
+    on the endpoint or application, or in "auto" mode (the default) when
+    ``DEBUG`` is enabled or the request carries ``?pretty=1``. Bytes bodies
+    are sent verbatim, so pre-serialized JSON is never encoded twice.
+
+    A ``Model`` instance or list of instances is serialized directly to JSON
+    bytes by a compiled serializer, limited to ``fields`` or to the endpoint's
+    ``response_fields``/``response_schema`` when declared.
     """
 
     def __init__(
@@ -102,21 +145,29 @@ class Response:
         headers: Optional[List[Tuple[bytes, bytes]]] = None,
         media_type: str = "application/json",
         indent: int = 2,
+        pretty: Optional[bool] = None,
+        fields: Optional[Sequence[str]] = None,
     ) -> None:
         """Initialize HTTP response.
         
         Args:
-            body: Response body data (will be JSON-serialized)
+            body: Response body data (dict/list are JSON-serialized; str and
+                bytes are sent as-is)
             status_code: HTTP status code (default: 200)
             headers: List of header tuples as (name, value) bytes
             media_type: Content-Type header value
-            indent: JSON indentation for pretty printing
+            indent: JSON indentation used when rendering pretty output
+            pretty: Force pretty (True) or compact (False) JSON; None defers
+                to the request's json_render mode
+            fields: Model fields to include when body is a Model or list of Models
         """
         self.body = body
         self.status_code = status_code
         self.headers = headers or []
         self.media_type = media_type
         self.indent = indent
+        self.pretty = pretty
+        self.fields = fields
 
         if not any(name.lower() == b"content-type" for name, _ in self.headers):
             self.headers.append((b"content-type", self.media_type.encode()))
@@ -133,31 +184,62 @@ class Response:
             f"headers={self.headers}, media_type={self.media_type}, indent={self.indent})"
         )
 
+    def wants_pretty(self, scope: Scope) -> bool:
+        """Resolve whether JSON should be pretty-printed for this request."""
+        if self.pretty is not None:
+            return self.pretty
+        mode = scope.get(JSON_RENDER_SCOPE_KEY) or "auto"
+        if mode == "compact":
+            return False
+        if mode == "pretty":
+            return True
+        return _pretty_requested(scope) or bool(settings.get("DEBUG", False))
+
+    def render(self, scope: Scope) -> bytes:
+        """Serialize the body to bytes."""
+        body = self.body
+        if body is None:
+            return b""
+        if self.media_type == "application/json" and is_model_payload(body):
+            if self.fields is not None:
+                encoded = serialize_models(body, self.fields)
+            else:
+                fields, strict = scope.get(RESPONSE_FIELDS_SCOPE_KEY) or (None, True)
+                encoded = serialize_models(body, fields, strict=strict)
+            if self.wants_pretty(scope):
+                return json_dumps_bytes(json_loads(encoded), indent=self.indent, sort_keys=True)
+            return encoded
+        if self.media_type == "application/json" and isinstance(body, (dict, list)):
+            if self.wants_pretty(scope):
+                return json_dumps_bytes(body, indent=self.indent, sort_keys=True)
+            return json_dumps_bytes(body)
+        if isinstance(body, str):
+            return body.encode("utf-8")
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            return bytes(body)
+        return b""
+
     async def __call__(self, scope, receive, send):
         """Send the response."""
+        body_bytes = self.render(scope)
+        timer = scope.get(TIMING_SCOPE_KEY)
+        if timer is not None:
+            timer.mark("serialize")
+        headers = self.headers
+        status = self.status_code
+        if status < 200 or status in (204, 304):
+            # These statuses never carry a body (RFC 9110 section 8.6).
+            body_bytes = b""
+        elif not any(name.lower() == b"content-length" for name, _ in headers):
+            headers = [*headers, (b"content-length", str(len(body_bytes)).encode("ascii"))]
+
         await send(
             {
                 "type": "http.response.start",
-                "status": self.status_code,
-                "headers": self.headers,
+                "status": status,
+                "headers": headers,
             }
         )
-
-        body_bytes = b""
-        if self.body is not None:
-            if self.media_type == "application/json" and isinstance(
-                self.body, (dict, list)
-            ):
-                body_bytes = json_dumps_bytes(
-                    self.body,
-                    indent=self.indent,
-                    sort_keys=True,
-                )
-            elif isinstance(self.body, str):
-                body_bytes = self.body.encode("utf-8")
-            elif isinstance(self.body, bytes):
-                body_bytes = self.body
-
         await send(
             {"type": "http.response.body", "body": body_bytes, "more_body": False}
         )
@@ -189,11 +271,60 @@ class Endpoint:
     request_body_mode: str = "buffered"
     max_request_body_bytes: Optional[int] = None
     response_body_mode: str = "buffered"
+    json_render: Optional[str] = None
+    cache: Optional[CachePolicy] = None
+    coalesce: bool = False
+    validate_request: bool = True
+    response_fields: Optional[List[str]] = None
+
+
+# Scope key carrying per-request handler kwargs through endpoint middlewares,
+# which are composed once per route and therefore cannot close over them.
+HANDLER_KWARGS_SCOPE_KEY = "_neutronapi_handler_kwargs"
+
+_DEFAULT_PARSER = JSONParser()
+_BODY_METHODS = frozenset(("POST", "PUT", "PATCH"))
+
+
+@dataclass(frozen=True)
+class DispatchPlan:
+    """Everything needed to serve one route, resolved at registration time."""
+
+    route: Tuple
+    handler: Callable
+    authentication_class: Optional[Any]
+    permissions: Tuple[Any, ...]
+    throttle_classes: Tuple[Any, ...]
+    parser_table: Dict[bytes, Any]
+    custom_parsers: Tuple[Tuple[int, Any], ...]
+    request_body_mode: str
+    max_body: Optional[int]
+    json_render: Optional[str]
+    cache: Optional[CachePolicy]
+    validator: Optional[Callable[[Any], None]]
+    response_projection: Optional[Tuple[Tuple[str, ...], bool]]
+    app: Callable
+
+    def select_parser(self, headers: Dict[bytes, bytes]) -> Any:
+        """Return the first endpoint parser accepting the request, else JSON."""
+        ctype = (headers.get(b"content-type") or b"").split(b";", 1)[0].strip().lower()
+        position, parser = self.parser_table.get(ctype, (None, None))
+        for index, custom in self.custom_parsers:
+            if position is not None and index > position:
+                break
+            if custom.matches(headers):
+                return custom
+        return parser or _DEFAULT_PARSER
 
 
 class API:
     """Base API class with optional CRUD functionality when model is specified.
 
+    With ``model`` set, APIs opt in to generated list/retrieve (``READ_ACTIONS``),
+    create/update/partial_update/destroy and bulk_create/bulk_update endpoints
+    through ``crud_actions``. The list endpoint streams rows in batches of ``stream_batch_size``, sent in
+    body messages of about ``stream_buffer_size`` bytes.
+
     Request/Response Schema Architecture:
     - request_schema: JSON schema for request body validation (used for POST, PUT, PATCH)
     - response_schema: JSON schema for single item responses (GET /{id}, POST, PUT, PATCH)
@@ -234,6 +365,16 @@ class API:
     MAX_BODY_SIZE: int = 10 * 1024 * 1024  # 10MB
     lookup_field: str = "id"
     allowed_ordering_fields: List[str] = []
+    # "page" (page/page_size) or "cursor" (signed keyset cursors, see paginate())
+    pagination: str = "page"
+    # Endpoints generated for ``model`` (see neutronapi.crud); hand-written
+    # endpoints on the same method and path take precedence. None by default;
+    # list ``crud.READ_ACTIONS``, ``crud.CRUD_ACTIONS`` or a subset to publish them.
+    crud_actions: Tuple[str, ...] = ()
+    # Rows fetched per query while streaming the generated list endpoint
+    stream_batch_size: int = 500
+    # Bytes coalesced into each body message of the streamed list endpoint
+    stream_buffer_size: int = 64 * 1024
 
     # OpenAPI documentation fields
     title: Optional[str] = None
@@ -270,6 +411,7 @@ class API:
     ):
         self.resource = self.resource or resource.rstrip("/")
         self.routes = []
+        self._router = RouteTree()
         self.kwargs = {}
         self.permission_classes = permission_classes or []
         self.throttle_classes = throttle_classes or []
@@ -288,6 +430,8 @@ class API:
             self.page_size = page_size
         if lookup_field is not None:
             self.lookup_field = lookup_field
+        if self.pagination not in ("page", "cursor"):
+            raise ValueError(f"Invalid pagination {self.pagination!r}; expected 'page' or 'cursor'")
 
         # OpenAPI documentation overrides
         if title is not None:
@@ -371,6 +515,15 @@ class API:
                 )
             scope["order_direction"] = direction
 
+        if self.pagination == "cursor" and params.get("cursor"):
+            # A repeated ``cursor`` key arrives as a list.
+            if not isinstance(params["cursor"], str):
+                raise exceptions.ValidationError("Invalid cursor parameter")
+            try:
+                scope["cursor"] = decode_cursor(params["cursor"])
+            except InvalidCursor:
+                raise exceptions.ValidationError("Invalid cursor parameter")
+
         return scope
 
     @staticmethod
@@ -401,6 +554,11 @@ class API:
         request_body_mode: str = "buffered",
         max_request_body_bytes: Optional[int] = None,
         response_body_mode: str = "buffered",
+        json_render: Optional[str] = None,
+        cache: Optional[Union[int, float, CachePolicy]] = None,
+        coalesce: bool = False,
+        validate_request: bool = True,
+        response_fields: Optional[List[str]] = None,
     ) -> Callable:
         """Decorator for defining API endpoints.
 
@@ -409,7 +567,7 @@ class API:
             methods: HTTP methods (default: ["GET"])
             middlewares: List of endpoint-level middleware instances (wraps handler; inside global
                 middlewares)
-            parsers: List of parser instances (JSONParser, FormParser, MultiPartParser, BinaryParser).
+            parsers: List of parser instances (JSONParser, FormParser, MultiPartParser, NDJSONParser, BinaryParser).
                 If not provided, defaults to JSON.
             permission_classes: List of permission classes
             throttle_classes: List of throttle classes
@@ -419,16 +577,29 @@ class API:
             summary: Brief summary of the endpoint
             description: Detailed description (defaults to function docstring)
             tags: List of tags for grouping operations
-            request_schema: JSON schema for request body validation
+            request_schema: JSON schema for the request body. It is documented in OpenAPI and,
+                for JSON bodies, compiled at registration and enforced before the handler runs
             request_content_type: Request body content type (defaults to application/json)
             response_schema: JSON schema for successful response
             responses: Dict mapping status codes to response schemas
             parameters: List of parameter definitions for query/path params
             deprecated: Whether this endpoint is deprecated
             include_in_docs: Whether to include this endpoint in generated documentation (default: True)
-            request_body_mode: "buffered" (default) or "streamed"
+            request_body_mode: "buffered" (default), "lazy" (``kwargs["body"]`` is a
+                LazyBody parsed on first ``await``) or "streamed"
             max_request_body_bytes: Per-endpoint request size limit in bytes
             response_body_mode: "buffered" (default) or "streamed"
+            json_render: JSON response rendering for this endpoint: "auto" (compact unless
+                DEBUG or ``?pretty=1``), "compact" or "pretty". Defaults to the application's mode.
+            cache: TTL in seconds or a CachePolicy; lets ResponseCacheMiddleware store
+                successful GET responses of this endpoint. Hits skip authentication, so
+                credentials sent in other headers than ``Authorization``/``Cookie``
+                (``X-API-Key`` for example) must be listed in ``CachePolicy.vary``
+            coalesce: Share one handler execution between identical concurrent GET/HEAD
+                requests (same path, query and credentials)
+            validate_request: Set False to keep request_schema for documentation only
+            response_fields: Model fields returned when the handler responds with Model
+                instances; defaults to the properties of response_schema, else every field
 
         Examples:
             @API.endpoint(
@@ -490,6 +661,14 @@ class API:
                 blob = kwargs["body"]  # bytes
                 return await self.response(b"stored", media_type="text/plain")
 
+            # Lazy: the body is only read and parsed when awaited
+            @API.endpoint("/events", methods=["POST"], request_body_mode="lazy")
+            async def ingest(self, scope, receive, send, **kwargs):
+                if scope.get("user") is None:
+                    raise exceptions.AuthenticationFailed()
+                data = await kwargs["body"]  # dict, cached after first await
+                return await self.response({"ok": True})
+
             # Example of hiding an endpoint from documentation:
             @API.endpoint(
                 "/internal/debug",
@@ -507,6 +686,8 @@ class API:
             methods = [methods]
 
         methods = [m.upper() for m in methods]
+        validate_json_render(json_render)
+        cache_policy = CachePolicy.coerce(cache)
 
         def decorator(func: Callable):
             @wraps(func)
@@ -537,6 +718,11 @@ class API:
                 request_body_mode=request_body_mode,
                 max_request_body_bytes=max_request_body_bytes,
                 response_body_mode=response_body_mode,
+                json_render=json_render,
+                cache=cache_policy,
+                coalesce=coalesce,
+                validate_request=validate_request,
+                response_fields=response_fields,
             )
             # Attach extra endpoint metadata for middlewares/parsers
             wrapper._endpoint_middlewares = middlewares or []
@@ -544,6 +730,9 @@ class API:
             wrapper._request_body_mode = request_body_mode
             wrapper._max_request_body_bytes = max_request_body_bytes
             wrapper._response_body_mode = response_body_mode
+            wrapper._json_render = json_render
+            wrapper._cache_policy = cache_policy
+            wrapper._coalesce = coalesce
             return wrapper
 
         return decorator
@@ -639,7 +828,7 @@ class API:
         """
         if not self.model:
             raise NotImplementedError("Model must be defined")
-        return self.model.objects.using(self.model.db_alias)
+        return self.model.objects.using(getattr(self.model, "db_alias", "default"))
 
     async def get_queryset(self, scope: Scope) -> Any:
         """Get queryset with ordering applied.
@@ -669,16 +858,60 @@ class API:
 
         return queryset
 
+    async def paginate(self, scope: Scope, queryset: Any = None) -> Dict[str, Any]:
+        """Return one cursor-paginated page of ``queryset`` as a list payload.
+
+        Uses the request's ``cursor`` and ``page_size`` parameters and
+        defaults to ``get_queryset(scope)``. Items are serialized with the
+        endpoint's ``response_fields``, else the API's ``response_schema``.
+        """
+        if queryset is None:
+            queryset = await self.get_queryset(scope)
+        try:
+            page = await paginate_queryset(
+                queryset,
+                scope.get("cursor"),
+                scope.get("page_size", self.page_size),
+            )
+        except InvalidCursor:
+            raise exceptions.ValidationError("Invalid cursor parameter")
+
+        fields, strict = self._item_fields(scope)
+        return {
+            "object": "list",
+            "data": [
+                serializer_for(type(item), fields, strict=strict).project(item)
+                for item in page.items
+            ],
+            "has_more": page.has_more,
+            "url": scope.get("path", ""),
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        }
+
+    def _item_fields(self, scope: Scope) -> Tuple[Optional[Tuple[str, ...]], bool]:
+        """Fields to serialize for each item of a list payload."""
+        fields, strict = scope.get(RESPONSE_FIELDS_SCOPE_KEY) or (None, True)
+        if not strict:
+            fields = fields_from_schema(self.response_schema)
+        return fields, strict
+
     async def get_instance(self, scope: Scope, **kwargs) -> T:
         """Get a single instance based on scope and kwargs."""
         queryset = await self.get_queryset(scope)
+        lookup_value = kwargs[self.lookup_field]
+        field = self.model._neutronapi_fields_.get(self.lookup_field)
+        not_found = f"{self.model.__name__} with {self.lookup_field} not found"
+        if field is not None:
+            # A value the field cannot store (``abc`` for an integer) matches no row.
+            try:
+                field.to_db(lookup_value)
+            except (TypeError, ValueError) as e:
+                raise exceptions.NotFound(not_found) from e
         try:
-            lookup_value = kwargs[self.lookup_field]
             return await queryset.get(**{self.lookup_field: lookup_value})
         except self.model.DoesNotExist as e:
-            raise exceptions.NotFound(
-                f"{self.model.__name__} with {self.lookup_field} not found"
-            ) from e
+            raise exceptions.NotFound(not_found) from e
 
     async def transform(self, data):
         """Transform the data before saving."""
@@ -686,6 +919,59 @@ class API:
             data.pop("id")
         return data
 
+    def _crud_endpoints(self, declared: List[Tuple[Any, Endpoint]]) -> List[Tuple[Any, Endpoint]]:
+        """Build the generated CRUD endpoints not shadowed by declared ones."""
+
+        def route_key(path: str) -> str:
+            return re.sub(r"<[^>]+>", "<>", path).rstrip("/") or "/"
+
+        taken = {
+            (route_key(metadata.path), method)
+            for _attr, metadata in declared
+            for method in metadata.methods
+        }
+        names = {metadata.name for _attr, metadata in declared}
+
+        item_request = self.request_schema
+        partial_request = (
+            {key: value for key, value in item_request.items() if key != "required"}
+            if item_request
+            else None
+        )
+
+        def array_of(schema):
+            return {"type": "array", "items": schema} if schema else None
+
+        request_schemas = {
+            "create": item_request,
+            "update": item_request,
+            "partial_update": partial_request,
+            "bulk_create": array_of(item_request),
+            "bulk_update": array_of(partial_request),
+        }
+        response_schemas = {
+            "create": self.response_schema,
+            "retrieve": self.response_schema,
+            "update": self.response_schema,
+            "partial_update": self.response_schema,
+            "bulk_create": array_of(self.response_schema),
+        }
+
+        generated = []
+        for action, path, method, func in crud_routes(self):
+            if (route_key(path), method) in taken or action in names:
+                continue
+            wrapper = API.endpoint(
+                path,
+                methods=[method],
+                name=action,
+                summary=f"{action.replace('_', ' ').capitalize()} {self.model.__name__}",
+                request_schema=request_schemas.get(action),
+                response_schema=response_schemas.get(action),
+            )(func)
+            generated.append((types.MethodType(wrapper, self), wrapper._endpoint))
+        return generated
+
     def _register_endpoints(self):
         """Registers endpoints decorated with @endpoint and @websocket."""
         # Collect all endpoint metadata first
@@ -703,6 +989,9 @@ class API:
                 metadata = attr._websocket_metadata
                 websockets.append((attr, metadata))
 
+        if self.model is not None:
+            endpoints.extend(self._crud_endpoints(endpoints))
+
         # Sort endpoints by path specificity (static paths before dynamic patterns)
         def path_specificity(endpoint_data):
             attr, metadata = endpoint_data
@@ -744,7 +1033,7 @@ class API:
             ws_auth_class = metadata.get("authentication_class")
             ws_permission_classes = metadata.get("permission_classes") or self.permission_classes
             ws_throttle_classes = metadata.get("throttle_classes") or self.throttle_classes
-            self.routes.append(
+            self._add_route_entry(
                 (
                     re.compile(pattern),
                     attr,
@@ -778,7 +1067,7 @@ class API:
             path = "/" + path
 
         pattern = self._convert_path_to_regex(path)
-        self.routes.append(
+        self._add_route_entry(
             (
                 re.compile(pattern),
                 handler,
@@ -791,6 +1080,134 @@ class API:
             )
         )
 
+    def _add_route_entry(self, route: Tuple) -> None:
+        """Record a route tuple and index its dispatch plan for match()/handle()."""
+        self.routes.append(route)
+        self._router.insert(route[6], route[2], self._compile_plan(route))
+
+    def _compile_plan(self, route: Tuple) -> DispatchPlan:
+        """Resolve a route's auth, permissions, parsers and middlewares once."""
+        (
+            _pattern,
+            handler,
+            _methods,
+            permission_classes,
+            throttle_classes,
+            _name,
+            _path,
+            route_authentication_class,
+        ) = route
+
+        request_body_mode = getattr(handler, "_request_body_mode", "buffered")
+        max_request_body_bytes = getattr(handler, "_max_request_body_bytes", None)
+        max_body = (
+            self.MAX_BODY_SIZE
+            if request_body_mode != "streamed" and max_request_body_bytes is None
+            else max_request_body_bytes
+        )
+
+        parser_table: Dict[bytes, Tuple[int, Any]] = {}
+        custom_parsers: List[Tuple[int, Any]] = []
+        for index, parser in enumerate(getattr(handler, "_endpoint_parsers", None) or []):
+            if not isinstance(parser, BaseParser):
+                continue
+            if type(parser).matches is BaseParser.matches:
+                for media_type in parser.media_types:
+                    parser_table.setdefault(media_type.lower().encode(), (index, parser))
+            else:
+                custom_parsers.append((index, parser))
+
+        endpoint_app = self._compose_endpoint_app(
+            handler, getattr(handler, "_endpoint_middlewares", None) or []
+        )
+        if getattr(handler, "_coalesce", False):
+            endpoint_app = coalesce_app(endpoint_app)
+
+        return DispatchPlan(
+            route=route,
+            handler=handler,
+            authentication_class=(
+                route_authentication_class
+                if route_authentication_class is not None
+                else self.authentication_class
+            ),
+            permissions=tuple(bind(permission) for permission in permission_classes or []),
+            throttle_classes=tuple(
+                bind(throttle) for throttle in throttle_classes or []
+            ),
+            parser_table=parser_table,
+            custom_parsers=tuple(custom_parsers),
+            request_body_mode=request_body_mode,
+            max_body=max_body,
+            json_render=getattr(handler, "_json_render", None),
+            cache=getattr(handler, "_cache_policy", None),
+            validator=self._compile_validator(handler),
+            response_projection=self._response_projection(handler),
+            app=endpoint_app,
+        )
+
+    @staticmethod
+    def _compile_validator(handler: Callable) -> Optional[Callable[[Any], None]]:
+        """Compile the endpoint's request_schema into a body validator."""
+        endpoint = getattr(handler, "_endpoint", None)
+        if endpoint is None or not endpoint.request_schema or not endpoint.validate_request:
+            return None
+        return compile_schema(endpoint.request_schema)
+
+    @staticmethod
+    def _response_projection(handler: Callable) -> Optional[Tuple[Tuple[str, ...], bool]]:
+        """Resolve which Model fields this endpoint serializes."""
+        endpoint = getattr(handler, "_endpoint", None)
+        if endpoint is None:
+            return None
+        if endpoint.response_fields:
+            return tuple(endpoint.response_fields), True
+        schema_fields = fields_from_schema(endpoint.response_schema)
+        if schema_fields:
+            return schema_fields, False
+        return None
+
+    @staticmethod
+    def _compose_endpoint_app(handler: Callable, middlewares: List[Any]) -> Callable:
+        """Build the endpoint middleware chain around ``handler`` once per route.
+
+        Middleware instances are copied so a decorator-level instance shared by
+        several API instances or routes is never rebound under a live request.
+        """
+
+        async def handler_app(scope, receive, send):
+            response = await handler(
+                scope, receive, send, **scope[HANDLER_KWARGS_SCOPE_KEY]
+            )
+            timer = scope.get(TIMING_SCOPE_KEY)
+            if timer is not None:
+                timer.mark("handler")
+            if response is None:
+                return
+            elif isinstance(response, (Response, StreamingResponse, FileResponse)):
+                return await response(scope, receive, send)
+            else:
+                raise ValueError(f"Invalid response type: {type(response)}")
+
+        app_to_call = handler_app
+        hook_run: List[Middleware] = []
+        for mw in reversed(middlewares):
+            mw = copy.copy(mw)
+            if isinstance(mw, Middleware):
+                hook_run.append(mw)
+                continue
+            if hook_run:
+                app_to_call = fuse_middleware(hook_run[::-1], app_to_call)
+                hook_run = []
+            if hasattr(mw, "app"):
+                mw.app = app_to_call
+            if hasattr(mw, "router"):
+                mw.router = app_to_call
+            app_to_call = mw
+        if hook_run:
+            app_to_call = fuse_middleware(hook_run[::-1], app_to_call)
+        return app_to_call
+
     @staticmethod
     def _convert_path_to_regex(path):
         """Convert path pattern to regex."""
@@ -821,18 +1238,20 @@ class API:
 
     @staticmethod
     async def check_permissions(scope, permission_classes):
-        """Checks if the request has the required permissions."""
-        user = scope.get("user")
-        for permission_class in permission_classes:
-            if not await permission_class().has_permission(scope, user):
-                raise exceptions.PermissionDenied()
+        """Checks if the request has the required permissions.
+
+        Accepts classes (instantiated per call) or instances. Adjacent
+        permissions declaring ``concurrent = True`` are evaluated together.
+        """
+        if not await permissions_allow(scope, permission_classes, scope.get("user")):
+            raise exceptions.PermissionDenied()
 
     @staticmethod
     async def check_throttles(scope, throttle_classes):
         """Checks if the request should be throttled."""
         collected_headers: Dict[str, str] = {}
         for throttle_class in throttle_classes:
-            throttle = throttle_class()
+            throttle = instance_for_request(throttle_class)
             allowed = await throttle.allow_request(scope)
             headers = await throttle.get_headers()
             if headers:
@@ -850,32 +1269,39 @@ class API:
         if scope["type"] == "websocket":
             return await self.handle_websocket(scope, receive, send, **kwargs)
 
+        # Phase marks are no-ops unless Application(server_timing=True)
+        timer = scope.get(TIMING_SCOPE_KEY)
+        if timer is not None:
+            timer.mark("middleware")
+
         try:
             scope = await self._process_client_params(scope)
             send_with_headers = _wrap_send_with_scope_headers(scope, send)
             method = scope["method"]
             path = scope["path"].rstrip("/")
 
-            (
-                handler,
-                kwargs,
-                permission_classes,
-                throttle_classes,
-                _,
-                _,
-                route_authentication_class,
-            ) = await self.match(path, method)
-
-            if handler is None:
-                raise exceptions.MethodNotAllowed(method, path)
-
-            # Route-level auth takes precedence over API-level auth
-            effective_auth = route_authentication_class if route_authentication_class is not None else self.authentication_class
-            if effective_auth:
-                await effective_auth.authorize(scope)
-
-            await self.check_permissions(scope, permission_classes)
-            await self.check_throttles(scope, throttle_classes)
+            plan, kwargs = self._resolve_plan(path, method)
+            # Route template, not the raw path, keeps metric labels bounded
+            scope[ROUTE_SCOPE_KEY] = plan.route[6]
+            if plan.json_render is not None:
+                scope[JSON_RENDER_SCOPE_KEY] = plan.json_render
+            if plan.response_projection is not None:
+                scope[RESPONSE_FIELDS_SCOPE_KEY] = plan.response_projection
+            cache_context = scope.get(RESPONSE_CACHE_SCOPE_KEY)
+            if cache_context is not None:
+                cache_context.policy = plan.cache
+            if timer is not None:
+                timer.mark("routing")
+
+            if plan.authentication_class:
+                await plan.authentication_class.authorize(scope)
+                if timer is not None:
+                    timer.mark("auth")
+
+            await self.check_permissions(scope, plan.permissions)
+            await self.check_throttles(scope, plan.throttle_classes)
+            if timer is not None:
+                timer.mark("permissions")
 
             # Pass scope params through kwargs
             kwargs.update(
@@ -887,100 +1313,60 @@ class API:
                     "params": scope.get("params", {}),
                 }
             )
+            if self.pagination == "cursor":
+                kwargs["cursor"] = scope.get("cursor")
 
-            request_body_mode = getattr(handler, "_request_body_mode", "buffered")
-            max_request_body_bytes = getattr(
-                handler,
-                "_max_request_body_bytes",
-                None,
-            )
-            max_body = (
-                self.MAX_BODY_SIZE
-                if request_body_mode == "buffered"
-                and max_request_body_bytes is None
-                else max_request_body_bytes
-            )
-
-            # Parse request body using parser instances
-            from neutronapi.parsers import JSONParser, BaseParser
-            from neutronapi.streams import AsyncByteStream
-            from neutronapi.responses import StreamingResponse
-            headers_dict = dict(scope.get("headers", []))
-            raw_body = b""
-            if request_body_mode == "streamed":
-                content_length = None
-                raw_content_length = headers_dict.get(b"content-length")
-                if raw_content_length:
-                    try:
-                        content_length = int(raw_content_length.decode("utf-8"))
-                    except (TypeError, ValueError):
-                        raise exceptions.ValidationError("Invalid Content-Length header")
+            request_headers = get_headers(scope)
+            if plan.request_body_mode == "streamed":
                 kwargs["stream"] = AsyncByteStream(
                     receive,
-                    content_length=content_length,
-                    max_bytes=max_body,
+                    content_length=parse_content_length(request_headers),
+                    max_bytes=plan.max_body,
                 )
-            elif method in ["POST", "PUT", "PATCH"]:
+            elif method in _BODY_METHODS and plan.request_body_mode == "lazy":
+                # Read and parse only when the handler awaits kwargs["body"]
+                parser = plan.select_parser(request_headers)
+                kwargs["body"] = LazyBody(
+                    scope,
+                    receive,
+                    parser=parser,
+                    headers=request_headers,
+                    validator=plan.validator if isinstance(parser, JSONParser) else None,
+                    stream=AsyncByteStream(
+                        receive,
+                        content_length=parse_content_length(request_headers),
+                        max_bytes=plan.max_body,
+                    ),
+                )
+            elif method in _BODY_METHODS:
                 # Read complete body once, enforcing size limit
-                msg = await receive()
-                if msg.get("type") == "http.request":
-                    raw_body = msg.get("body", b"")
-                    if len(raw_body) > max_body:
-                        raise exceptions.APIException(
-                            "Request body too large",
-                            type="request_too_large",
-                            status=413,
-                        )
-                    more = msg.get("more_body", False)
-                    while more:
-                        msg = await receive()
-                        raw_body += msg.get("body", b"")
-                        if len(raw_body) > max_body:
-                            raise exceptions.APIException(
-                                "Request body too large",
-                                type="request_too_large",
-                                status=413,
-                            )
-                        more = msg.get("more_body", False)
-
-            # Endpoint-specific parsers
-            endpoint_parsers = list(getattr(handler, "_endpoint_parsers", []) or [])
-
-            parsed_kwargs = {}
-            if request_body_mode == "buffered" and method in ["POST", "PUT", "PATCH"]:
-                # Select parser: first matching endpoint parser; else default JSONParser()
-                parser = None
-                for p in endpoint_parsers:
-                    if isinstance(p, BaseParser) and p.matches(headers_dict):
-                        parser = p
-                        break
-                if parser is None:
-                    parser = JSONParser()
-                parsed_kwargs = await parser.parse(scope, receive, raw_body=raw_body, headers=headers_dict)
-                kwargs.update(parsed_kwargs)
-
-            # Compose endpoint-level middlewares (instances only)
-            endpoint_mws = list(getattr(handler, "_endpoint_middlewares", []) or [])
-
-            async def handler_app(scope2, receive2, send2):
-                response = await handler(scope2, receive2, send2, **kwargs)
-                if response is None:
-                    return
-                elif isinstance(response, (Response, StreamingResponse)):
-                    return await response(scope2, receive2, send2)
-                else:
-                    raise ValueError(f"Invalid response type: {type(response)}")
-
-            app_to_call = handler_app
-            for mw in reversed(endpoint_mws):
-                if hasattr(mw, 'app'):
-                    mw.app = app_to_call
-                if hasattr(mw, 'router'):
-                    mw.router = app_to_call
-                app_to_call = mw
-
-            # Call the composed endpoint app
-            await app_to_call(scope, receive, send_with_headers)
+                raw_body = await AsyncByteStream(
+                    receive,
+                    content_length=parse_content_length(request_headers),
+                    max_bytes=plan.max_body,
+                ).read_body()
+                if timer is not None:
+                    timer.mark("body")
+
+                parser = plan.select_parser(request_headers)
+                parsed = await parser.parse(scope, receive, raw_body=raw_body, headers=request_headers)
+                if plan.validator is not None and isinstance(parser, JSONParser):
+                    plan.validator(parsed.get("body"))
+                kwargs.update(parsed)
+                if timer is not None:
+                    timer.mark("parse")
+
+            # Call the endpoint app composed at registration time
+            scope[HANDLER_KWARGS_SCOPE_KEY] = kwargs
+            try:
+                await plan.app(scope, receive, send_with_headers)
+            finally:
+                # Spooled multipart files live only as long as the request.
+                body = kwargs.get("body")
+                if isinstance(body, LazyBody):
+                    body.close()
+                elif "files" in kwargs:
+                    close_uploads(kwargs)
 
         except exceptions.APIException as e:
             response = await self.render_api_exception(scope, e)
@@ -993,104 +1379,77 @@ class API:
         path = scope["path"].rstrip("/")
 
         try:
-            (
-                handler,
-                kwargs,
-                permission_classes,
-                throttle_classes,
-                _,
-                _,
-                route_authentication_class,
-            ) = await self.match(path, "WEBSOCKET")
-        except exceptions.NotFound:
-            await send({"type": "websocket.close", "code": 4004})
-            return
-
-        if handler is None:
+            plan, kwargs = self._resolve_plan(path, "WEBSOCKET")
+        except (exceptions.NotFound, exceptions.MethodNotAllowed):
             await send({"type": "websocket.close", "code": 4004})
             return
 
-        # Route-level auth takes precedence over API-level auth
-        effective_auth = route_authentication_class if route_authentication_class is not None else self.authentication_class
-
         try:
-            if effective_auth:
-                await effective_auth.authorize(scope)
-            await self.check_permissions(scope, permission_classes)
-            await self.check_throttles(scope, throttle_classes)
+            if plan.authentication_class:
+                await plan.authentication_class.authorize(scope)
+            await self.check_permissions(scope, plan.permissions)
+            await self.check_throttles(scope, plan.throttle_classes)
         except exceptions.APIException:
             await send({"type": "websocket.close", "code": 4001})
             return
 
-        await handler(scope, receive, send, **kwargs)
+        await plan.handler(scope, receive, send, **kwargs)
+
+    def _resolve_plan(self, path: str, method: str) -> Tuple[DispatchPlan, Dict[str, str]]:
+        """Look up the dispatch plan for a path, raising 404/405 when absent."""
+        plan, params, path_matched = self._router.lookup(path, method)
+
+        if plan is None:
+            if path_matched:
+                raise exceptions.MethodNotAllowed(method, path)
+            # Use default NotFound message for consistency
+            raise exceptions.NotFound()
+        return plan, params
 
     async def match(self, path: str, method: str = "GET"):
         """Matches a request path and method to a handler."""
-        matched_handlers = []
-
-        for (
-            pattern,
+        plan, params = self._resolve_plan(path, method)
+        (
+            _pattern,
             handler,
-            allowed_methods,
+            _allowed_methods,
             permission_classes,
             throttle_classes,
             name,
             original_path,
             route_authentication_class,
-        ) in self.routes:
-            match = pattern.match(path)
-            if match:
-                matched_handlers.append(
-                    (
-                        handler,
-                        allowed_methods,
-                        permission_classes,
-                        throttle_classes,
-                        match,
-                        name,
-                        original_path,
-                        route_authentication_class,
-                    )
-                )
-
-        if not matched_handlers:
-            # Use default NotFound message for consistency
-            raise exceptions.NotFound()
-
-        for (
+        ) = plan.route
+        return (
             handler,
-            allowed_methods,
+            params,
             permission_classes,
             throttle_classes,
-            match,
             name,
             original_path,
             route_authentication_class,
-        ) in matched_handlers:
-            if method in allowed_methods:
-                kwargs = match.groupdict()
-                return (
-                    handler,
-                    {**kwargs},
-                    permission_classes,
-                    throttle_classes,
-                    name,
-                    original_path,
-                    route_authentication_class,
-                )
-
-        if matched_handlers:
-            raise exceptions.MethodNotAllowed(method, path)
-
-        raise exceptions.NotFound()
+        )
 
     @staticmethod
     async def response(
-        data, status=200, headers=None, media_type="application/json"
+        data,
+        status=200,
+        headers=None,
+        media_type="application/json",
+        pretty=None,
+        fields=None,
     ):
-        """Sends an HTTP response."""
+        """Sends an HTTP response.
+
+        ``data`` may be a Model instance or a list of them; ``fields`` limits
+        the serialized fields.
+        """
         resp = Response(
-            body=data, status_code=status, headers=headers, media_type=media_type
+            body=data,
+            status_code=status,
+            headers=headers,
+            media_type=media_type,
+            pretty=pretty,
+            fields=fields,
         )
         return resp
 
@@ -0,0 +1,374 @@
+"""In-process ASGI benchmarks for the NeutronAPI HTTP stack.
+
+Each scenario drives an ``Application`` directly through ASGI with synthetic
+``receive``/``send`` callables, so the numbers cover routing, parsing,
+middleware and rendering without any server or socket overhead.
+
+Run explicitly; this file is intentionally outside normal test discovery::
+
+    python -m neutronapi.benchmarks.bench_http
+    python -m neutronapi.benchmarks.bench_http -n 5000 -c 16 dynamic_route json_post
+    python -m neutronapi.benchmarks.bench_http --json > before.json
+
+Reported per scenario:
+
+- ``req/s``: completed requests per wall-clock second
+- ``p50``/``p99``: per-request latency in microseconds
+- ``KiB/req``: bytes allocated at peak while serving one request, and
+  ``blocks/req``: memory blocks still alive afterwards (both measured in a
+  separate sequential pass under ``tracemalloc``, which would otherwise
+  distort the timings)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.encoders import json_dumps_bytes, json_dumps_text
+from neutronapi.middleware.compression import CompressionMiddleware
+from neutronapi.responses import StreamingResponse
+
+Headers = List[Tuple[bytes, bytes]]
+
+HOST = b"bench.local"
+
+
+@dataclass
+class Scenario:
+    """One benchmarked request shape against one application."""
+
+    name: str
+    description: str
+    build: Callable[[], Any]
+    method: str = "GET"
+    path: str = "/"
+    query_string: bytes = b""
+    headers: Headers = field(default_factory=list)
+    body: bytes = b""
+    body_chunk_size: int = 64 * 1024
+    expected_status: int = 200
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    concurrency: int
+    req_per_sec: float
+    p50_us: float
+    p99_us: float
+    alloc_kib_per_req: float
+    blocks_per_req: float
+    response_bytes: int
+
+
+# APIs -----------------------------------------------------------------------
+
+
+class PingAPI(API):
+    resource = ""
+    name = "ping"
+
+    @API.endpoint("/ping", methods=["GET"], name="ping")
+    async def ping(self, scope, receive, send, **kwargs):
+        return await self.response({"ok": True})
+
+
+class EchoAPI(API):
+    resource = "/echo"
+    name = "echo"
+
+    @API.endpoint("/", methods=["POST"], name="echo")
+    async def echo(self, scope, receive, send, **kwargs):
+        body = kwargs["body"]
+        return await self.response({"items": len(body["items"])})
+
+
+class ReportAPI(API):
+    resource = "/report"
+    name = "report"
+
+    @API.endpoint("/", methods=["GET"], name="report")
+    async def report(self, scope, receive, send, **kwargs):
+        return await self.response(REPORT_PAYLOAD)
+
+
+class DownloadAPI(API):
+    resource = "/download"
+    name = "download"
+
+    @API.endpoint("/", methods=["GET"], name="download", response_body_mode="streamed")
+    async def download(self, scope, receive, send, **kwargs):
+        chunk = b"x" * 64 * 1024
+
+        async def body():
+            for _ in range(16):
+                yield chunk
+
+        return StreamingResponse(body(), headers={"content-type": "application/octet-stream"})
+
+
+def many_routes_api(count: int = 500) -> API:
+    """Build an API with ``count`` dynamic routes, one per resource segment."""
+
+    async def show(self, scope, receive, send, **kwargs):
+        return await self.response({"id": kwargs["item_id"]})
+
+    namespace: Dict[str, Any] = {"resource": "/v1", "name": "many"}
+    for index in range(count):
+        handler = API.endpoint(
+            f"/things{index}/<int:item_id>", methods=["GET"], name=f"thing{index}"
+        )(show)
+        namespace[f"thing{index}"] = handler
+    return type("ManyRoutesAPI", (API,), namespace)()
+
+
+REPORT_PAYLOAD = {
+    "rows": [
+        {"id": index, "name": f"row-{index}", "tags": ["alpha", "beta"], "score": index * 0.5}
+        for index in range(200)
+    ]
+}
+
+JSON_POST_BODY = json_dumps_bytes(
+    {"items": [{"sku": f"sku-{index}", "qty": index, "note": "x" * 16} for index in range(50)]}
+)
+
+
+def full_stack_app() -> Application:
+    return Application(
+        apis=[PingAPI()],
+        allowed_hosts=[HOST.decode()],
+        cors_allow_all=True,
+        middlewares=[CompressionMiddleware()],
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario(
+            "static_route",
+            "GET a static path on a single small API",
+            lambda: Application(apis=[PingAPI()]),
+            path="/ping",
+        ),
+        Scenario(
+            "dynamic_route",
+            "GET a parameterised path among 500 dynamic routes",
+            lambda: Application(apis=[many_routes_api(500)]),
+            path="/v1/things499/42",
+        ),
+        Scenario(
+            "json_post",
+            f"POST and parse a {len(JSON_POST_BODY) // 1024} KiB JSON body",
+            lambda: Application(apis=[EchoAPI()]),
+            method="POST",
+            path="/echo",
+            headers=[(b"content-type", b"application/json")],
+            body=JSON_POST_BODY,
+        ),
+        Scenario(
+            "full_stack",
+            "GET a static path through allowed hosts, CORS, compression and logging",
+            full_stack_app,
+            path="/ping",
+            headers=[(b"origin", b"https://client.example"), (b"accept-encoding", b"gzip")],
+        ),
+        Scenario(
+            "compression_off",
+            "GET a ~10 KiB JSON document without compression",
+            lambda: Application(apis=[ReportAPI()]),
+            path="/report",
+            headers=[(b"accept-encoding", b"gzip")],
+        ),
+        Scenario(
+            "compression_on",
+            "GET the same document through CompressionMiddleware (gzip)",
+            lambda: Application(apis=[ReportAPI()], middlewares=[CompressionMiddleware()]),
+            path="/report",
+            headers=[(b"accept-encoding", b"gzip")],
+        ),
+        Scenario(
+            "streaming_download",
+            "GET a 1 MiB body streamed in 64 KiB chunks",
+            lambda: Application(apis=[DownloadAPI()]),
+            path="/download",
+        ),
+    )
+}
+
+
+# Driver ---------------------------------------------------------------------
+
+
+def make_scope(scenario: Scenario) -> Dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": scenario.method,
+        "scheme": "http",
+        "path": scenario.path,
+        "raw_path": scenario.path.encode(),
+        "query_string": scenario.query_string,
+        "root_path": "",
+        "headers": [(b"host", HOST), *scenario.headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+async def run_once(app: Any, scenario: Scenario) -> Tuple[int, int]:
+    """Serve one request; return ``(status, response body bytes)``."""
+    body = scenario.body
+    size = scenario.body_chunk_size
+    offset = 0
+    status = 0
+    sent = 0
+
+    async def receive():
+        nonlocal offset
+        chunk = body[offset:offset + size]
+        offset += size
+        return {"type": "http.request", "body": chunk, "more_body": offset < len(body)}
+
+    async def send(message):
+        nonlocal status, sent
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await app(make_scope(scenario), receive, send)
+    return status, sent
+
+
+def percentile(sorted_values: List[int], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index] / 1000
+
+
+async def measure_allocations(app: Any, scenario: Scenario, requests: int) -> Tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        blocks_before = sys.getallocatedblocks()
+        for _ in range(requests):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await run_once(app, scenario)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - current
+        # Let the loop finalize tasks cancelled at the end of a request, as a
+        # server's loop would between requests.
+        await asyncio.sleep(0)
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        tracemalloc.stop()
+    return peak_total / requests / 1024, (blocks_after - blocks_before) / requests
+
+
+async def bench(scenario: Scenario, requests: int, concurrency: int, warmup: int) -> Result:
+    app = scenario.build()
+    status, response_bytes = await run_once(app, scenario)
+    if status != scenario.expected_status:
+        raise RuntimeError(
+            f"{scenario.name}: expected status {scenario.expected_status}, got {status}"
+        )
+    for _ in range(warmup):
+        await run_once(app, scenario)
+
+    latencies: List[int] = []
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    async def worker(count: int) -> None:
+        clock = time.perf_counter_ns
+        for _ in range(count):
+            start = clock()
+            await run_once(app, scenario)
+            latencies.append(clock() - start)
+
+    gc.collect()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in per_worker))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    alloc_kib, blocks = await measure_allocations(app, scenario, min(requests, 200))
+    return Result(
+        name=scenario.name,
+        requests=requests,
+        concurrency=concurrency,
+        req_per_sec=requests / elapsed if elapsed else 0.0,
+        p50_us=percentile(latencies, 0.50),
+        p99_us=percentile(latencies, 0.99),
+        alloc_kib_per_req=alloc_kib,
+        blocks_per_req=blocks,
+        response_bytes=response_bytes,
+    )
+
+
+def format_table(results: List[Result]) -> str:
+    header = (
+        f"{'scenario':<20} {'req/s':>10} {'p50 us':>9} {'p99 us':>9} "
+        f"{'KiB/req':>8} {'blocks/req':>10} {'resp bytes':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.name:<20} {result.req_per_sec:>10.0f} {result.p50_us:>9.1f} "
+            f"{result.p99_us:>9.1f} {result.alloc_kib_per_req:>8.1f} "
+            f"{result.blocks_per_req:>10.2f} {result.response_bytes:>10}"
+        )
+    return "\n".join(lines)
+
+
+async def main(argv: Optional[List[str]] = None) -> List[Result]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenarios", nargs="*", help=f"subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="concurrent in-flight requests")
+    parser.add_argument("--warmup", type=int, default=200, help="untimed requests per scenario")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<20} {scenario.description}")
+        return []
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests and --concurrency must be positive")
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        results.append(
+            await bench(SCENARIOS[name], args.requests, args.concurrency, args.warmup)
+        )
+
+    if args.json:
+        print(json_dumps_text([asdict(result) for result in results], indent=2))
+    else:
+        print(format_table(results))
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,310 @@
+"""Generated CRUD endpoints for APIs that declare a ``model``.
+
+``API._register_endpoints`` turns each action in ``API.crud_actions`` into a
+regular endpoint unless the API already defines the same method and path (or
+endpoint name). Nothing is generated unless the API lists the actions it
+wants to publish; ``READ_ACTIONS`` covers list and retrieve. Handlers go
+through the API's hooks — ``get_queryset``, ``get_instance`` and
+``transform`` — so subclasses customise behaviour the same way they would for
+hand-written endpoints. Detail routes use the ``int`` path converter when the
+lookup field is an ``IntegerField``.
+
+The list action streams its response: rows are read with
+``QuerySet.iter_batches`` and each batch is encoded with one serializer call,
+so memory stays proportional to the batch size rather than the page.
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from neutronapi.api import exceptions
+from neutronapi.db.fields import IntegerField
+from neutronapi.db.pagination import Cursor, encode_cursor
+from neutronapi.encoders import json_dumps_bytes
+from neutronapi.exceptions import ValidationError as FieldValidationError
+from neutronapi.responses import StreamingResponse
+from neutronapi.serializers import serializer_for
+
+# Convenience value for ``API.crud_actions``: list and retrieve only.
+READ_ACTIONS = ("list", "retrieve")
+
+CRUD_ACTIONS = (
+    "list",
+    "create",
+    "retrieve",
+    "update",
+    "partial_update",
+    "destroy",
+    "bulk_create",
+    "bulk_update",
+)
+
+
+def _pk_name(model: type) -> str:
+    return model.objects._pk_name()
+
+
+def _clean(api: Any, data: Any, *, partial: bool) -> Dict[str, Any]:
+    """Check a request item against the model's fields and return field values."""
+    if not isinstance(data, dict):
+        raise exceptions.ValidationError("Expected a JSON object")
+    model_fields = api.model._neutronapi_fields_
+    unknown = sorted(name for name in data if name not in model_fields)
+    if unknown:
+        raise exceptions.ValidationError(
+            f"Unknown field(s): {', '.join(unknown)}",
+            errors=[
+                {"field": name, "code": "unexpected", "message": "Unexpected field"}
+                for name in unknown
+            ],
+        )
+    errors = []
+    for name, value in data.items():
+        try:
+            model_fields[name].validate(value)
+        except (ValueError, FieldValidationError) as exc:
+            errors.append({"field": name, "code": "invalid", "message": str(exc)})
+    if not partial:
+        for name, field in model_fields.items():
+            if (
+                name not in data
+                and not field.primary_key
+                and not field.null
+                and field.default is None
+            ):
+                errors.append({"field": name, "code": "required", "message": "This field is required"})
+    if errors:
+        first = errors[0]
+        raise exceptions.ValidationError(
+            f"Invalid request body. {first['field']}: {first['message']}", errors=errors
+        )
+    return data
+
+
+def _assign(instance: Any, data: Dict[str, Any]) -> None:
+    fields = instance._neutronapi_fields_
+    for name, value in data.items():
+        setattr(instance, name, fields[name].from_db(instance._convert_enum_value(value)))
+
+
+def _body_list(kwargs: Dict[str, Any]) -> List[Any]:
+    body = kwargs.get("body")
+    if not isinstance(body, list) or not body:
+        raise exceptions.ValidationError("Expected a non-empty JSON array")
+    return body
+
+
+def _db_alias(api: Any) -> str:
+    return getattr(api.model, "db_alias", "default")
+
+
+async def _stream_list(
+    api: Any,
+    scope: Any,
+    first_batch: List[Any],
+    batches: AsyncIterator[List[Any]],
+    page_size: int,
+    ordering: Tuple[str, ...],
+    cursor: Optional[Cursor],
+) -> AsyncIterator[bytes]:
+    fields, strict = api._item_fields(scope)
+    yield b'{"object":"list","data":['
+
+    sent = 0
+    more = False
+    first = last = None
+    batch = first_batch
+    while batch:
+        room = page_size - sent
+        if len(batch) > room:
+            batch, more = batch[:room], True
+        if batch:
+            encoded = serializer_for(type(batch[0]), fields, strict=strict).dumps_many(batch)
+            yield (b"," if sent else b"") + encoded[1:-1]
+            sent += len(batch)
+            if first is None:
+                first = batch[0]
+            last = batch[-1]
+        if more:
+            break
+        batch = await anext(batches, [])
+
+    trailer: Dict[str, Any] = {"has_more": more, "url": scope.get("path", "")}
+    if api.pagination == "cursor":
+        trailer["next_cursor"] = (
+            encode_cursor(Cursor.for_instance(last, ordering)) if more else None
+        )
+        trailer["previous_cursor"] = (
+            encode_cursor(Cursor.for_instance(first, ordering, previous=True))
+            if cursor is not None and first is not None
+            else None
+        )
+    yield b"]," + json_dumps_bytes(trailer)[1:]
+
+
+async def list_objects(self, scope, receive, send, **kwargs):
+    """List objects, streamed as a JSON list payload."""
+    queryset = await self.get_queryset(scope)
+    page_size = scope.get("page_size", self.page_size)
+    cursor = scope.get("cursor")
+    if cursor is not None and cursor.previous:
+        # Backward pages arrive reversed; they are bounded by page_size anyway.
+        return await self.response(await self.paginate(scope, queryset))
+
+    if self.pagination == "cursor":
+        ordering = queryset.keyset_ordering()
+        queryset = queryset.after(cursor) if cursor is not None else queryset.order_by(*ordering)
+    else:
+        ordering = ()
+        # The primary key tie-break keeps pages stable; nullable orderings
+        # cannot take it (see QuerySet.keyset_ordering) and page as they are.
+        if not queryset._orders_by_nullable_field():
+            queryset = queryset.order_by(*queryset.keyset_ordering())
+        queryset = queryset.offset((scope.get("page", 1) - 1) * page_size)
+    # One extra row tells whether another page exists.
+    batches = queryset.limit(page_size + 1).iter_batches(self.stream_batch_size)
+    # Read the first batch before answering so query errors still get a status.
+    first_batch = await anext(batches, [])
+    return StreamingResponse(
+        _stream_list(self, scope, first_batch, batches, page_size, ordering, cursor),
+        headers={"content-type": "application/json"},
+        buffer_size=self.stream_buffer_size,
+    )
+
+
+def _body_object(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    body = kwargs.get("body")
+    if not isinstance(body, dict):
+        raise exceptions.ValidationError("Expected a JSON object")
+    return dict(body)
+
+
+async def create_object(self, scope, receive, send, **kwargs):
+    """Create an object."""
+    data = _clean(self, await self.transform(_body_object(kwargs)), partial=False)
+    queryset = self.model.objects.using(_db_alias(self))
+    instance = await queryset.create(**data)
+    return await self.response(instance, status=201)
+
+
+async def retrieve_object(self, scope, receive, send, **kwargs):
+    """Retrieve an object."""
+    return await self.response(await self.get_instance(scope, **kwargs))
+
+
+async def _save_changes(api, scope, kwargs, *, partial: bool):
+    instance = await api.get_instance(scope, **kwargs)
+    data = _clean(api, await api.transform(_body_object(kwargs)), partial=partial)
+    if not partial:
+        # PUT replaces the object: omitted fields fall back to their defaults.
+        pk_name = _pk_name(api.model)
+        for name, field in instance._neutronapi_fields_.items():
+            if name != pk_name and name not in data:
+                setattr(instance, name, field.default() if callable(field.default) else field.default)
+    _assign(instance, data)
+    await instance.save(create=False, using=_db_alias(api))
+    return await api.response(instance)
+
+
+async def update_object(self, scope, receive, send, **kwargs):
+    """Replace an object."""
+    return await _save_changes(self, scope, kwargs, partial=False)
+
+
+async def partial_update_object(self, scope, receive, send, **kwargs):
+    """Update some fields of an object."""
+    return await _save_changes(self, scope, kwargs, partial=True)
+
+
+async def destroy_object(self, scope, receive, send, **kwargs):
+    """Delete an object."""
+    instance = await self.get_instance(scope, **kwargs)
+    await instance.delete(using=_db_alias(self))
+    return await self.response(None, status=204)
+
+
+async def bulk_create_objects(self, scope, receive, send, **kwargs):
+    """Create objects in batched multi-row INSERTs."""
+    objs = []
+    for item in _body_list(kwargs):
+        if not isinstance(item, dict):
+            raise exceptions.ValidationError("Expected a JSON object")
+        data = _clean(self, await self.transform(dict(item)), partial=False)
+        objs.append(self.model(**data))
+    queryset = self.model.objects.using(_db_alias(self))
+    await queryset.bulk_create(objs)
+    return await self.response(objs, status=201)
+
+
+async def bulk_update_objects(self, scope, receive, send, **kwargs):
+    """Update the same fields on several objects, matched by primary key.
+
+    Targets are looked up through ``get_queryset``, so rows outside it cannot
+    be updated; unknown primary keys reject the whole request.
+    """
+    pk_name = _pk_name(self.model)
+    changes: Dict[Any, Dict[str, Any]] = {}
+    for item in _body_list(kwargs):
+        if not isinstance(item, dict):
+            raise exceptions.ValidationError("Expected a JSON object")
+        item = dict(item)
+        if pk_name not in item:
+            raise exceptions.ValidationError(f"Every item needs its '{pk_name}'")
+        pk = item.pop(pk_name)
+        if pk in changes:
+            raise exceptions.ValidationError(f"Duplicate '{pk_name}' {pk!r}")
+        changes[pk] = _clean(self, await self.transform(item), partial=True)
+
+    fields = set(next(iter(changes.values())))
+    if any(set(data) != fields for data in changes.values()):
+        raise exceptions.ValidationError("Every item must update the same fields")
+    if not fields:
+        raise exceptions.ValidationError("No fields to update")
+
+    queryset = await self.get_queryset(scope)
+    instances = await queryset.filter(**{f"{pk_name}__in": list(changes)})
+    found = {getattr(instance, pk_name): instance for instance in instances}
+    missing = [pk for pk in changes if pk not in found]
+    if missing:
+        raise exceptions.ValidationError(
+            f"{self.model.__name__} not found: {', '.join(map(str, missing))}",
+            errors=[
+                {"field": pk_name, "code": "not_found", "message": f"{pk} not found"}
+                for pk in missing
+            ],
+        )
+
+    for pk, data in changes.items():
+        _assign(found[pk], data)
+    updated = await self.model.objects.using(_db_alias(self)).bulk_update(
+        [found[pk] for pk in changes], sorted(fields)
+    )
+    return await self.response({"updated": updated})
+
+
+def crud_routes(api: Any) -> List[Tuple[str, str, str, Any]]:
+    """Return ``(action, path, method, handler)`` for the API's enabled actions."""
+    lookup = api.model._neutronapi_fields_.get(api.lookup_field)
+    converter = "int" if isinstance(lookup, IntegerField) else "str"
+    detail = f"/<{converter}:{api.lookup_field}>"
+    routes = {
+        "list": ("/", "GET", list_objects),
+        "create": ("/", "POST", create_object),
+        "retrieve": (detail, "GET", retrieve_object),
+        "update": (detail, "PUT", update_object),
+        "partial_update": (detail, "PATCH", partial_update_object),
+        "destroy": (detail, "DELETE", destroy_object),
+        "bulk_create": ("/bulk", "POST", bulk_create_objects),
+        "bulk_update": ("/bulk", "PATCH", bulk_update_objects),
+    }
+    unknown = [action for action in api.crud_actions if action not in routes]
+    if unknown:
+        raise ValueError(
+            f"Unknown crud action(s) {', '.join(map(repr, unknown))}; "
+            f"expected any of {', '.join(CRUD_ACTIONS)}"
+        )
+    return [(action, *routes[action]) for action in api.crud_actions]
+
+
+__all__ = ["CRUD_ACTIONS", "READ_ACTIONS", "crud_routes"]
@@ -0,0 +1,181 @@
+"""Keyset (cursor) pagination.
+
+A cursor records the ordering it was issued for and the ordering values of
+the row it points at, primary key last. ``QuerySet.after``/``before`` turn
+it into a seek predicate such as ``("created", "id") > (?, ?)``, so a deep
+page costs the same as the first one instead of scanning past an OFFSET.
+
+Cursors are opaque to clients: the payload is base64url JSON signed with
+HMAC-SHA256 using ``settings.SECRET_KEY``. Without a configured key a
+random per-process key is used and a warning is logged once: such cursors
+fail on other workers and after a restart, so set ``SECRET_KEY`` anywhere
+more than one process serves requests.
+
+Ordering fields must be non-null (the primary key aside): a seek comparison
+against NULL is never true, so ``keyset_ordering`` raises ``ValueError``
+rather than silently skipping those rows.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import secrets
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from neutronapi.encoders import json_dumps_bytes, json_loads
+
+logger = logging.getLogger("neutronapi.pagination")
+
+_SIGNATURE_BYTES = 16
+_FALLBACK_KEY = secrets.token_bytes(32)
+_fallback_warned = False
+
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that are malformed, tampered with or stale."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in an ordered queryset.
+
+    Attributes:
+        ordering: Order expressions the cursor was issued for, e.g.
+            ``("-created", "id")``. The primary key is always last.
+        values: The row's value for each ordering field.
+        previous: True when the cursor pages backwards.
+    """
+
+    ordering: Tuple[str, ...]
+    values: Tuple[Any, ...]
+    previous: bool = False
+
+    @classmethod
+    def for_instance(cls, instance: Any, ordering: Sequence[str], previous: bool = False) -> "Cursor":
+        values = tuple(getattr(instance, expr.lstrip("-")) for expr in ordering)
+        return cls(tuple(ordering), values, previous)
+
+
+@dataclass
+class CursorPage:
+    """One page of results with cursors for its neighbours."""
+
+    items: List[Any]
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _signing_key() -> bytes:
+    from neutronapi.conf import settings
+
+    key = settings.get("SECRET_KEY")
+    if not key:
+        global _fallback_warned
+        if not _fallback_warned:
+            _fallback_warned = True
+            logger.warning(
+                "SECRET_KEY is not set; pagination cursors are signed with a per-process "
+                "key and will be rejected by other workers and after a restart"
+            )
+        return _FALLBACK_KEY
+    return key.encode("utf-8") if isinstance(key, str) else bytes(key)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes, key: bytes) -> bytes:
+    return hmac.new(key, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(cursor: Cursor, key: Optional[bytes] = None) -> str:
+    """Serialize and sign ``cursor`` into a URL-safe token."""
+    payload = json_dumps_bytes(
+        {"o": list(cursor.ordering), "v": list(cursor.values), "p": int(cursor.previous)}
+    )
+    signature = _sign(payload, key or _signing_key())
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def decode_cursor(token: str, key: Optional[bytes] = None) -> Cursor:
+    """Verify and decode a token produced by ``encode_cursor``.
+
+    Raises:
+        InvalidCursor: If the token is malformed or its signature is wrong.
+    """
+    try:
+        encoded_payload, encoded_signature = token.split(".")
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, binascii.Error):
+        raise InvalidCursor("Malformed cursor")
+    if not hmac.compare_digest(signature, _sign(payload, key or _signing_key())):
+        raise InvalidCursor("Cursor signature mismatch")
+
+    try:
+        data = json_loads(payload)
+        ordering = tuple(data["o"])
+        values = tuple(data["v"])
+        previous = bool(data.get("p"))
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if not ordering or len(ordering) != len(values):
+        raise InvalidCursor("Malformed cursor")
+    return Cursor(ordering, values, previous)
+
+
+async def paginate(queryset: Any, cursor: Optional[Cursor] = None, page_size: int = 10) -> CursorPage:
+    """Fetch one page of ``queryset`` starting at ``cursor``.
+
+    Reads ``page_size + 1`` rows to learn whether another page exists, so no
+    COUNT query is issued.
+    """
+    ordering = queryset.keyset_ordering()
+    if cursor is None:
+        qs = queryset.order_by(*ordering)
+    elif cursor.previous:
+        qs = queryset.before(cursor)
+    else:
+        qs = queryset.after(cursor)
+
+    rows = list(await qs.limit(page_size + 1))
+    more = len(rows) > page_size
+    backwards = cursor is not None and cursor.previous
+    if more:
+        # Backward pages come back in natural order; the extra row is first.
+        rows = rows[1:] if backwards else rows[:page_size]
+
+    def token(instance: Any, previous: bool = False) -> str:
+        return encode_cursor(Cursor.for_instance(instance, ordering, previous))
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if more or backwards:
+            next_cursor = token(rows[-1])
+        if (more and backwards) or (cursor is not None and not backwards):
+            previous_cursor = token(rows[0], previous=True)
+    return CursorPage(rows, next_cursor, previous_cursor)
+
+
+__all__ = [
+    "Cursor",
+    "CursorPage",
+    "InvalidCursor",
+    "decode_cursor",
+    "encode_cursor",
+    "paginate",
+]
@@ -1,9 +1,42 @@
+import time
 from abc import ABC, abstractmethod
+from functools import wraps
 from typing import Optional, Dict, List, Any, Tuple
 
+from neutronapi.metrics.registry import DB_QUERIES, DB_QUERY_DURATION, REGISTRY
+
+
+def instrumented(operation: str):
+    """Record a provider call's latency and outcome in the query metrics."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, query: str, params: Tuple = ()):
+            if not REGISTRY.enabled:
+                return await func(self, query, params)
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(self, query, params)
+                outcome = "success"
+                return result
+            finally:
+                DB_QUERY_DURATION.labels(self.engine, operation).observe(time.perf_counter() - started)
+                DB_QUERIES.labels(self.engine, operation, outcome).inc()
+
+        return wrapper
+
+    return decorator
+
 
 class BaseProvider(ABC):
-    """Base database provider interface."""
+    """Base database provider interface.
+
+    Implementations decorate ``execute``/``fetchone``/``fetchall`` with
+    ``instrumented`` so query metrics are labelled with ``engine``.
+    """
+
+    engine: str = "unknown"
 
     def __init__(self, config: Dict[str, Any]):
         self.config = config
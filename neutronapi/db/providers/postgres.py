@@ -2,7 +2,7 @@ import json
 import datetime
 from typing import Optional, Dict, List, Any, Tuple
 
-from .base import BaseProvider
+from .base import BaseProvider, instrumented
 
 
 class PostgreSQLProvider(BaseProvider):
@@ -12,6 +12,8 @@ class PostgreSQLProvider(BaseProvider):
     app label as PostgreSQL schema and table_base_name as the table name.
     """
 
+    engine = "postgres"
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._pool = None
@@ -96,17 +98,20 @@ class PostgreSQLProvider(BaseProvider):
         async with self._pool_lock:
             await self._close_pool_nolock()
 
+    @instrumented("execute")
     async def execute(self, query: str, params: Tuple = ()) -> Any:
         pool = await self._get_pool()
         async with pool.acquire() as conn:
             return await conn.execute(query, *params)
 
+    @instrumented("fetchone")
     async def fetchone(self, query: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
         pool = await self._get_pool()
         async with pool.acquire() as conn:
             row = await conn.fetchrow(query, *params)
             return dict(row) if row else None
 
+    @instrumented("fetchall")
     async def fetchall(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
         pool = await self._get_pool()
         async with pool.acquire() as conn:
@@ -3,12 +3,14 @@ import datetime
 import re
 from typing import Optional, Dict, List, Any, Tuple
 
-from .base import BaseProvider
+from .base import BaseProvider, instrumented
 
 
 class SQLiteProvider(BaseProvider):
     """Async SQLite provider using aiosqlite with built-in schema operations."""
 
+    engine = "sqlite"
+
     async def _ensure_connected(self):
         if getattr(self, 'conn', None) is None:
             await self.connect()
@@ -66,6 +68,7 @@ class SQLiteProvider(BaseProvider):
             await self.conn.close()
             self.conn = None
 
+    @instrumented("execute")
     async def execute(self, query: str, params: Tuple = ()) -> Any:
         await self._ensure_connected()
         sqlite_query = self._convert_postgres_params(query)
@@ -78,6 +81,7 @@ class SQLiteProvider(BaseProvider):
         query = query.replace(' ILIKE ', ' LIKE ').replace(' NOT ILIKE ', ' NOT LIKE ')
         return re.sub(r'\$\d+', lambda m: '?', query)
 
+    @instrumented("fetchone")
     async def fetchone(self, query: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
         await self._ensure_connected()
         sqlite_query = self._convert_postgres_params(query)
@@ -86,6 +90,7 @@ class SQLiteProvider(BaseProvider):
         row = await cursor.fetchone()
         return dict(row) if row else None
 
+    @instrumented("fetchall")
     async def fetchall(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
         await self._ensure_connected()
         sqlite_query = self._convert_postgres_params(query)
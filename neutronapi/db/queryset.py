@@ -6,7 +6,7 @@ except Exception:  # pragma: no cover
     np = None
 import os
 import re
-from typing import Optional, Dict, List, Any, Union, TypeVar, Generic, TYPE_CHECKING
+from typing import Optional, Dict, List, Any, Tuple, Union, TypeVar, Generic, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .models import Model
@@ -92,6 +92,7 @@ class QuerySet(Generic[T]):
         self._values_flat = False
         self._result_cache = None
         self._search_order_by_rank = False
+        self._reverse_results = False
         
         # Will be determined when we get the provider
         self._is_sqlite = None
@@ -234,6 +235,82 @@ class QuerySet(Generic[T]):
         qs._search_order_by_rank = True
         return qs
 
+    def keyset_ordering(self) -> Tuple[str, ...]:
+        """Return the ordering as expressions with the primary key appended.
+
+        The primary key makes the ordering total, which keyset pagination
+        needs to seek past rows that share the same ordering values. Nullable
+        fields are rejected: a seek comparison against NULL is never true, so
+        those rows would be skipped between pages.
+        """
+        pk_name = self._pk_name()
+        ordering = []
+        for order_item in self._order_by:
+            field_name = order_item['field']
+            field = self.model._neutronapi_fields_.get(field_name)
+            if field is None:
+                raise ValueError(
+                    f"Keyset pagination requires ordering by model fields, got '{field_name}'"
+                )
+            if field.null and field_name != pk_name:
+                raise ValueError(
+                    f"Keyset pagination cannot order by nullable field '{field_name}'"
+                )
+            prefix = '-' if order_item['direction'] == 'DESC' else ''
+            ordering.append(f"{prefix}{field_name}")
+        if not any(expr.lstrip('-') == pk_name for expr in ordering):
+            last_desc = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append(f"{'-' if last_desc else ''}{pk_name}")
+        return tuple(ordering)
+
+    def _orders_by_nullable_field(self) -> bool:
+        pk_name = self._pk_name()
+        fields = self.model._neutronapi_fields_
+        return any(
+            item['field'] != pk_name and getattr(fields.get(item['field']), 'null', False)
+            for item in self._order_by
+        )
+
+    def after(self, cursor) -> 'QuerySet':
+        """Return rows strictly after ``cursor`` in the queryset's ordering.
+
+        ``cursor`` is a ``Cursor`` or a token from ``encode_cursor``. When the
+        queryset has no ordering, the cursor's ordering is applied.
+        """
+        return self._seek(cursor, backwards=False)
+
+    def before(self, cursor) -> 'QuerySet':
+        """Return rows strictly before ``cursor``, still in natural order."""
+        return self._seek(cursor, backwards=True)
+
+    def _seek(self, cursor, backwards: bool) -> 'QuerySet':
+        from .pagination import InvalidCursor, decode_cursor
+
+        if isinstance(cursor, str):
+            cursor = decode_cursor(cursor)
+        qs = self if self._order_by else self.order_by(*cursor.ordering)
+        ordering = qs.keyset_ordering()
+        if tuple(cursor.ordering) != ordering:
+            raise InvalidCursor("Cursor does not match the queryset ordering")
+
+        qs = qs._clone()
+        # Walk backwards by flipping the ordering; results are reversed on fetch.
+        qs._order_by = []
+        for expr in ordering:
+            descending = expr.startswith('-') != backwards
+            qs._order_by.append({
+                'field': expr.lstrip('-'),
+                'direction': 'DESC' if descending else 'ASC',
+            })
+        qs._reverse_results = backwards
+        qs._filters.append({
+            'type': 'keyset',
+            'fields': [item['field'] for item in qs._order_by],
+            'directions': [item['direction'] for item in qs._order_by],
+            'values': list(cursor.values),
+        })
+        return qs
+
     def limit(self, count: int) -> 'QuerySet':
         qs = self._clone()
         qs._limit_count = count
@@ -331,6 +408,9 @@ class QuerySet(Generic[T]):
         sql, params = self._build_query()
         results = await provider.fetchall(sql, tuple(params))
 
+        if self._reverse_results:
+            results = list(reversed(results))
+
         if not self._values_mode:
             return [self._deserialize_result(result) for result in results if result]
 
@@ -437,6 +517,46 @@ class QuerySet(Generic[T]):
         for item in results:
             yield item
 
+    async def iter_batches(self, batch_size: int = 500):
+        """Yield results in lists of up to ``batch_size`` without loading them all.
+
+        Each batch after the first is a keyset seek past the previous batch's
+        last row (see ``after()``), so batches stay cheap on large tables and
+        no server-side cursor is held open between them. ``limit()`` and
+        ``offset()`` apply to the whole iteration. Querysets from ``before()``,
+        whose rows come back reversed, and querysets ordered by a nullable
+        field, which cannot be seeked (see ``keyset_ordering()``), are read in
+        a single query.
+        """
+        if self._values_mode:
+            raise TypeError("Cannot call iter_batches() after values() or values_list()")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if self._reverse_results or self._orders_by_nullable_field():
+            results = await self._fetch_all()
+            for start in range(0, len(results), batch_size):
+                yield results[start:start + batch_size]
+            return
+
+        from .pagination import Cursor
+
+        ordering = self.keyset_ordering()
+        qs = self.order_by(*ordering)
+        rest = qs._clone()
+        rest._offset_count = None
+        remaining = self._limit_count
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            batch = await qs.limit(size)._fetch_all()
+            if not batch:
+                return
+            yield batch
+            if len(batch) < size:
+                return
+            if remaining is not None:
+                remaining -= len(batch)
+            qs = rest.after(Cursor.for_instance(batch[-1], ordering))
+
     async def get(self, *args, **kwargs) -> T:
         if self._values_mode:
             raise TypeError("Cannot call get() after values() or values_list()")
@@ -768,6 +888,7 @@ class QuerySet(Generic[T]):
         qs._values_mode = self._values_mode
         qs._values_fields = self._values_fields.copy()
         qs._values_flat = self._values_flat
+        qs._reverse_results = self._reverse_results
         # Copy provider-specific state
         qs.table = self.table
         qs.provider = self.provider
@@ -796,12 +917,59 @@ class QuerySet(Generic[T]):
                     all_conditions.append(f"({search_condition})")
                     all_params.extend(search_params)
                     param_counter += len(search_params)
+            elif filter_item.get('type') == 'keyset':
+                keyset_condition, keyset_params = self._build_keyset_condition(filter_item, param_counter)
+                all_conditions.append(f"({keyset_condition})")
+                all_params.extend(keyset_params)
+                param_counter += len(keyset_params)
 
         if not all_conditions:
             return "", []
 
         return " AND ".join(all_conditions), all_params
 
+    def _build_keyset_condition(self, keyset: dict, param_start: int) -> tuple:
+        """Build the seek predicate for ``after()``/``before()``.
+
+        A uniform direction becomes one row-value comparison, which both
+        PostgreSQL and SQLite can satisfy from a composite index. Mixed
+        directions expand to ``a > ? OR (a = ? AND b < ?) ...``.
+        """
+        model_fields = self.model._neutronapi_fields_
+        columns = [self._quote_identifier(name) for name in keyset['fields']]
+        values = []
+        for name, value in zip(keyset['fields'], keyset['values']):
+            field = model_fields[name]
+            db_value = field.to_db(value)
+            if self.provider and hasattr(self.provider, 'convert_query_param'):
+                db_value = self.provider.convert_query_param(db_value, field)
+            values.append(db_value)
+
+        param_counter = param_start
+
+        def placeholder():
+            nonlocal param_counter
+            if self._is_sqlite:
+                return '?'
+            param_counter += 1
+            return f'${param_counter - 1}'
+
+        directions = keyset['directions']
+        if len(set(directions)) == 1:
+            op = '>' if directions[0] == 'ASC' else '<'
+            placeholders = ', '.join(placeholder() for _ in values)
+            return f"({', '.join(columns)}) {op} ({placeholders})", values
+
+        branches = []
+        params = []
+        for index, direction in enumerate(directions):
+            terms = [f"{columns[i]} = {placeholder()}" for i in range(index)]
+            op = '>' if direction == 'ASC' else '<'
+            terms.append(f"{columns[index]} {op} {placeholder()}")
+            params.extend(values[:index + 1])
+            branches.append(f"({' AND '.join(terms)})")
+        return " OR ".join(branches), params
+
     def _build_search_condition(self, search_info: dict, param_start: int) -> tuple:
         """Build search condition using database-specific full-text search.
 
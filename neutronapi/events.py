@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 
 
 @dataclass(frozen=True)
@@ -42,6 +42,7 @@ class RequestCompleted(RequestEvent):
     idempotency_key: Optional[str] = None
     geo: Optional[str] = None
     error: Optional[str] = None
+    phases: Optional[Dict[str, float]] = None
 
 
 @dataclass(frozen=True)
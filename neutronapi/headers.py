@@ -0,0 +1,108 @@
+"""Request header index shared by middleware, parsers and API handlers.
+
+ASGI delivers request headers as a list of ``(name, value)`` byte pairs. The
+first component that needs them builds a ``Headers`` index and stores it on the
+scope, so the list is walked once per request however many layers look up a
+header.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+HEADERS_SCOPE_KEY = "_neutronapi_headers"
+
+RawHeaders = Iterable[Tuple[bytes, bytes]]
+
+
+class Headers(Mapping[bytes, bytes]):
+    """Case-insensitive, multi-value view over raw ASGI request headers.
+
+    Mapping access returns the first value sent for a name; ``getlist`` returns
+    every value in the order received.
+    """
+
+    __slots__ = ("raw", "_index")
+
+    def __init__(self, raw: RawHeaders = ()) -> None:
+        self.raw = raw
+        index: Dict[bytes, List[bytes]] = {}
+        for name, value in raw:
+            index.setdefault(name.lower(), []).append(value)
+        self._index = index
+
+    def __getitem__(self, name: bytes) -> bytes:
+        return self._index[name.lower()][0]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, bytes) and name.lower() in self._index
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, name: bytes, default: Any = None) -> Any:
+        values = self._index.get(name.lower())
+        return values[0] if values else default
+
+    def getlist(self, name: bytes) -> List[bytes]:
+        return list(self._index.get(name.lower(), ()))
+
+    def get_text(self, name: bytes) -> Optional[str]:
+        """Return the first value decoded and stripped, or None when empty."""
+        value = self.get(name)
+        if not value:
+            return None
+        decoded = value.decode("utf-8", "ignore").strip()
+        return decoded or None
+
+    def __repr__(self) -> str:
+        return f"Headers({list(self.raw)!r})"
+
+
+def get_headers(scope: Dict[str, Any]) -> Headers:
+    """Return the request's ``Headers`` index, building and caching it once.
+
+    The cache is keyed on the identity of ``scope["headers"]`` so a middleware
+    that swaps in a new header list gets a fresh index.
+    """
+    raw = scope.get("headers") or ()
+    cached = scope.get(HEADERS_SCOPE_KEY)
+    if cached is not None and cached.raw is raw:
+        return cached
+    headers = Headers(raw)
+    scope[HEADERS_SCOPE_KEY] = headers
+    return headers
+
+
+def get_header(
+    scope: Dict[str, Any], name: bytes, default: Optional[bytes] = None
+) -> Optional[bytes]:
+    """Return the first value of request header ``name``."""
+    return get_headers(scope).get(name, default)
+
+
+def merge_headers(
+    existing: List[Tuple[bytes, bytes]],
+    extra: List[Tuple[bytes, bytes]],
+) -> List[Tuple[bytes, bytes]]:
+    """Return ``existing`` with ``extra`` appended, replacing same-named headers."""
+    if not extra:
+        return list(existing)
+
+    overrides: Dict[bytes, Tuple[bytes, bytes]] = {
+        name.lower(): (name, value)
+        for name, value in extra
+    }
+    merged = [
+        (name, value)
+        for name, value in existing
+        if name.lower() not in overrides
+    ]
+    merged.extend(overrides.values())
+    return merged
+
+
+__all__ = ["HEADERS_SCOPE_KEY", "Headers", "get_header", "get_headers", "merge_headers"]
@@ -9,6 +9,8 @@ from dataclasses import dataclass
 from typing import Optional
 
 from neutronapi.base import Response
+from neutronapi.headers import get_headers
+from neutronapi.middleware.pipeline import Middleware
 
 
 @dataclass(frozen=True)
@@ -95,13 +97,13 @@ class InMemoryIdempotencyStore(IdempotencyStore):
             self._entries.pop(key, None)
 
 
-class IdempotencyMiddleware:
+class IdempotencyMiddleware(Middleware):
     """Replay completed mutating requests and reject in-flight duplicates."""
 
     MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
 
     def __init__(self, app=None, *, store: IdempotencyStore, ttl: int = 86400):
-        self.app = app
+        super().__init__(app)
         self.store = store
         self.ttl = ttl
 
@@ -150,21 +152,19 @@ class IdempotencyMiddleware:
         )
         await response(scope, receive, send)
 
-    async def __call__(self, scope, receive, send):
-        if scope["type"] != "http" or scope.get("method") not in self.MUTATING_METHODS:
-            await self.app(scope, receive, send)
-            return
+    async def on_request(self, scope, exchange):
+        if scope.get("method") not in self.MUTATING_METHODS:
+            return None
 
-        headers = dict(scope.get("headers", []))
+        headers = get_headers(scope)
         key = (headers.get(b"idempotency-key") or b"").decode("utf-8", "ignore").strip()
         if not key:
-            await self.app(scope, receive, send)
-            return
+            return None
 
         # Reject oversized keys to prevent memory abuse
         max_len = getattr(self.store, "MAX_KEY_LENGTH", 256)
         if len(key) > max_len:
-            response = Response(
+            return Response(
                 body={
                     "error": {
                         "type": "invalid_request_error",
@@ -173,47 +173,58 @@ class IdempotencyMiddleware:
                 },
                 status_code=400,
             )
-            await response(scope, receive, send)
-            return
 
         cached = await self.store.get(key)
         if cached is not None:
-            await self._send_cached_response(send, key, cached)
-            return
+            return self._replay(key, cached)
 
         reserved = await self.store.reserve(key, self.ttl)
         if not reserved:
             cached = await self.store.get(key)
             if cached is not None:
-                await self._send_cached_response(send, key, cached)
-                return
+                return self._replay(key, cached)
+            return self._conflict(key)
+
+        exchange.state[self] = {"key": key, "status": 200, "headers": [], "body": bytearray(), "complete": False}
+        return None
+
+    def _replay(self, key: str, cached: CachedResponse):
+        async def replay(scope, receive, send):
+            await self._send_cached_response(send, key, cached)
+
+        return replay
+
+    def _conflict(self, key: str):
+        async def conflict(scope, receive, send):
             await self._send_conflict(scope, receive, send, key)
-            return
 
-        captured = {"status": 200, "headers": [], "body": bytearray(), "complete": False}
-
-        async def capture_send(message):
-            if message["type"] == "http.response.start":
-                headers_out = self._merge_headers(
-                    list(message.get("headers", [])),
-                    [(b"idempotency-key", key.encode("utf-8"))],
-                )
-                captured["status"] = message["status"]
-                captured["headers"] = list(headers_out)
-                message = {**message, "headers": headers_out}
-            elif message["type"] == "http.response.body":
-                captured["body"].extend(message.get("body", b""))
-                if not message.get("more_body", False):
-                    captured["complete"] = True
-            await send(message)
-
-        try:
-            await self.app(scope, receive, capture_send)
-        except Exception:
-            await self.store.release(key)
-            raise
-
-        if 200 <= captured["status"] < 300 and captured["complete"]:
+        return conflict
+
+    def on_response_start(self, scope, exchange):
+        captured = exchange.state.get(self)
+        if captured is None:
+            return
+        exchange.headers[:] = self._merge_headers(
+            exchange.headers,
+            [(b"idempotency-key", captured["key"].encode("utf-8"))],
+        )
+        captured["status"] = exchange.status
+        captured["headers"] = list(exchange.headers)
+
+    def on_body(self, scope, exchange, body, more_body):
+        captured = exchange.state.get(self)
+        if captured is not None:
+            captured["body"].extend(body)
+            if not more_body:
+                captured["complete"] = True
+        return body
+
+    async def on_complete(self, scope, exchange, error):
+        captured = exchange.state.get(self)
+        if captured is None:
+            return
+        key = captured["key"]
+        if error is None and 200 <= captured["status"] < 300 and captured["complete"]:
             await self.store.complete(
                 key,
                 CachedResponse(
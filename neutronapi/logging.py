@@ -33,6 +33,7 @@ class EventFormatter(logging.Formatter):
             "idempotency_key",
             "geo",
             "error",
+            "phases",
             "retry_after",
             "limit",
             "remaining",
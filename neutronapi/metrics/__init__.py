@@ -0,0 +1,51 @@
+"""Built-in metrics: counters, gauges, histograms and Prometheus exposition.
+
+Request metrics are recorded by ``RequestLoggingMiddleware``, task metrics by
+``Background`` and query metrics by the database providers, all into
+``REGISTRY``. Mount ``MetricsAPI`` to serve them; set
+``METRICS_MULTIPROCESS_DIR`` to aggregate across worker processes.
+"""
+
+from importlib import import_module
+
+from neutronapi.metrics.multiprocess import MultiProcessCollector, default_collector, merge_snapshots
+from neutronapi.metrics.registry import (
+    CONTENT_TYPE,
+    DEFAULT_BUCKETS,
+    REGISTRY,
+    ROUTE_SCOPE_KEY,
+    UNMATCHED_ROUTE,
+    Counter,
+    Gauge,
+    Histogram,
+    Metric,
+    MetricsRegistry,
+    render_snapshot,
+)
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "DEFAULT_BUCKETS",
+    "Gauge",
+    "Histogram",
+    "Metric",
+    "MetricsAPI",
+    "MetricsRegistry",
+    "MultiProcessCollector",
+    "REGISTRY",
+    "ROUTE_SCOPE_KEY",
+    "UNMATCHED_ROUTE",
+    "default_collector",
+    "merge_snapshots",
+    "render_snapshot",
+]
+
+
+def __getattr__(name: str):
+    # MetricsAPI imports neutronapi.base, which itself imports this package.
+    if name == "MetricsAPI":
+        value = import_module("neutronapi.metrics.api").MetricsAPI
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'neutronapi.metrics' has no attribute '{name}'")
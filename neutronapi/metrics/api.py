@@ -0,0 +1,54 @@
+"""Mountable API serving metrics in the Prometheus text format."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from neutronapi.base import API
+from neutronapi.metrics.multiprocess import MultiProcessCollector, default_collector
+from neutronapi.metrics.registry import CONTENT_TYPE, REGISTRY, MetricsRegistry
+
+
+class MetricsAPI(API):
+    """``GET /metrics`` for Prometheus scrapers.
+
+    Renders ``collector`` when given (or the collector configured by
+    ``METRICS_MULTIPROCESS_DIR``) so every worker's series are included;
+    otherwise renders ``registry`` for this process only. Metrics are only
+    recorded for an ``Application(metrics=True)``.
+
+    The endpoint is unauthenticated by default and exposes route templates and
+    database labels. Pass ``authentication_class``, ``permission_classes`` or
+    ``hosts`` unless it is only reachable by the scraper.
+
+    Example:
+        app = Application(
+            apis=[UsersAPI(), MetricsAPI(authentication_class=ScraperAuth())],
+            metrics=True,
+        )
+    """
+
+    resource = "/metrics"
+    name = "metrics"
+    hidden = True
+
+    def __init__(
+        self,
+        *,
+        registry: Optional[MetricsRegistry] = None,
+        collector: Optional[MultiProcessCollector] = None,
+        **kwargs: Any,
+    ) -> None:
+        # ``registry`` is taken: Application injects its DI registry there.
+        self.metrics_registry = registry or REGISTRY
+        self.collector = collector
+        super().__init__(**kwargs)
+
+    @API.endpoint("/", methods=["GET"], name="metrics")
+    async def metrics(self, scope, receive, send, **kwargs):
+        collector = self.collector or default_collector()
+        body = collector.render() if collector is not None else self.metrics_registry.render()
+        return await self.response(body.encode("utf-8"), media_type=CONTENT_TYPE)
+
+
+__all__ = ["MetricsAPI"]
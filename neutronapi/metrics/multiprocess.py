@@ -0,0 +1,148 @@
+"""Aggregate metrics across worker processes.
+
+Each uvicorn worker holds its own registry in memory, so a scrape served by
+one worker would only see that worker's traffic. ``MultiProcessCollector``
+has every worker write a snapshot of its registry to a shared directory
+(``<pid>.json``, replaced atomically) every ``interval`` seconds and on
+shutdown; rendering merges all snapshots. Counters and histograms are summed,
+gauges combine according to their ``aggregate`` setting.
+
+Snapshots of exited workers are kept so their totals do not vanish from the
+counters; empty the directory when deploying a new release.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from neutronapi.encoders import json_dumps_bytes, json_loads
+from neutronapi.metrics.registry import REGISTRY, MetricsRegistry, render_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_value(kind: str, aggregate: str, current: Any, value: Any) -> Any:
+    if kind == "histogram":
+        counts = [left + right for left, right in zip(current[0], value[0])]
+        return [counts, current[1] + value[1]]
+    if kind == "gauge" and aggregate == "max":
+        return max(current, value)
+    if kind == "gauge" and aggregate == "min":
+        return min(current, value)
+    return current + value
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine registry snapshots from several processes into one."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                merged[name] = {**metric, "samples": {tuple(k): v for k, v in metric["samples"]}}
+                continue
+            if target["type"] != metric["type"] or target.get("buckets") != metric.get("buckets"):
+                logger.warning("Skipping metric %s with a conflicting definition", name)
+                continue
+            samples = target["samples"]
+            for key, value in metric["samples"]:
+                key = tuple(key)
+                samples[key] = (
+                    value
+                    if key not in samples
+                    else _merge_value(metric["type"], metric.get("aggregate", "sum"), samples[key], value)
+                )
+    for metric in merged.values():
+        metric["samples"] = [(list(key), value) for key, value in metric["samples"].items()]
+    return merged
+
+
+class MultiProcessCollector:
+    """Share a registry through snapshot files in ``directory``."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        registry: Optional[MetricsRegistry] = None,
+        *,
+        interval: float = 5.0,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        self.directory = Path(directory)
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{os.getpid()}.json"
+
+    def write(self) -> None:
+        """Write this process's snapshot, replacing the previous one."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(json_dumps_bytes(self.registry.snapshot()))
+        os.replace(tmp, self.path)
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Merge the snapshots of every process, including a fresh one of this process."""
+        self.write()
+        snapshots = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                snapshots.append(json_loads(path.read_bytes()))
+            except (OSError, ValueError):
+                # A file may vanish or be mid-rename; it is picked up next scrape.
+                continue
+        return merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        return render_snapshot(self.collect())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Failed to write metrics snapshot to %s", self.directory)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self.write()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.write()
+
+
+_default_collector: Optional[MultiProcessCollector] = None
+
+
+def default_collector() -> Optional[MultiProcessCollector]:
+    """The collector for ``settings.METRICS_MULTIPROCESS_DIR``, or None when unset."""
+    global _default_collector
+    from neutronapi.conf import settings
+
+    directory = settings.get("METRICS_MULTIPROCESS_DIR")
+    if not directory:
+        return None
+    if _default_collector is None or _default_collector.directory != Path(directory):
+        _default_collector = MultiProcessCollector(
+            directory, interval=settings.get("METRICS_FLUSH_INTERVAL", 5.0)
+        )
+    return _default_collector
+
+
+__all__ = ["MultiProcessCollector", "default_collector", "merge_snapshots"]
@@ -0,0 +1,384 @@
+"""Counters, gauges and fixed-bucket histograms with Prometheus text output.
+
+Metrics are updated without locks: each labelled series is a small object
+whose fields are bumped in place, and the series lookup is a single dict
+access. NeutronAPI updates metrics from the event loop thread, so no two
+updates interleave; code that records from other threads should accept that
+a concurrent increment may occasionally be lost.
+
+Labels should come from a bounded set (HTTP method, route template, status,
+task name), never from raw paths or user input: every distinct label
+combination is a series held in memory and exported on every scrape.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+ROUTE_SCOPE_KEY = "_neutronapi_route"
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Request methods get their own label value; any other token a client sends
+# is counted as OTHER so it cannot create new series.
+HTTP_METHOD_LABELS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+OTHER_METHOD = "OTHER"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_GAUGE_AGGREGATES = ("sum", "max", "min")
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bound plus +Inf; counts are per bucket, not cumulative.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class Metric:
+    """A named metric and its labelled series."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._series[()] = self._new_value()
+
+    def _new_value(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """Return the series for ``values``, given in ``labelnames`` order."""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {len(values)} value(s)"
+                )
+            key = tuple(str(value) for value in values)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_value()
+            if key != values:
+                self._series[values] = series
+        return series
+
+    def clear(self) -> None:
+        """Drop every series (unlabelled metrics are reset to zero)."""
+        self._series.clear()
+        if not self.labelnames:
+            self._series[()] = self._new_value()
+
+    def _samples(self) -> List[Tuple[List[str], Any]]:
+        # Series cached under non-str label values are aliases; export each once.
+        return [
+            (list(key), self._dump(series))
+            for key, series in self._series.items()
+            if all(type(value) is str for value in key)
+        ]
+
+    def _dump(self, series: Any) -> Any:
+        return series.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self._samples(),
+        }
+
+
+class Counter(Metric):
+    """Monotonically increasing total."""
+
+    type = "counter"
+
+    def _new_value(self) -> _CounterValue:
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._series[()].inc(amount)
+
+
+class Gauge(Metric):
+    """Value that goes up and down.
+
+    ``aggregate`` decides how values from several worker processes combine:
+    ``"sum"`` (in-flight requests, pool sizes), ``"max"`` or ``"min"``.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        aggregate: str = "sum",
+    ) -> None:
+        if aggregate not in _GAUGE_AGGREGATES:
+            raise ValueError(
+                f"Invalid gauge aggregate {aggregate!r}; expected one of {', '.join(_GAUGE_AGGREGATES)}"
+            )
+        self.aggregate = aggregate
+        super().__init__(name, documentation, labelnames)
+
+    def _new_value(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._series[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._series[()].dec(amount)
+
+    def set(self, value: float) -> None:
+        self._series[()].set(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "aggregate": self.aggregate}
+
+
+class Histogram(Metric):
+    """Observations counted into fixed, upper-inclusive buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        bounds = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        if not bounds:
+            raise ValueError("Histograms need at least one finite bucket")
+        self.buckets = bounds
+        super().__init__(name, documentation, labelnames)
+
+    def _new_value(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._series[()].observe(value)
+
+    def _dump(self, series: _HistogramValue) -> Any:
+        return [list(series.counts), series.sum]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """A named collection of metrics.
+
+    Registering a name again returns the existing metric when its type and
+    labels match, so modules can declare the metrics they update at import
+    time without coordinating.
+
+    The built-in task and query instrumentation only records into a registry
+    while ``enabled`` is true; ``Application(metrics=True)`` enables
+    ``REGISTRY``.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self.enabled = False
+
+    def _register(self, cls: type, name: str, documentation: str, labelnames: Sequence[str], **options: Any) -> Any:
+        existing = self._metrics.get(name)
+        if existing is not None:
+            if type(existing) is not cls or existing.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name!r} is already registered with a different type or labels")
+            return existing
+        metric = self._metrics[name] = cls(name, documentation, labelnames, **options)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), *, aggregate: str = "sum"
+    ) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames, aggregate=aggregate)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def clear(self) -> None:
+        """Reset every metric's series, keeping the registrations."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Plain-data copy of every metric, suitable for JSON."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        return render_snapshot(self.snapshot())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render_snapshot(snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Render a ``MetricsRegistry.snapshot()`` (or a merged one) as Prometheus text."""
+    lines: List[str] = []
+    for name, metric in snapshot.items():
+        documentation = metric["help"].replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for values, sample in sorted(metric["samples"], key=lambda item: item[0]):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_label_text(labelnames, values)} {_format_value(sample)}")
+                continue
+            counts, total = sample
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], math.inf], counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{name}_bucket{_label_text(labelnames, values, le)} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labelnames, values)} {_format_value(total)}")
+            lines.append(f"{name}_count{_label_text(labelnames, values)} {cumulative}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def method_label(method: str) -> str:
+    """Return the ``method`` label value for a request method."""
+    return method if method in HTTP_METHOD_LABELS else OTHER_METHOD
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "neutronapi_http_requests_total",
+    "HTTP requests completed, by method, route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "neutronapi_http_request_duration_seconds",
+    "HTTP request latency in seconds, by method and route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "neutronapi_http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+TASK_RUNS = REGISTRY.counter(
+    "neutronapi_task_runs_total",
+    "Background task runs, by task name and outcome.",
+    ("task", "outcome"),
+)
+TASK_DURATION = REGISTRY.histogram(
+    "neutronapi_task_duration_seconds",
+    "Background task run time in seconds, by task name.",
+    ("task",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+DB_QUERIES = REGISTRY.counter(
+    "neutronapi_db_queries_total",
+    "Database provider calls, by engine, operation and outcome.",
+    ("engine", "operation", "outcome"),
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "neutronapi_db_query_duration_seconds",
+    "Database provider call latency in seconds, by engine and operation.",
+    ("engine", "operation"),
+)
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "DEFAULT_BUCKETS",
+    "Gauge",
+    "Histogram",
+    "Metric",
+    "MetricsRegistry",
+    "REGISTRY",
+    "ROUTE_SCOPE_KEY",
+    "UNMATCHED_ROUTE",
+    "render_snapshot",
+]
@@ -1,15 +1,27 @@
 """Built-in middleware exports."""
 
+from neutronapi.middleware.coalescing import CoalescingMiddleware
 from neutronapi.middleware.geo import (
     BaseGeoMiddleware,
     CloudflareGeoMiddleware,
     MaxMindGeoMiddleware,
 )
 from neutronapi.middleware.request_logging import RequestLoggingMiddleware
+from neutronapi.middleware.response_cache import (
+    CachePolicy,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    get_response_cache,
+)
 
 __all__ = [
     "BaseGeoMiddleware",
+    "CoalescingMiddleware",
     "CloudflareGeoMiddleware",
     "MaxMindGeoMiddleware",
     "RequestLoggingMiddleware",
+    "CachePolicy",
+    "ResponseCache",
+    "ResponseCacheMiddleware",
+    "get_response_cache",
 ]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import logging
-from typing import Callable, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from neutronapi.conf import settings
+from neutronapi.headers import get_headers
+from neutronapi.middleware.pipeline import Middleware
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +38,92 @@ def is_host_allowed(host: str, allowed_hosts: List[str]) -> bool:
     return False
 
 
-class AllowedHostsMiddleware:
+class _HostNode:
+    __slots__ = ("children", "subdomains", "apex")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _HostNode] = {}
+        self.subdomains: List[Any] = []
+        self.apex: List[Any] = []
+
+
+class HostMatcher:
+    """Precomputed index of host patterns, matching ``is_host_allowed``.
+
+    Exact hosts live in a dict and ``.domain``/``*.domain`` patterns in a trie
+    keyed by reversed DNS labels, so a lookup costs one dict probe plus one
+    step per label of the host. Results are memoized per host in a bounded
+    cache.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), *, cache_size: int = 1024) -> None:
+        self._any: List[Any] = []
+        self._exact: Dict[str, List[Any]] = {}
+        self._root = _HostNode()
+        self._cache: Dict[str, Tuple[Any, ...]] = {}
+        self.cache_size = cache_size
+        for pattern in patterns:
+            self.add(pattern, True)
+
+    def add(self, pattern: str, value: Any) -> None:
+        """Register ``value`` for hosts matching ``pattern``."""
+        self._cache.clear()
+        if pattern == "*":
+            self._any.append(value)
+            return
+        self._exact.setdefault(pattern, []).append(value)
+        if pattern.startswith("*."):
+            node = self._node_for(pattern[2:])
+            node.subdomains.append(value)
+            node.apex.append(value)
+        elif pattern.startswith("."):
+            self._node_for(pattern[1:]).subdomains.append(value)
+
+    def _node_for(self, domain: str) -> _HostNode:
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.children.setdefault(label, _HostNode())
+        return node
+
+    def _collect(self, host: str, found: Dict[int, Any]) -> None:
+        for value in self._exact.get(host, ()):
+            found.setdefault(id(value), value)
+        labels = host.split(".")
+        remaining = len(labels)
+        node = self._root
+        for label in reversed(labels):
+            node = node.children.get(label)
+            if node is None:
+                return
+            remaining -= 1
+            for value in node.subdomains if remaining else node.apex:
+                found.setdefault(id(value), value)
+
+    def match(self, host: str) -> Tuple[Any, ...]:
+        """Return every value whose pattern matches ``host``."""
+        cached = self._cache.get(host)
+        if cached is not None:
+            return cached
+        found: Dict[int, Any] = {id(value): value for value in self._any}
+        self._collect(host, found)
+        host_without_port = host.split(":")[0]
+        if host_without_port != host:
+            self._collect(host_without_port, found)
+        result = tuple(found.values())
+        if len(self._cache) >= self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[host] = result
+        return result
+
+    def allows(self, host: str) -> bool:
+        return bool(self.match(host))
+
+
+class AllowedHostsMiddleware(Middleware):
     """ALLOWED_HOSTS validation middleware."""
 
+    scope_types = ("http", "websocket")
+
     def __init__(
         self,
         app: Callable | None = None,
@@ -46,52 +131,54 @@ class AllowedHostsMiddleware:
         *,
         debug: bool | None = None,
     ):
-        self.app = app
+        super().__init__(app)
         self._custom_allowed_hosts = allowed_hosts
+        self._matcher: HostMatcher | None = None
+        self._matcher_patterns: Tuple[str, ...] = ()
         self.debug = settings.get("DEBUG", False) if debug is None else debug
 
     def get_allowed_hosts(self) -> List[str]:
         """Get the allowed hosts list. Can be patched in tests."""
         return self._custom_allowed_hosts or settings.get("ALLOWED_HOSTS", ["*"])
 
-    async def __call__(self, scope: Dict, receive: Callable, send: Callable, **kwargs):
-        scope_type = scope["type"]
-
+    async def on_request(self, scope: Dict, exchange) -> Optional[Callable]:
         # Validate Host header for both HTTP and WebSocket connections
-        if scope_type in ("http", "websocket"):
-            headers = dict(scope.get("headers", []))
-            host_header = headers.get(b"host")
-
-            if not host_header:
-                if not self.debug:
-                    if scope_type == "websocket":
-                        await send({"type": "websocket.close", "code": 4003})
-                        return
-                    await self.send_error_response(
-                        send, 400, "Bad Request: Missing Host header"
-                    )
-                    return
-                else:
-                    logger.warning(
-                        "AllowedHostsMiddleware: request with missing Host header "
-                        "passed through in debug mode. This would be rejected in production."
-                    )
-            else:
-                host = host_header.decode("utf-8", "ignore")
-                if not self.is_host_allowed(host, self.get_allowed_hosts()):
-                    if scope_type == "websocket":
-                        await send({"type": "websocket.close", "code": 4003})
-                        return
-                    await self.send_error_response(
-                        send, 400, "Bad Request: Invalid Host header"
-                    )
-                    return
-
-        await self.app(scope, receive, send, **kwargs)
+        headers = get_headers(scope)
+        host_header = headers.get(b"host")
+
+        if not host_header:
+            if not self.debug:
+                return self._reject(scope, "Bad Request: Missing Host header")
+            logger.warning(
+                "AllowedHostsMiddleware: request with missing Host header "
+                "passed through in debug mode. This would be rejected in production."
+            )
+            return None
+
+        host = host_header.decode("utf-8", "ignore")
+        if not self.is_host_allowed(host, self.get_allowed_hosts()):
+            return self._reject(scope, "Bad Request: Invalid Host header")
+        return None
+
+    def _reject(self, scope: Dict, message: str) -> Callable:
+        if scope["type"] == "websocket":
+            async def close(scope, receive, send):
+                await send({"type": "websocket.close", "code": 4003})
+
+            return close
+
+        async def bad_request(scope, receive, send):
+            await self.send_error_response(send, 400, message)
+
+        return bad_request
 
     def is_host_allowed(self, host: str, allowed_hosts: List[str]) -> bool:
         """Check if a host is in the allowed hosts list."""
-        return is_host_allowed(host, allowed_hosts)
+        patterns = tuple(allowed_hosts)
+        if self._matcher is None or patterns != self._matcher_patterns:
+            self._matcher = HostMatcher(patterns)
+            self._matcher_patterns = patterns
+        return self._matcher.allows(host)
 
     async def send_error_response(self, send: Callable, status_code: int, message: str):
         """Send an error response."""
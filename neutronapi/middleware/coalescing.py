@@ -0,0 +1,173 @@
+"""Single-flight coalescing of identical concurrent GET requests."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from neutronapi.headers import get_headers
+from neutronapi.middleware.request_keys import (
+    header_names,
+    normalize_path,
+    normalize_query,
+    request_host,
+    sets_cookie,
+    shareable_headers,
+)
+
+COALESCABLE_METHODS = frozenset(("GET", "HEAD"))
+DEFAULT_IDENTITY_HEADERS = ("authorization", "cookie")
+
+
+@dataclass(frozen=True)
+class SharedResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+def coalescing_key(
+    scope: dict[str, Any],
+    identity_headers: tuple[bytes, ...] = header_names(DEFAULT_IDENTITY_HEADERS),
+) -> Optional[tuple]:
+    """Key identical requests share, or None when the request must run alone.
+
+    Requests are identical when host, method, path, query string and the
+    values of ``identity_headers`` (the caller's credentials by default) all
+    match.
+    """
+    method = scope.get("method", "GET")
+    if scope.get("type") != "http" or method not in COALESCABLE_METHODS:
+        return None
+    headers = get_headers(scope)
+    return (
+        request_host(scope),
+        method,
+        normalize_path(scope.get("path", "/")),
+        normalize_query(scope.get("query_string", b"")),
+        tuple(headers.get(name) for name in identity_headers),
+    )
+
+
+class SingleFlight:
+    """Run one ASGI app call per key and replay its response to waiters.
+
+    The first request for a key (the leader) runs normally while its response
+    messages are captured. Requests arriving with the same key before it
+    finishes wait for it and receive the same status, headers and body. If the
+    leader fails, its response sets a cookie, or its body exceeds
+    ``max_body_bytes``, waiters run the app themselves. Per-request headers
+    such as ``X-Request-ID`` and rate-limit headers are not replayed.
+    """
+
+    def __init__(self, max_body_bytes: int = 1024 * 1024) -> None:
+        self.max_body_bytes = max_body_bytes
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: Hashable, app: Callable, scope, receive, send) -> None:
+        flight = self._flights.get(key)
+        if flight is not None:
+            shared = await asyncio.shield(flight)
+            if shared is not None:
+                await send({"type": "http.response.start", "status": shared.status, "headers": shared.headers})
+                await send({"type": "http.response.body", "body": shared.body, "more_body": False})
+                return
+            await app(scope, receive, send)
+            return
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        captured = {"status": 200, "headers": [], "body": [], "size": 0, "complete": False}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body" and captured["body"] is not None:
+                chunk = message.get("body", b"")
+                captured["size"] += len(chunk)
+                if captured["size"] > self.max_body_bytes:
+                    captured["body"] = None
+                elif chunk:
+                    captured["body"].append(chunk)
+                if not message.get("more_body", False):
+                    captured["complete"] = True
+            await send(message)
+
+        shared = None
+        try:
+            await app(scope, receive, capture_send)
+            if (
+                captured["complete"]
+                and captured["body"] is not None
+                and not sets_cookie(captured["headers"])
+            ):
+                shared = SharedResponse(
+                    status=captured["status"],
+                    headers=shareable_headers(captured["headers"]),
+                    body=b"".join(captured["body"]),
+                )
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.set_result(shared)
+
+
+def coalesce_app(app: Callable, *, max_body_bytes: int = 1024 * 1024) -> Callable:
+    """Wrap an endpoint app so identical concurrent requests share one call."""
+    flights = SingleFlight(max_body_bytes)
+
+    async def coalesced_app(scope, receive, send):
+        key = coalescing_key(scope)
+        if key is None:
+            await app(scope, receive, send)
+            return
+        await flights.run(key, app, scope, receive, send)
+
+    coalesced_app.flights = flights
+    return coalesced_app
+
+
+class CoalescingMiddleware:
+    """Collapse identical concurrent GET/HEAD requests into one execution.
+
+    Followers skip routing, auth and the handler entirely and receive the
+    leader's response bytes. Requests only coalesce when their
+    ``identity_headers`` match, so callers with different credentials never
+    share a response. Add headers that select a different representation
+    (``Accept-Language`` for example) to ``vary``.
+    """
+
+    def __init__(
+        self,
+        app=None,
+        *,
+        identity_headers: Iterable[str] = DEFAULT_IDENTITY_HEADERS,
+        vary: Iterable[str] = (),
+        max_body_bytes: int = 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.key_headers = tuple(
+            dict.fromkeys(header_names(identity_headers) + header_names(vary))
+        )
+        self.flights = SingleFlight(max_body_bytes)
+
+    async def __call__(self, scope, receive, send):
+        key = coalescing_key(scope, self.key_headers)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        await self.flights.run(key, self.app, scope, receive, send)
+
+
+__all__ = [
+    "CoalescingMiddleware",
+    "SharedResponse",
+    "SingleFlight",
+    "coalesce_app",
+    "coalescing_key",
+]
@@ -1,7 +1,10 @@
-from io import BytesIO
 from typing import Callable, Iterable, Optional, Tuple
 
 import gzip
+import zlib
+
+from neutronapi.headers import get_header
+from neutronapi.middleware.pipeline import Middleware
 
 try:
     import brotlicffi as _brotli
@@ -42,11 +45,39 @@ class _BrotliStreamCompressor:
         return self._c.flush() if finish else b""
 
 
+class _GzipStreamCompressor:
+    def __init__(self, level: int = 6):
+        # wbits=31 selects the gzip container
+        self._c = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data) if data else b""
+
+    def flush(self, finish: bool = False) -> bytes:
+        return self._c.flush() if finish else b""
+
+
+class _CompressionState:
+    __slots__ = ("encoding", "buffer", "stream")
+
+    def __init__(self, encoding: bytes):
+        self.encoding = encoding
+        self.buffer: Optional[bytearray] = None
+        self.stream = None
+
+
 def _brotli_one_shot(data: bytes, quality: int = 5, mode: str = "text", lgwin: Optional[int] = None) -> bytes:
     return _brotli.compress(data, **_brotli_params(quality, mode, lgwin))
 
 
-class CompressionMiddleware:
+class CompressionMiddleware(Middleware):
+    """Compress eligible responses with brotli or gzip per ``Accept-Encoding``.
+
+    Bodies below ``minimum_size`` are sent as-is; streamed bodies are held
+    back until ``minimum_size`` bytes have arrived, then compressed
+    incrementally. Server-sent event streams are never compressed.
+    """
+
     def __init__(
         self,
         app: Optional[Callable] = None,
@@ -60,7 +91,7 @@ class CompressionMiddleware:
         br_lgwin: Optional[int] = None,
         gzip_level: int = 6,
     ):
-        self.app = app
+        super().__init__(app)
         self.minimum_size = minimum_size
         self.path_prefix = path_prefix
         self.compress_all_types = compress_all_types
@@ -80,122 +111,78 @@ class CompressionMiddleware:
             b"application/pdf",
         }
 
-    async def __call__(self, scope, receive, send):
-        if scope["type"] != "http":
-            return await self.app(scope, receive, send)
+    async def on_request(self, scope, exchange):
         if self.path_prefix and not scope["path"].startswith(self.path_prefix):
-            return await self.app(scope, receive, send)
-
-        accept = _get_header(scope.get("headers", []), b"accept-encoding") or b""
-        wants_br = _brotli is not None and b"br" in accept
-        wants_gzip = b"gzip" in accept
-
-        if not (wants_br or wants_gzip):
-            return await self.app(scope, receive, send)
-
-        state = {
-            "status": 200,
-            "headers": None,
-            "method": scope.get("method", "GET").upper(),
-            "eligible": False,
-            "encoding": None,
-            "buffer": BytesIO(),
-            "gz_stream": None,
-            "br_stream": None,
-            "start_sent": False,
-        }
-
-        async def send_wrapper(message):
-            if message["type"] == "http.response.start":
-                state["status"] = message["status"]
-                headers = list(message.get("headers", []))
-
-                if state["method"] == "HEAD" or state["status"] in (
-                        204, 304) or _has_header(headers, b"content-encoding"):
-                    state["eligible"] = False
-                else:
-                    ctype = _get_header(headers, b"content-type")
-                    state["eligible"] = self._should_compress(ctype)
-
-                if state["eligible"]:
-                    state["encoding"] = b"br" if wants_br else (b"gzip" if wants_gzip else None)
-
-                if state["eligible"] and state["encoding"]:
-                    headers = [(k, v) for (k, v) in headers if k != b"content-length"]
-                    headers = _ensure_vary_accept_encoding(headers)
-
-                state["headers"] = headers
-                return
-
-            if message["type"] == "http.response.body":
-                body = message.get("body", b"")
-                more = message.get("more_body", False)
-
-                if not state["eligible"] or not state["encoding"]:
-                    if not state["start_sent"]:
-                        state["start_sent"] = True
-                        await send({
-                            "type": "http.response.start", "status": state["status"], "headers": state["headers"]
-                        })
-                    return await send(message)
-
-                state["buffer"].write(body)
-
-                if more:
-                    if (state["br_stream"] is None and state["gz_stream"] is None and
-                            state["buffer"].tell() >= self.minimum_size):
-                        await _start_streaming(send, state, self)
-                        data = state["buffer"].getvalue()
-                        state["buffer"] = None
-                        if state["encoding"] == b"br":
-                            out = state["br_stream"].compress(data)
-                            if out:
-                                await send({"type": "http.response.body", "body": out, "more_body": True})
-                        else:
-                            state["gz_stream"].write(data)
-                            await _drain_gzip(send, state["gz_stream"])
-                    else:
-                        if state["encoding"] == b"br" and state["br_stream"] is not None and body:
-                            out = state["br_stream"].compress(body)
-                            if out:
-                                await send({"type": "http.response.body", "body": out, "more_body": True})
-                        elif state["encoding"] == b"gzip" and state["gz_stream"] is not None and body:
-                            state["gz_stream"].write(body)
-                            await _drain_gzip(send, state["gz_stream"])
-
-                    return await send({"type": "http.response.body", "body": b"", "more_body": True})
-
-                if state["br_stream"] is None and state["gz_stream"] is None:
-                    data = state["buffer"].getvalue()
-                    if len(data) < self.minimum_size:
-                        if not state["start_sent"]:
-                            state["start_sent"] = True
-                            await send({
-                                "type": "http.response.start", "status": state["status"], "headers": state["headers"]
-                            })
-                        return await send({"type": "http.response.body", "body": data, "more_body": False})
-
-                    if state["encoding"] == b"br":
-                        out = _brotli_one_shot(data, quality=self.br_quality, mode=self.br_mode, lgwin=self.br_lgwin)
-                    else:
-                        out = gzip.compress(data, compresslevel=self.gzip_level)
-                    headers = state["headers"] + [(b"content-encoding", state["encoding"]),
-                                                  (b"content-length", str(len(out)).encode())]
-                    state["start_sent"] = True
-                    await send({"type": "http.response.start", "status": state["status"], "headers": headers})
-                    return await send({"type": "http.response.body", "body": out, "more_body": False})
-                else:
-                    if state["encoding"] == b"br":
-                        tail = state["br_stream"].flush(finish=True)
-                        if tail:
-                            await send({"type": "http.response.body", "body": tail, "more_body": True})
-                    else:
-                        state["gz_stream"].close()
-                    return await send({"type": "http.response.body", "body": b"", "more_body": False})
-
-        return await self.app(scope, receive, send_wrapper)
+            return None
+
+        accept = get_header(scope, b"accept-encoding") or b""
+        if _brotli is not None and b"br" in accept:
+            exchange.state[self] = _CompressionState(b"br")
+        elif b"gzip" in accept:
+            exchange.state[self] = _CompressionState(b"gzip")
+        return None
+
+    def on_response_start(self, scope, exchange):
+        state = exchange.state.get(self)
+        if state is None:
+            return
+        headers = exchange.headers
+        if (
+            scope.get("method", "GET").upper() == "HEAD"
+            # A compressed byte range would not match its Content-Range.
+            or exchange.status in (204, 206, 304)
+            or _has_header(headers, b"content-encoding")
+            or not self._should_compress(_get_header(headers, b"content-type"))
+        ):
+            del exchange.state[self]
+            return
+        _ensure_vary_accept_encoding(headers)
+
+    def on_body(self, scope, exchange, body, more_body):
+        state = exchange.state.get(self)
+        if state is None:
+            return body
+
+        if state.stream is not None:
+            out = state.stream.compress(body)
+            return out + state.stream.flush(finish=True) if not more_body else out
+
+        if state.buffer:
+            state.buffer += body
+            data = bytes(state.buffer)
+        else:
+            data = body
+
+        if more_body:
+            if len(data) < self.minimum_size:
+                # Hold small leading chunks back until we know whether to compress
+                if not state.buffer:
+                    state.buffer = bytearray(data)
+                return b""
+            state.buffer = None
+            state.stream = self._stream_compressor(state.encoding)
+            _set_content_encoding(exchange.headers, state.encoding)
+            return state.stream.compress(data)
+
+        state.buffer = None
+        if len(data) < self.minimum_size:
+            return data
+        if state.encoding == b"br":
+            out = _brotli_one_shot(data, quality=self.br_quality, mode=self.br_mode, lgwin=self.br_lgwin)
+        else:
+            out = gzip.compress(data, compresslevel=self.gzip_level)
+        _set_content_encoding(exchange.headers, state.encoding, len(out))
+        return out
+
+    def _stream_compressor(self, encoding: bytes):
+        if encoding == b"br":
+            return _BrotliStreamCompressor(quality=self.br_quality, mode=self.br_mode, lgwin=self.br_lgwin)
+        return _GzipStreamCompressor(self.gzip_level)
 
     def _should_compress(self, ctype: Optional[bytes]) -> bool:
+        if ctype and ctype.startswith(b"text/event-stream"):
+            # Compressors hold events back until enough bytes accumulate
+            return False
         if self.compress_all_types:
             if not self.skip_incompressible:
                 return True
@@ -233,6 +220,20 @@ def _has_header(headers: HeaderList, name: bytes) -> bool:
     return any(k == name for k, _ in headers)
 
 
+def _set_content_encoding(
+    headers: list[Tuple[bytes, bytes]], encoding: bytes, length: Optional[int] = None
+) -> None:
+    headers[:] = [
+        # The compressed body is a different representation; a strong ETag no longer holds.
+        (k, b"W/" + v) if k == b"etag" and not v.startswith(b"W/") else (k, v)
+        for (k, v) in headers
+        if k.lower() != b"content-length"
+    ]
+    headers.append((b"content-encoding", encoding))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode()))
+
+
 def _ensure_vary_accept_encoding(headers: list[Tuple[bytes, bytes]]) -> list[Tuple[bytes, bytes]]:
     idx = next((i for i, (k, _) in enumerate(headers) if k == b"vary"), None)
     if idx is None:
@@ -240,23 +241,3 @@ def _ensure_vary_accept_encoding(headers: list[Tuple[bytes, bytes]]) -> list[Tup
     elif b"accept-encoding" not in headers[idx][1].lower():
         headers[idx] = (b"vary", headers[idx][1] + b", Accept-Encoding")
     return headers
-
-
-async def _start_streaming(send, state, cfg: CompressionMiddleware):
-    headers = state["headers"] + [(b"content-encoding", state["encoding"])]
-    state["start_sent"] = True
-    await send({"type": "http.response.start", "status": state["status"], "headers": headers})
-    if state["encoding"] == b"br":
-        state["br_stream"] = _BrotliStreamCompressor(quality=cfg.br_quality, mode=cfg.br_mode, lgwin=cfg.br_lgwin)
-    else:
-        gzbuf = BytesIO()
-        state["gz_stream"] = gzip.GzipFile(fileobj=gzbuf, mode="wb", compresslevel=cfg.gzip_level)
-
-
-async def _drain_gzip(send, gzfile: gzip.GzipFile):
-    buf: BytesIO = gzfile.fileobj
-    data = buf.getvalue()
-    if data:
-        buf.truncate(0)
-        buf.seek(0)
-        await send({"type": "http.response.body", "body": data, "more_body": True})
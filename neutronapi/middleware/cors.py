@@ -2,8 +2,11 @@
 from typing import Callable, List, Dict, Tuple, Optional, Any
 import re
 
+from neutronapi.headers import get_headers
+from neutronapi.middleware.pipeline import Middleware
 
-class CorsMiddleware:
+
+class CorsMiddleware(Middleware):
     """CORS (Cross-Origin Resource Sharing) middleware for handling cross-origin requests.
 
     Args:
@@ -31,13 +34,15 @@ class CorsMiddleware:
         cors = CorsMiddleware(app, allow_all_origins=True)
     """
 
+    scope_types = ("http", "websocket")
+
     def __init__(
         self,
         app: Optional[Callable] = None,
         allowed_origins: Optional[List[str]] = None,
         allow_all_origins: bool = False,
     ) -> None:
-        self.app = app
+        super().__init__(app)
         self.allowed_origins = allowed_origins or []
         self.allow_all_origins = allow_all_origins
 
@@ -58,38 +63,36 @@ class CorsMiddleware:
                     pattern = self._wildcard_to_regex(origin)
                     self.origin_patterns.append((re.compile(pattern), origin))
 
-    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable, **kwargs: Any) -> None:
-        scope_type = scope["type"]
+    async def on_request(self, scope: Dict[str, Any], exchange) -> Optional[Callable]:
+        origin = get_headers(scope).get(b"origin", b"").decode("utf-8", "ignore")
 
         # Validate Origin for WebSocket upgrade requests
-        if scope_type == "websocket":
-            if not self.allow_all_origins:
-                headers = dict(scope.get("headers", []))
-                origin = headers.get(b"origin", b"").decode("utf-8", "ignore")
-                if origin and not self.is_origin_allowed(origin):
+        if scope["type"] == "websocket":
+            if not self.allow_all_origins and origin and not self.is_origin_allowed(origin):
+                async def close(scope, receive, send):
                     await send({"type": "websocket.close", "code": 4003})
-                    return
-            await self.app(scope, receive, send, **kwargs)
-            return
-
-        if scope_type != "http":
-            await self.app(scope, receive, send, **kwargs)
-            return
 
-        headers = dict(scope.get("headers", []))
-        origin = headers.get(b"origin", b"").decode("utf-8", "ignore")
+                return close
+            return None
 
         if scope["method"] == "OPTIONS":
-            # Handle OPTIONS directly and do not forward to Thalamus
-            if self.is_origin_allowed(origin):
-                await self.handle_preflight(origin, send)
-            else:
-                await self.send_error_response(send, 403, "Forbidden")
-            return  # Ensure no further processing for OPTIONS requests
-        else:
-            # Regular requests are processed as before
-            kwargs["origin"] = origin
-            await self.handle_simple(scope, receive, send, **kwargs)
+            # Answer OPTIONS directly; it never reaches the application
+            async def preflight(scope, receive, send):
+                if self.is_origin_allowed(origin):
+                    await self.handle_preflight(origin, send)
+                else:
+                    await self.send_error_response(send, 403, "Forbidden")
+
+            return preflight
+
+        if self.is_origin_allowed(origin):
+            exchange.state[self] = origin
+        return None
+
+    def on_response_start(self, scope: Dict[str, Any], exchange) -> None:
+        origin = exchange.state.get(self)
+        if origin is not None:
+            exchange.headers.extend(self.get_cors_headers(origin))
 
     async def handle_preflight(self, origin: str, send: Callable):
         response_headers = [
@@ -115,21 +118,6 @@ class CorsMiddleware:
         )
         await send({"type": "http.response.body", "body": b""})
 
-    async def handle_simple(
-        self, scope: Dict, receive: Callable, send: Callable, **kwargs
-    ):
-        origin = kwargs.get("origin")
-
-        async def wrapped_send(response: Dict):
-            if response["type"] == "http.response.start":
-                if self.is_origin_allowed(origin):
-                    response_headers = response.get("headers", [])
-                    response_headers.extend(self.get_cors_headers(origin))
-                    response["headers"] = response_headers
-            await send(response)
-
-        await self.app(scope, receive, wrapped_send)
-
     async def send_error_response(self, send: Callable, status_code: int, message: str):
         await send(
             {
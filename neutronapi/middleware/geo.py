@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Any, Callable, TypedDict
 
 from neutronapi.conf import settings
+from neutronapi.headers import get_headers
 
 try:
     import maxminddb
@@ -33,14 +34,6 @@ class BaseGeoMiddleware:
     def __init__(self, app: Callable | None = None) -> None:
         self.app = app
 
-    @staticmethod
-    def _header_value(headers: dict[bytes, bytes], name: bytes) -> str | None:
-        value = headers.get(name)
-        if not value:
-            return None
-        decoded = value.decode("utf-8", "ignore").strip()
-        return decoded or None
-
     @staticmethod
     def _header_name(name: str | bytes) -> bytes:
         if isinstance(name, bytes):
@@ -48,9 +41,9 @@ class BaseGeoMiddleware:
         return name.lower().encode("utf-8")
 
     def extract_client_ip(self, scope: dict[str, Any]) -> str | None:
-        headers = dict(scope.get("headers", []))
+        headers = get_headers(scope)
         for header_name in settings.get("TRUSTED_PROXY_HEADERS", []):
-            forwarded = self._header_value(headers, self._header_name(header_name))
+            forwarded = headers.get_text(self._header_name(header_name))
             if forwarded:
                 return forwarded.split(",", 1)[0].strip() or None
         client = scope.get("client") or ("", 0)
@@ -121,8 +114,8 @@ class CloudflareGeoMiddleware(BaseGeoMiddleware):
     header_name = b"cf-ipcountry"
 
     async def lookup_geo(self, scope: dict[str, Any]) -> GeoResult | None:
-        headers = dict(scope.get("headers", []))
-        country_code = self._header_value(headers, self.header_name)
+        headers = get_headers(scope)
+        country_code = headers.get_text(self.header_name)
         if not country_code:
             return None
 
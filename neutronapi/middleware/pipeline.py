@@ -0,0 +1,260 @@
+"""Hook-based middleware fused into a single ASGI callable.
+
+A wrapping middleware costs a coroutine hop, a ``send`` closure and usually a
+copy of the ``http.response.start`` message per layer. ``Middleware``
+subclasses implement hooks instead, and ``Pipeline`` runs a sequence of them as
+one ASGI app: the start message's header list is copied once and mutated in
+place by every stage, and body messages go out without re-wrapping.
+
+Hooks, all optional (stages are listed outermost first):
+
+- ``on_request(scope, exchange)`` (async) runs outermost first. Return an
+  ASGI app to answer the request instead of the wrapped app; only the stages
+  outside this one then see the response. For ``websocket`` scopes it runs
+  for stages listing ``"websocket"`` in ``scope_types``, with ``exchange``
+  None.
+- ``on_response_start(scope, exchange)`` runs innermost first once the stages
+  inside it have produced output, so it sees their final ``exchange.status``
+  and ``exchange.headers``; it may change both.
+- ``on_body(scope, exchange, body, more_body)`` runs innermost first for each
+  body message and returns the bytes to pass outwards. Returning ``b""`` with
+  more body to come holds the response back (for example while buffering),
+  and the stage may still change ``exchange.headers`` until it first returns
+  output.
+- ``on_complete(scope, exchange, error)`` (async) runs innermost first after
+  the app returns or raises (``error`` is the exception, else None).
+
+Per-request data lives in ``exchange.state`` keyed by the stage. Called
+directly, a ``Middleware`` is an ordinary ASGI middleware around ``self.app``,
+so hook and plain middleware mix freely; ``fuse_middleware`` collapses each
+run of consecutive hook middleware into one ``Pipeline``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from neutronapi.headers import merge_headers
+
+PIPELINE_SCOPE_KEY = "_neutronapi_pipeline"
+
+ASGIApp = Callable[..., Any]
+
+
+class HTTPExchange:
+    """The response of one request as seen by pipeline stages."""
+
+    __slots__ = ("status", "headers", "state")
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.state: Dict[Any, Any] = {}
+
+
+class Middleware:
+    """Base class for hook-based middleware; see the module docstring."""
+
+    scope_types: Tuple[str, ...] = ("http",)
+
+    def __init__(self, app: Optional[ASGIApp] = None) -> None:
+        self.app = app
+
+    async def on_request(self, scope: Dict[str, Any], exchange: Optional[HTTPExchange]) -> Optional[ASGIApp]:
+        return None
+
+    def on_response_start(self, scope: Dict[str, Any], exchange: HTTPExchange) -> None:
+        pass
+
+    def on_body(self, scope: Dict[str, Any], exchange: HTTPExchange, body: bytes, more_body: bool) -> bytes:
+        return body
+
+    async def on_complete(
+        self, scope: Dict[str, Any], exchange: HTTPExchange, error: Optional[BaseException]
+    ) -> None:
+        pass
+
+    async def __call__(self, scope, receive, send):
+        pipeline = self.__dict__.get("_pipeline")
+        if pipeline is None or pipeline.app is not self.app or pipeline.stages[0] is not self:
+            pipeline = self._pipeline = Pipeline((self,), self.app)
+        await pipeline(scope, receive, send)
+
+
+def _hook(stage: Middleware, name: str) -> Optional[Callable]:
+    """Return the stage's bound hook, or None when it keeps the no-op default."""
+    if getattr(type(stage), name) is getattr(Middleware, name):
+        return None
+    return getattr(stage, name)
+
+
+class Pipeline:
+    """Run ``stages`` (outermost first) around ``app`` as one ASGI callable."""
+
+    def __init__(self, stages: Sequence[Middleware], app: Optional[ASGIApp] = None) -> None:
+        self.stages = tuple(stages)
+        self.app = app
+        indexed = list(enumerate(self.stages))
+        self._request_hooks = tuple(
+            (index, hook) for index, stage in indexed if (hook := _hook(stage, "on_request"))
+        )
+        self._websocket_hooks = tuple(
+            hook
+            for _, stage in indexed
+            if "websocket" in stage.scope_types and (hook := _hook(stage, "on_request"))
+        )
+        # Response side runs innermost first.
+        response_hooks = []
+        for index, stage in reversed(indexed):
+            start, body = _hook(stage, "on_response_start"), _hook(stage, "on_body")
+            if start is not None or body is not None:
+                response_hooks.append((index, start, body))
+        self._response_hooks = tuple(response_hooks)
+        self._transforms_body = any(body is not None for _, _, body in self._response_hooks)
+        self._complete_hooks = tuple(
+            (index, hook) for index, stage in reversed(indexed) if (hook := _hook(stage, "on_complete"))
+        )
+
+    async def __call__(self, scope, receive, send):
+        scope_type = scope["type"]
+        if scope_type != "http":
+            app = self.app
+            if scope_type == "websocket":
+                for hook in self._websocket_hooks:
+                    answer = await hook(scope, None)
+                    if answer is not None:
+                        app = answer
+                        break
+            await app(scope, receive, send)
+            return
+
+        exchange = HTTPExchange()
+        # The outermost pipeline merges headers queued on the scope by API code.
+        owner = PIPELINE_SCOPE_KEY not in scope
+        if owner:
+            scope[PIPELINE_SCOPE_KEY] = exchange
+
+        # Stages with an index below ``limit`` saw the request and see the response.
+        limit = 0
+        error: Optional[BaseException] = None
+        try:
+            app = self.app
+            for index, hook in self._request_hooks:
+                limit = index
+                answer = await hook(scope, exchange)
+                if answer is not None:
+                    app = answer
+                    break
+            else:
+                limit = len(self.stages)
+            await app(scope, receive, self._fused_send(scope, send, exchange, limit, owner))
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if owner:
+                scope.pop(PIPELINE_SCOPE_KEY, None)
+            for index, hook in self._complete_hooks:
+                if index < limit:
+                    await hook(scope, exchange, error)
+
+    def _fused_send(
+        self,
+        scope: Dict[str, Any],
+        send: Callable,
+        exchange: HTTPExchange,
+        limit: int,
+        owner: bool,
+    ) -> Callable:
+        hooks = [(start, body) for index, start, body in self._response_hooks if index < limit]
+        transforms_body = self._transforms_body and any(body is not None for _, body in hooks)
+        pending: Optional[Dict[str, Any]] = None
+        # Number of ``hooks`` (innermost first) whose on_response_start has run.
+        started = 0
+
+        async def flush_start() -> None:
+            nonlocal pending
+            message, pending = pending, None
+            await send(
+                {**message, "status": exchange.status, "headers": exchange.headers}
+            )
+
+        async def fused_send(message: Dict[str, Any]) -> None:
+            nonlocal pending, started
+            kind = message["type"]
+            if kind == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if owner:
+                    extra = scope.get("_response_headers")
+                    if extra:
+                        headers = merge_headers(headers, list(extra))
+                exchange.status = message["status"]
+                exchange.headers = headers
+                pending = message
+                if not transforms_body:
+                    for start, _ in hooks:
+                        if start is not None:
+                            start(scope, exchange)
+                    started = len(hooks)
+                    await flush_start()
+                return
+
+            if kind != "http.response.body" or not transforms_body:
+                if pending is not None:
+                    for start, _ in hooks[started:]:
+                        if start is not None:
+                            start(scope, exchange)
+                    started = len(hooks)
+                    await flush_start()
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            for position, (start, transform) in enumerate(hooks):
+                if position >= started:
+                    if not body and more_body:
+                        # An inner stage is holding output back; outer stages wait.
+                        return
+                    if start is not None:
+                        start(scope, exchange)
+                    started = position + 1
+                if transform is not None:
+                    body = transform(scope, exchange, body, more_body)
+            if not body and more_body:
+                return
+            if pending is not None:
+                await flush_start()
+            await send({"type": kind, "body": body, "more_body": more_body})
+
+        return fused_send
+
+    def reverse(self, name: str, **kwargs) -> str:
+        """Delegate reverse to the wrapped app."""
+        return self.app.reverse(name, **kwargs)
+
+
+def fuse_middleware(layers: Sequence[Any], app: ASGIApp) -> ASGIApp:
+    """Wrap ``app`` in ``layers`` (outermost first), fusing runs of hook middleware.
+
+    Each layer's ``app`` is pointed at the next layer, as with plain
+    wrapping, so layers keep working when called on their own.
+    """
+    composed = app
+    run: List[Middleware] = []
+    for layer in reversed(layers):
+        if isinstance(layer, Middleware):
+            layer.app = run[-1] if run else composed
+            run.append(layer)
+            continue
+        if run:
+            composed = Pipeline(run[::-1], composed)
+            run = []
+        layer.app = composed
+        composed = layer
+    if run:
+        composed = Pipeline(run[::-1], composed)
+    return composed
+
+
+__all__ = ["HTTPExchange", "Middleware", "PIPELINE_SCOPE_KEY", "Pipeline", "fuse_middleware"]
@@ -0,0 +1,72 @@
+"""Request key and header helpers shared by response caching and coalescing."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Union
+
+from neutronapi.headers import get_headers
+
+# Response headers describing one request, never replayed to other clients.
+PER_REQUEST_HEADERS = frozenset((b"x-request-id", b"server-timing", b"retry-after"))
+PER_REQUEST_PREFIXES = (b"x-ratelimit-", b"ratelimit-")
+
+
+def request_host(scope: dict[str, Any]) -> bytes:
+    """The request's Host header, else the server address the request came in on."""
+    host = get_headers(scope).get(b"host")
+    if host:
+        return host.lower()
+    server = scope.get("server")
+    if server:
+        host, port = server
+        return f"{host}:{port}".encode("latin-1") if port is not None else host.encode("latin-1")
+    return b""
+
+
+def normalize_path(path: str) -> str:
+    return path.rstrip("/") or "/"
+
+
+def _parameter_name(part: bytes) -> bytes:
+    return part.partition(b"=")[0]
+
+
+def normalize_query(query: bytes) -> bytes:
+    """Order parameters by name; repeated names keep their relative order."""
+    if not query or b"&" not in query:
+        return query or b""
+    return b"&".join(sorted((part for part in query.split(b"&") if part), key=_parameter_name))
+
+
+def header_names(values: Iterable[Union[str, bytes]]) -> tuple[bytes, ...]:
+    """Lowercased, stripped header names as bytes."""
+    return tuple(
+        (value if isinstance(value, bytes) else value.encode("latin-1")).strip().lower()
+        for value in values
+    )
+
+
+def shareable_headers(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    """Drop response headers that only describe the request that produced them."""
+    return [
+        (name, value)
+        for name, value in headers
+        if name.lower() not in PER_REQUEST_HEADERS
+        and not name.lower().startswith(PER_REQUEST_PREFIXES)
+    ]
+
+
+def sets_cookie(headers: list[tuple[bytes, bytes]]) -> bool:
+    return any(name.lower() == b"set-cookie" for name, _ in headers)
+
+
+__all__ = [
+    "PER_REQUEST_HEADERS",
+    "PER_REQUEST_PREFIXES",
+    "header_names",
+    "normalize_path",
+    "normalize_query",
+    "request_host",
+    "sets_cookie",
+    "shareable_headers",
+]
@@ -1,4 +1,12 @@
-"""Request lifecycle middleware with request IDs and structured events."""
+"""Request lifecycle middleware with request IDs and structured events.
+
+With ``server_timing=True`` each request also carries a ``PhaseTimer``; its
+breakdown is sent as a ``Server-Timing`` response header and attached to
+``RequestCompleted.phases``.
+
+With ``metrics=True``, request counts, latencies and in-flight requests are
+recorded in ``neutronapi.metrics.REGISTRY``, labelled by route template.
+"""
 
 from __future__ import annotations
 
@@ -8,28 +16,40 @@ from typing import Optional
 from neutronapi.conf import settings
 from neutronapi.event_bus import events
 from neutronapi.events import RequestCompleted, RequestError, RequestReceived
+from neutronapi.headers import Headers, get_headers
+from neutronapi.metrics.registry import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    ROUTE_SCOPE_KEY,
+    UNMATCHED_ROUTE,
+    method_label,
+)
+from neutronapi.middleware.pipeline import Middleware
 from neutronapi.request_id import generate_request_id
+from neutronapi.timing import TIMING_SCOPE_KEY, PhaseTimer
 
 
-class RequestLoggingMiddleware:
-    def __init__(self, app=None):
-        self.app = app
+class RequestLoggingMiddleware(Middleware):
+    def __init__(self, app=None, *, server_timing: bool = False, metrics: bool = False):
+        super().__init__(app)
+        self.server_timing = server_timing
+        self.metrics = metrics
 
-    def _header_value(self, headers: dict[bytes, bytes], name: bytes) -> Optional[str]:
-        value = headers.get(name)
-        if not value:
-            return None
-        decoded = value.decode("utf-8", "ignore").strip()
-        return decoded or None
+    def _record_metrics(self, scope: dict, status: int, duration: float) -> None:
+        method = method_label(scope.get("method", ""))
+        route = scope.get(ROUTE_SCOPE_KEY, UNMATCHED_ROUTE)
+        HTTP_REQUESTS.labels(method, route, status).inc()
+        HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
 
-    def _extract_ip(self, headers: dict[bytes, bytes], scope: dict) -> str:
+    def _extract_ip(self, headers: Headers, scope: dict) -> str:
         # Only trust proxy headers when explicitly configured via TRUSTED_PROXY_HEADERS setting.
         # Without configuration, always use the direct connection IP from scope["client"].
         trusted_headers = settings.get("TRUSTED_PROXY_HEADERS", [])
         if trusted_headers:
             for header_name in trusted_headers:
                 header_bytes = header_name.lower().encode("utf-8") if isinstance(header_name, str) else header_name
-                forwarded = self._header_value(headers, header_bytes)
+                forwarded = headers.get_text(header_bytes)
                 if forwarded:
                     return forwarded.split(",", 1)[0].strip()
         client = scope.get("client") or ("", 0)
@@ -43,64 +63,67 @@ class RequestLoggingMiddleware:
             return user
         return None
 
-    async def __call__(self, scope, receive, send):
-        if scope["type"] != "http":
-            await self.app(scope, receive, send)
-            return
-
+    async def on_request(self, scope, exchange):
+        timer = None
+        if self.server_timing:
+            timer = scope[TIMING_SCOPE_KEY] = PhaseTimer()
         request_id = scope.get("request_id") or generate_request_id()
         scope["request_id"] = request_id
-        start = time.monotonic()
-        headers = dict(scope.get("headers", []))
-        response_status: Optional[int] = None
-        error_message: Optional[str] = None
+        headers = get_headers(scope)
 
         meta = {
             "request_id": request_id,
             "method": scope.get("method", ""),
             "path": scope.get("path", ""),
             "ip": self._extract_ip(headers, scope),
-            "user_agent": self._header_value(headers, b"user-agent") or "",
-            "origin": self._header_value(headers, b"origin"),
-            "idempotency_key": self._header_value(headers, b"idempotency-key"),
-            "geo": self._header_value(headers, b"cf-ipcountry"),
+            "user_agent": headers.get_text(b"user-agent") or "",
+            "origin": headers.get_text(b"origin"),
+            "idempotency_key": headers.get_text(b"idempotency-key"),
+            "geo": headers.get_text(b"cf-ipcountry"),
         }
+        exchange.state[self] = (meta, time.monotonic(), timer)
 
         await events.emit(RequestReceived(**meta, user=self._extract_user(scope)))
+        if self.metrics:
+            HTTP_REQUESTS_IN_FLIGHT.inc()
+        return None
 
-        async def send_wrapper(message):
-            nonlocal response_status
-            if message["type"] == "http.response.start":
-                response_status = message["status"]
-                response_headers = list(message.get("headers", []))
-                if not any(name.lower() == b"x-request-id" for name, _ in response_headers):
-                    response_headers.append((b"x-request-id", request_id.encode("utf-8")))
-                message = {**message, "headers": response_headers}
-            await send(message)
-
-        try:
-            await self.app(scope, receive, send_wrapper)
-        except Exception as exc:
-            error_message = str(exc)
+    def on_response_start(self, scope, exchange):
+        meta, _, timer = exchange.state[self]
+        response_headers = exchange.headers
+        if not any(name.lower() == b"x-request-id" for name, _ in response_headers):
+            response_headers.append((b"x-request-id", meta["request_id"].encode("utf-8")))
+        if timer is not None:
+            response_headers.append((b"server-timing", timer.header_value().encode("ascii")))
+
+    async def on_complete(self, scope, exchange, error):
+        meta, start, timer = exchange.state[self]
+        status = exchange.status or 500
+        error_message = str(error) if error is not None else None
+        if error is not None:
             await events.emit(
                 RequestError(
                     **meta,
                     user=self._extract_user(scope),
-                    status=response_status or 500,
+                    status=status,
                     error=error_message,
                 )
             )
-            raise
-        finally:
-            await events.emit(
-                RequestCompleted(
-                    **meta,
-                    user=self._extract_user(scope),
-                    status=response_status or 500,
-                    duration_ms=round((time.monotonic() - start) * 1000, 2),
-                    error=error_message,
-                )
+
+        duration = time.monotonic() - start
+        if self.metrics:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            self._record_metrics(scope, status, duration)
+        await events.emit(
+            RequestCompleted(
+                **meta,
+                user=self._extract_user(scope),
+                status=status,
+                duration_ms=round(duration * 1000, 2),
+                error=error_message,
+                phases=timer.as_ms() if timer is not None else None,
             )
+        )
 
 
 __all__ = ["RequestLoggingMiddleware"]
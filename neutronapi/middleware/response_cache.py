@@ -0,0 +1,388 @@
+"""In-memory HTTP response caching for read-heavy endpoints."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Union
+
+from neutronapi.headers import Headers, get_headers
+from neutronapi.middleware.request_keys import (
+    header_names,
+    normalize_path,
+    normalize_query,
+    request_host,
+    shareable_headers,
+)
+
+RESPONSE_CACHE_SCOPE_KEY = "_neutronapi_response_cache"
+
+# (host, method, path, normalized query)
+BaseKey = tuple[bytes, str, str, bytes]
+CacheKey = tuple[BaseKey, tuple[Optional[bytes], ...]]
+
+_CREDENTIAL_HEADERS = (b"authorization", b"cookie")
+_UNCACHEABLE_DIRECTIVES = (b"no-store", b"private", b"no-cache")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Per-endpoint caching rules, set with ``@API.endpoint(cache=...)``.
+
+    ``ttl`` is in seconds. ``vary`` names request headers whose values split
+    the cache into separate variants, on top of the middleware's own ``vary``.
+    """
+
+    ttl: float
+    vary: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.ttl <= 0:
+            raise ValueError("CachePolicy ttl must be positive")
+        object.__setattr__(self, "vary", tuple(name.lower() for name in self.vary))
+
+    @classmethod
+    def coerce(cls, value: Union[None, int, float, "CachePolicy"]) -> Optional["CachePolicy"]:
+        if value is None or isinstance(value, cls):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return cls(ttl=value)
+        raise ValueError(
+            f"Invalid cache option {value!r}; expected a TTL in seconds or a CachePolicy"
+        )
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+    size: int
+
+
+@dataclass
+class _Variants:
+    vary: tuple[bytes, ...]
+    keys: set[CacheKey] = field(default_factory=set)
+
+
+class ResponseCache:
+    """Bytes-bounded LRU of complete responses with per-entry expiry.
+
+    Entries are grouped by (host, method, path, query). Each group remembers which
+    request headers its responses vary on, so a lookup needs only the request
+    to find the right variant.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._variants: dict[BaseKey, _Variants] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, base: BaseKey, headers: Headers, *, require_vary: Iterable[bytes] = ()
+    ) -> Optional[CacheEntry]:
+        """Return the fresh entry for the request, if any.
+
+        Entries whose variants do not vary on every header in ``require_vary``
+        are not returned.
+        """
+        variants = self._variants.get(base)
+        if variants is None or any(name not in variants.vary for name in require_vary):
+            self.misses += 1
+            return None
+        key = (base, tuple(headers.get(name) for name in variants.vary))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        base: BaseKey,
+        vary: tuple[bytes, ...],
+        headers: Headers,
+        *,
+        status: int,
+        response_headers: list[tuple[bytes, bytes]],
+        body: bytes,
+        ttl: float,
+    ) -> bool:
+        size = len(body) + sum(len(name) + len(value) for name, value in response_headers)
+        if size > self.max_entry_bytes:
+            return False
+
+        key = (base, tuple(headers.get(name) for name in vary))
+        if key in self._entries:
+            self._remove(key)
+        variants = self._variants.get(base)
+        if variants is not None and variants.vary != vary:
+            for stale in list(variants.keys):
+                self._remove(stale)
+            variants = None
+        if variants is None:
+            variants = self._variants[base] = _Variants(vary)
+
+        self._entries[key] = CacheEntry(
+            status=status,
+            headers=response_headers,
+            body=body,
+            expires_at=time.monotonic() + ttl,
+            size=size,
+        )
+        variants.keys.add(key)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+        return True
+
+    def invalidate(
+        self,
+        path: str,
+        *,
+        method: Optional[str] = None,
+        host: Optional[Union[str, bytes]] = None,
+    ) -> int:
+        """Drop every cached variant of ``path`` (all query strings).
+
+        ``host`` limits this to one host; by default every host is affected.
+        """
+        path = normalize_path(path)
+        host = _host_key(host)
+        return self._invalidate_where(
+            lambda base: base[2] == path
+            and (method is None or base[1] == method.upper())
+            and (host is None or base[0] == host)
+        )
+
+    def invalidate_prefix(self, prefix: str, *, host: Optional[Union[str, bytes]] = None) -> int:
+        """Drop every cached response at or below ``prefix``."""
+        prefix = normalize_path(prefix)
+        nested = prefix.rstrip("/") + "/"
+        host = _host_key(host)
+        return self._invalidate_where(
+            lambda base: (base[2] == prefix or base[2].startswith(nested))
+            and (host is None or base[0] == host)
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._variants.clear()
+        self.size = 0
+        self.generation += 1
+
+    def _invalidate_where(self, predicate) -> int:
+        # Bump first so responses already in flight are not stored afterwards.
+        self.generation += 1
+        removed = 0
+        for base in [base for base in self._variants if predicate(base)]:
+            for key in list(self._variants[base].keys):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        base = key[0]
+        variants = self._variants.get(base)
+        if variants is not None:
+            variants.keys.discard(key)
+            if not variants.keys:
+                del self._variants[base]
+
+
+@dataclass
+class CacheContext:
+    """Per-request handle placed on the scope by ``ResponseCacheMiddleware``."""
+
+    cache: ResponseCache
+    policy: Optional[CachePolicy] = None
+
+
+def get_response_cache(scope: dict[str, Any]) -> Optional[ResponseCache]:
+    """Return the cache serving this request, for invalidation from handlers."""
+    context = scope.get(RESPONSE_CACHE_SCOPE_KEY)
+    return context.cache if context is not None else None
+
+
+def _host_key(host: Optional[Union[str, bytes]]) -> Optional[bytes]:
+    if host is None:
+        return None
+    return (host if isinstance(host, bytes) else host.encode("latin-1")).lower()
+
+
+class ResponseCacheMiddleware:
+    """Serve repeated GET requests from an in-memory response cache.
+
+    Only endpoints that opt in with ``@API.endpoint(cache=...)`` are cached,
+    unless ``default_ttl`` is set. A hit is answered before routing, so
+    authentication, permissions, throttles, the handler and serialization are
+    all skipped. Entries are kept per host. Requests carrying
+    ``Authorization`` or ``Cookie`` are only cached or served from the cache
+    when that header is part of ``vary``, and responses with ``Set-Cookie`` or
+    ``Cache-Control: no-store/private/no-cache`` never are. Credentials sent in
+    any other header (``X-API-Key`` for example) are not recognised: add that
+    header to ``vary`` or the endpoint's ``CachePolicy.vary``, or a hit serves
+    one caller's response to everyone. Per-request headers such as
+    ``X-Request-ID`` and rate-limit headers are not stored.
+
+    Handlers invalidate entries through ``get_response_cache(scope)``::
+
+        cache = get_response_cache(scope)
+        if cache is not None:
+            cache.invalidate_prefix("/v1/items")
+    """
+
+    CACHEABLE_METHODS = {"GET"}
+
+    def __init__(
+        self,
+        app=None,
+        *,
+        cache: Optional[ResponseCache] = None,
+        default_ttl: Optional[float] = None,
+        vary: Iterable[str] = (),
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.cache = cache if cache is not None else ResponseCache(max_bytes, max_entry_bytes)
+        self.default_policy = CachePolicy(ttl=default_ttl) if default_ttl else None
+        self.vary = header_names(vary)
+
+    async def _send_cached_response(self, send, entry: CacheEntry) -> None:
+        headers = [*entry.headers, (b"x-cache", b"hit")]
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body, "more_body": False})
+
+    def _vary_for(
+        self,
+        policy: CachePolicy,
+        response_headers: list[tuple[bytes, bytes]],
+    ) -> Optional[tuple[bytes, ...]]:
+        names = set(self.vary)
+        names.update(header_names(policy.vary))
+        for name, value in response_headers:
+            if name.lower() == b"vary":
+                names.update(header_names(value.split(b",")))
+        names.discard(b"")
+        if b"*" in names:
+            return None
+        return tuple(sorted(names))
+
+    @staticmethod
+    def _response_cacheable(response_headers: list[tuple[bytes, bytes]]) -> bool:
+        for name, value in response_headers:
+            lowered = name.lower()
+            if lowered == b"set-cookie":
+                return False
+            if lowered == b"cache-control" and any(
+                directive in value.lower() for directive in _UNCACHEABLE_DIRECTIVES
+            ):
+                return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = CacheContext(self.cache)
+        scope[RESPONSE_CACHE_SCOPE_KEY] = context
+        method = scope.get("method", "GET")
+        if method not in self.CACHEABLE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = get_headers(scope)
+        base = (
+            request_host(scope),
+            method,
+            normalize_path(scope.get("path", "/")),
+            normalize_query(scope.get("query_string", b"")),
+        )
+        credentials = [name for name in _CREDENTIAL_HEADERS if name in headers]
+        entry = self.cache.get(base, headers, require_vary=credentials)
+        if entry is not None:
+            await self._send_cached_response(send, entry)
+            return
+
+        generation = self.cache.generation
+        captured = {"status": 200, "headers": [], "body": [], "size": 0, "complete": False}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+                message = {**message, "headers": [*captured["headers"], (b"x-cache", b"miss")]}
+            elif message["type"] == "http.response.body" and captured["body"] is not None:
+                chunk = message.get("body", b"")
+                captured["size"] += len(chunk)
+                if captured["size"] > self.cache.max_entry_bytes:
+                    captured["body"] = None
+                elif chunk:
+                    captured["body"].append(chunk)
+                if not message.get("more_body", False):
+                    captured["complete"] = True
+            await send(message)
+
+        await self.app(scope, receive, capture_send)
+
+        policy = context.policy or self.default_policy
+        if (
+            policy is None
+            or captured["status"] != 200
+            or not captured["complete"]
+            or generation != self.cache.generation
+            or not self._response_cacheable(captured["headers"])
+        ):
+            return
+        vary = self._vary_for(policy, captured["headers"])
+        if vary is None:
+            return
+        if any(name not in vary for name in credentials):
+            return
+
+        self.cache.set(
+            base,
+            vary,
+            headers,
+            status=captured["status"],
+            response_headers=shareable_headers(captured["headers"]),
+            body=b"".join(captured["body"]),
+            ttl=policy.ttl,
+        )
+
+
+__all__ = [
+    "CacheContext",
+    "CacheEntry",
+    "CachePolicy",
+    "ResponseCache",
+    "ResponseCacheMiddleware",
+    "get_response_cache",
+]
@@ -4,6 +4,8 @@ import logging
 import asyncio
 from typing import Callable, Dict, List, Optional, Any
 
+from neutronapi.headers import get_headers
+
 logger = logging.getLogger(__name__)
 
 
@@ -131,7 +133,7 @@ class RoutingMiddleware:
             return
 
         # Extract the host from headers
-        headers = dict(scope.get("headers", []))
+        headers = get_headers(scope)
         host = headers.get(b"host", b"").decode("utf-8", "ignore").split(":")[0]
 
         handler = None
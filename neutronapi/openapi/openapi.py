@@ -708,7 +708,7 @@ class OpenAPIGenerator:
         if api and getattr(api, "resource", None):
             list_url = api.resource
 
-        return {
+        schema = {
             "type": "object",
             "properties": {
                 "object": {"type": "string", "example": "list"},
@@ -718,6 +718,18 @@ class OpenAPIGenerator:
             },
             "required": ["object", "data", "has_more", "url"],
         }
+        if getattr(api, "pagination", "page") == "cursor":
+            cursor_schema = {"type": "string", "nullable": True}
+            schema["properties"]["next_cursor"] = {
+                **cursor_schema,
+                "description": "Pass as `cursor` to fetch the next page",
+            }
+            schema["properties"]["previous_cursor"] = {
+                **cursor_schema,
+                "description": "Pass as `cursor` to fetch the previous page",
+            }
+            schema["required"] += ["next_cursor", "previous_cursor"]
+        return schema
 
     def _generate_parameters(
         self,
@@ -736,15 +748,25 @@ class OpenAPIGenerator:
 
         # Add pagination parameters for GET requests
         if self._is_list_operation(method, handler, operation_name):
+            if getattr(api, "pagination", "page") == "cursor":
+                position = {
+                    "name": "cursor",
+                    "in": "query",
+                    "description": "Opaque cursor from a previous page's next_cursor or previous_cursor",
+                    "required": False,
+                    "schema": {"type": "string"},
+                }
+            else:
+                position = {
+                    "name": "page",
+                    "in": "query",
+                    "description": "Page number",
+                    "required": False,
+                    "schema": {"type": "integer", "default": 1, "minimum": 1},
+                }
             parameters.extend(
                 [
-                    {
-                        "name": "page",
-                        "in": "query",
-                        "description": "Page number",
-                        "required": False,
-                        "schema": {"type": "integer", "default": 1, "minimum": 1},
-                    },
+                    position,
                     {
                         "name": "page_size",
                         "in": "query",
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from io import BytesIO
-from typing import Dict, List, Optional, Any
+import asyncio
+import hashlib
+from tempfile import SpooledTemporaryFile
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from multipart import parse_form
+from multipart.multipart import MultipartParser as _MultipartStateMachine
+from multipart.multipart import parse_options_header
 
 from neutronapi.encoders import json_loads
+from neutronapi.headers import get_headers
+from neutronapi.streams import AsyncByteStream, invalid_record
 
 
 class BaseParser:
@@ -31,7 +36,8 @@ class BaseParser:
         Args:
             scope: ASGI scope
             receive: ASGI receive callable
-            raw_body: Raw request body bytes
+            raw_body: Raw request body; ``bytes``, or a ``bytearray`` when the
+                body arrived in several chunks
             headers: Request headers
             
         Returns:
@@ -71,6 +77,45 @@ class JSONParser(BaseParser):
         return {"body": data}
 
 
+class NDJSONParser(BaseParser):
+    """Parser for newline-delimited JSON (JSON lines) bodies.
+
+    Buffered and lazy endpoints get the records as a list under ``body``. A
+    body that fails to decode is rejected with a 400 listing the offending
+    lines (at most ``max_errors`` of them).
+
+    For large ingests, declare the endpoint ``request_body_mode="streamed"``
+    and decode records as they arrive instead:
+
+    Example:
+        @API.endpoint("/events/ingest", methods=["POST"], request_body_mode="streamed")
+        async def ingest(self, scope, receive, send, **kwargs):
+            async for batch in kwargs["stream"].iter_json_batches(1000):
+                await Event.objects.bulk_create([Event(**row) for row in batch])
+    """
+
+    media_types = ["application/x-ndjson", "application/jsonl", "application/x-jsonlines"]
+
+    def __init__(self, *, max_errors: int = 100) -> None:
+        self.max_errors = max_errors
+
+    async def parse(self, scope: Dict[str, Any], receive: Any, *, raw_body: bytes, headers: Dict[bytes, bytes]) -> Dict[str, Any]:
+        records: List[Any] = []
+        errors: List[Dict[str, str]] = []
+        for line_number, line in enumerate(raw_body.split(b"\n") if raw_body else (), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json_loads(line))
+            except ValueError as error:
+                if len(errors) < self.max_errors:
+                    errors.extend(invalid_record(line_number, error).errors)
+        if errors:
+            from neutronapi.api import exceptions
+            raise exceptions.ValidationError("Invalid JSON lines body", errors=errors)
+        return {"body": records}
+
+
 class FormParser(BaseParser):
     media_types = ["application/x-www-form-urlencoded"]
 
@@ -86,9 +131,266 @@ class FormParser(BaseParser):
         return {"body": data}
 
 
+class UploadFile:
+    """A file part of a multipart request.
+
+    The content lives in ``file``, a ``SpooledTemporaryFile`` that stays in
+    memory up to the parser's ``spool_max_size`` and moves to disk beyond it.
+    ``digest`` is the hex digest of the content when the parser was given a
+    ``hash_algorithm``.
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        filename: Optional[str],
+        content_type: Optional[str],
+        headers: Dict[bytes, bytes],
+        *,
+        spool_max_size: int,
+    ) -> None:
+        self.field_name = field_name
+        self.filename = filename
+        self.content_type = content_type
+        self.headers = headers
+        self.spool_max_size = spool_max_size
+        self.file = SpooledTemporaryFile(max_size=spool_max_size)
+        self.size = 0
+        self.digest: Optional[str] = None
+        self._written = 0
+
+    @property
+    def in_memory(self) -> bool:
+        # SpooledTemporaryFile rolls to disk once more than max_size bytes are written.
+        return self._written <= self.spool_max_size
+
+    async def write(self, data: bytes) -> None:
+        """Append ``data``; writes that spill to disk, or land there, run in a thread."""
+        self._written += len(data)
+        if self.in_memory:
+            self.file.write(data)
+        else:
+            await asyncio.to_thread(self.file.write, data)
+
+    async def read(self, size: int = -1) -> bytes:
+        if self.in_memory:
+            return self.file.read(size)
+        return await asyncio.to_thread(self.file.read, size)
+
+    async def seek(self, offset: int) -> None:
+        if self.in_memory:
+            self.file.seek(offset)
+        else:
+            await asyncio.to_thread(self.file.seek, offset)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __repr__(self) -> str:
+        return f"UploadFile(field_name={self.field_name!r}, filename={self.filename!r}, size={self.size})"
+
+
+class MultipartForm:
+    """Fields and files of a multipart request, in the order received."""
+
+    def __init__(self, fields: Dict[str, str], files: List[UploadFile]) -> None:
+        self.fields = fields
+        self.files = files
+
+    def file(self, field_name: str) -> Optional[UploadFile]:
+        """Return the first file sent under ``field_name``."""
+        return next((upload for upload in self.files if upload.field_name == field_name), None)
+
+    def close(self) -> None:
+        for upload in self.files:
+            upload.close()
+
+    async def __aenter__(self) -> "MultipartForm":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _part_too_large(kind: str) -> Exception:
+    from neutronapi.api import exceptions
+    return exceptions.APIException(f"Multipart {kind} too large", type="request_too_large", status=413)
+
+
+def _invalid_multipart() -> Exception:
+    from neutronapi.api import exceptions
+    return exceptions.ValidationError("Invalid multipart form data")
+
+
+def close_uploads(parsed: Dict[str, Any]) -> None:
+    """Close the ``files`` a buffered multipart parse returned."""
+    for upload in parsed.get("files") or ():
+        if isinstance(upload, UploadFile):
+            upload.close()
+
+
+class _MultipartReader:
+    """Incremental multipart/form-data reader.
+
+    ``feed`` pushes body bytes through the state machine and returns the file
+    writes they produced, so the caller can perform them (in a thread once a
+    file has spilled to disk) without holding more than one chunk.
+    """
+
+    def __init__(self, parser: "MultiPartParser", boundary: bytes) -> None:
+        self.options = parser
+        self.fields: Dict[str, str] = {}
+        self.files: List[UploadFile] = []
+        self.complete = False
+        self._parts = 0
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+        self._field: Optional[Tuple[str, bytearray]] = None
+        self._upload: Optional[UploadFile] = None
+        self._hash: Any = None
+        self._writes: List[Tuple[UploadFile, bytes]] = []
+        self._machine = _MultipartStateMachine(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_end": self._on_end,
+            },
+        )
+
+    def _on_part_begin(self) -> None:
+        self._parts += 1
+        if self._parts > self.options.max_parts:
+            raise _invalid_multipart()
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[bytes(self._header_field).strip().lower()] = bytes(self._header_value).strip()
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = params.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in params:
+            self._field = (name, bytearray())
+            return
+        content_type = self._headers.get(b"content-type")
+        self._upload = UploadFile(
+            name,
+            params[b"filename"].decode("utf-8", "replace") or None,
+            content_type.decode("latin-1") if content_type else None,
+            self._headers,
+            spool_max_size=self.options.spool_max_size,
+        )
+        self.files.append(self._upload)
+        if self.options.hash_algorithm:
+            self._hash = hashlib.new(self.options.hash_algorithm)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        upload = self._upload
+        if upload is None:
+            value = self._field[1]
+            value += chunk
+            if len(value) > self.options.max_field_size:
+                raise _part_too_large("field")
+            return
+        upload.size += len(chunk)
+        max_file_size = self.options.max_file_size
+        if max_file_size is not None and upload.size > max_file_size:
+            raise _part_too_large("file")
+        if self._hash is not None:
+            self._hash.update(chunk)
+        self._writes.append((upload, bytes(chunk)))
+
+    def _on_part_end(self) -> None:
+        if self._upload is not None:
+            if self._hash is not None:
+                self._upload.digest = self._hash.hexdigest()
+            self._upload = self._hash = None
+        elif self._field is not None:
+            name, value = self._field
+            self.fields[name] = value.decode("utf-8", "replace")
+            self._field = None
+
+    def _on_end(self) -> None:
+        self.complete = True
+
+    def feed(self, chunk: bytes) -> List[Tuple[UploadFile, bytes]]:
+        try:
+            self._machine.write(chunk)
+        except Exception as exc:
+            from neutronapi.api import exceptions
+            if isinstance(exc, exceptions.APIException):
+                raise
+            raise _invalid_multipart() from exc
+        writes, self._writes = self._writes, []
+        return writes
+
+    async def form(self) -> MultipartForm:
+        if not self.complete:
+            raise _invalid_multipart()
+        for upload in self.files:
+            await upload.seek(0)
+        return MultipartForm(self.fields, self.files)
+
+    def close(self) -> None:
+        for upload in self.files:
+            upload.close()
+
+
 class MultiPartParser(BaseParser):
+    """Parser for multipart/form-data.
+
+    As a buffered parser it returns the fields as ``body``, the first file's
+    bytes as ``file`` (with ``filename`` and ``file_content_type``) and every
+    file part as ``files``; those are closed once the handler returns. Streamed endpoints call ``parse_stream`` instead,
+    which reads the body incrementally so memory stays flat however large the
+    upload: file parts are spooled to disk above ``spool_max_size``, capped
+    at ``max_file_size`` each and hashed while streaming when
+    ``hash_algorithm`` is set.
+
+    Example:
+        @API.endpoint("/uploads", methods=["POST"], request_body_mode="streamed")
+        async def upload(self, scope, receive, send, **kwargs):
+            async with await MultiPartParser(hash_algorithm="sha256").parse_stream(
+                scope, kwargs["stream"]
+            ) as form:
+                return await self.response([upload.digest for upload in form.files])
+    """
+
     media_types = ["multipart/form-data"]
 
+    def __init__(
+        self,
+        *,
+        spool_max_size: int = 1024 * 1024,
+        max_file_size: Optional[int] = None,
+        max_field_size: int = 1024 * 1024,
+        max_parts: int = 1000,
+        hash_algorithm: Optional[str] = None,
+    ) -> None:
+        if hash_algorithm is not None:
+            hashlib.new(hash_algorithm)  # fail fast on unknown algorithms
+        self.spool_max_size = spool_max_size
+        self.max_file_size = max_file_size
+        self.max_field_size = max_field_size
+        self.max_parts = max_parts
+        self.hash_algorithm = hash_algorithm
+
     @staticmethod
     def _extract_boundary(headers: Dict[bytes, bytes]) -> Optional[bytes]:
         content_type = headers.get(b"content-type", b"")
@@ -99,84 +401,43 @@ class MultiPartParser(BaseParser):
             return value.strip().strip(b'"') or None
         return None
 
-    @staticmethod
-    def _extract_first_file_content_type(raw_body: bytes, boundary: bytes | None) -> Optional[str]:
-        if not raw_body or not boundary:
-            return None
-
-        delimiter = b"--" + boundary
-        for segment in raw_body.split(delimiter):
-            part = segment.strip()
-            if not part or part == b"--":
-                continue
-
-            header_block, separator, _ = part.partition(b"\r\n\r\n")
-            if not separator:
-                continue
-
-            headers_by_name: Dict[bytes, bytes] = {}
-            for header_line in header_block.split(b"\r\n"):
-                name, _, value = header_line.partition(b":")
-                if not value:
-                    continue
-                headers_by_name[name.strip().lower()] = value.strip()
+    def _reader(self, headers: Dict[bytes, bytes]) -> _MultipartReader:
+        boundary = self._extract_boundary(headers)
+        if not boundary:
+            raise _invalid_multipart()
+        return _MultipartReader(self, boundary)
 
-            disposition = headers_by_name.get(b"content-disposition", b"")
-            if b"filename=" not in disposition.lower():
-                continue
-
-            content_type = headers_by_name.get(b"content-type")
-            if content_type:
-                return content_type.decode("utf-8", "ignore")
-            return None
-
-        return None
+    async def parse_stream(self, scope: Dict[str, Any], stream: AsyncByteStream) -> MultipartForm:
+        """Parse a streamed multipart body; close the returned form when done."""
+        reader = self._reader(get_headers(scope))
+        try:
+            async for chunk in stream:
+                for upload, data in reader.feed(chunk):
+                    await upload.write(data)
+            return await reader.form()
+        except BaseException:
+            reader.close()
+            raise
 
     async def parse(self, scope, receive, *, raw_body: bytes, headers: Dict[bytes, bytes]) -> Dict:
-        data: Dict[str, object] = {}
-        file_bytes: Optional[bytes] = None
-        filename: Optional[str] = None
-        file_content_type: Optional[str] = None
-
-        def on_field(field) -> None:
-            key = (field.field_name or b"").decode("utf-8")
-            value = field.value or b""
-            data[key] = value.decode("utf-8")
-
-        def on_file(file) -> None:
-            nonlocal file_bytes, filename
-            if file_bytes is not None:
-                return
-            filename = (file.file_name or b"").decode("utf-8") or None
-            file.file_object.seek(0)
-            file_bytes = file.file_object.read()
-
+        reader = self._reader(headers)
         try:
-            parse_form(
-                {
-                    "Content-Type": headers.get(b"content-type", b""),
-                    "Content-Length": str(len(raw_body)).encode("utf-8"),
-                },
-                BytesIO(raw_body),
-                on_field,
-                on_file,
-            )
-        except Exception:
-            from neutronapi.api import exceptions
-            raise exceptions.ValidationError("Invalid multipart form data")
-
-        file_content_type = self._extract_first_file_content_type(
-            raw_body,
-            self._extract_boundary(headers),
-        )
-
-        out = {"body": data}
-        if file_bytes is not None:
+            for upload, data in reader.feed(raw_body):
+                await upload.write(data)
+            form = await reader.form()
+        except BaseException:
+            reader.close()
+            raise
+
+        out: Dict[str, Any] = {"body": form.fields, "files": form.files}
+        if form.files:
+            first = form.files[0]
             out.update({
-                "file": file_bytes,
-                "filename": filename,
-                "file_content_type": file_content_type,
+                "file": await first.read(),
+                "filename": first.filename,
+                "file_content_type": first.content_type,
             })
+            await first.seek(0)
         return out
 
 
@@ -201,7 +462,7 @@ class BinaryParser(BaseParser):
         Returns:
             Dict with 'raw' key containing raw bytes and 'body' key with parsed data
         """
-        result = {"raw": raw_body or b""}
+        result = {"raw": bytes(raw_body) if raw_body else b""}
 
         # If content-type declares JSON, parse it strictly — no silent fallback
         ctype = (headers.get(b"content-type") or b"").split(b";", 1)[0].strip().lower()
@@ -213,6 +474,79 @@ class BinaryParser(BaseParser):
                 from neutronapi.api import exceptions
                 raise exceptions.ValidationError("Invalid JSON body")
         else:
-            result["body"] = raw_body
+            result["body"] = result["raw"]
 
         return result
+
+
+class LazyBody:
+    """Request body that is read and parsed on first access.
+
+    Endpoints declared with ``request_body_mode="lazy"`` receive one of these
+    as ``kwargs["body"]``. Handlers that reject a request early never pay for
+    reading or decoding the body.
+
+    Example:
+        @API.endpoint("/items", methods=["POST"], request_body_mode="lazy")
+        async def create(self, scope, receive, send, **kwargs):
+            if not scope.get("user"):
+                raise exceptions.AuthenticationFailed()
+            data = await kwargs["body"]  # parsed once, then cached
+    """
+
+    _UNSET = object()
+
+    def __init__(
+        self,
+        scope: Dict[str, Any],
+        receive: Any,
+        *,
+        parser: BaseParser,
+        headers: Dict[bytes, bytes],
+        stream: AsyncByteStream,
+        validator: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self._scope = scope
+        self._receive = receive
+        self._parser = parser
+        self._headers = headers
+        self._stream = stream
+        self._validator = validator
+        self._raw: Any = self._UNSET
+        self._parsed: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._parsed is not None
+
+    async def raw(self) -> bytes:
+        """Return the unparsed body bytes, reading them on first call."""
+        if self._raw is self._UNSET:
+            self._raw = await self._stream.read_body()
+        return self._raw
+
+    async def parsed(self) -> Dict[str, Any]:
+        """Return the full parser output (``body`` plus e.g. ``file`` for multipart)."""
+        if self._parsed is None:
+            raw_body = await self.raw()
+            parsed = await self._parser.parse(
+                self._scope,
+                self._receive,
+                raw_body=raw_body,
+                headers=self._headers,
+            )
+            if self._validator is not None:
+                self._validator(parsed.get("body"))
+            self._parsed = parsed
+        return self._parsed
+
+    def close(self) -> None:
+        """Close the uploaded files the parser returned, if the body was parsed."""
+        if self._parsed is not None:
+            close_uploads(self._parsed)
+
+    async def _body(self) -> Any:
+        return (await self.parsed()).get("body")
+
+    def __await__(self):
+        return self._body().__await__()
@@ -0,0 +1,107 @@
+"""Permission contract and evaluation helpers for NeutronAPI."""
+import abc
+import asyncio
+from typing import Any, Iterable, List, Optional
+
+SINGLETON = "singleton"
+PER_REQUEST = "request"
+LIFECYCLES = (SINGLETON, PER_REQUEST)
+
+
+class BasePermission(abc.ABC):
+    """Optional base class for endpoint permission classes.
+
+    ``lifecycle`` controls instantiation: "request" (default) builds a new
+    instance for every request, as permission classes always were; stateless
+    classes can set ``lifecycle = "singleton"`` to be built once per route when
+    the route is registered and shared by concurrent requests.
+
+    Set ``concurrent = True`` on checks that do I/O (database lookups, remote
+    policy services). Adjacent concurrent permissions run together with
+    ``asyncio.gather`` semantics and stop at the first denial.
+    """
+
+    lifecycle: str = PER_REQUEST
+    concurrent: bool = False
+
+    @abc.abstractmethod
+    async def has_permission(self, scope: dict, user: Any) -> bool:
+        """Return True to allow the request."""
+        ...
+
+
+def lifecycle_of(spec: Any, default: str = PER_REQUEST) -> str:
+    """Return the declared lifecycle of a permission or throttle class."""
+    lifecycle = getattr(spec, "lifecycle", default)
+    if lifecycle not in LIFECYCLES:
+        name = getattr(spec, "__name__", type(spec).__name__)
+        raise ValueError(
+            f"{name}.lifecycle must be one of {', '.join(LIFECYCLES)}, got {lifecycle!r}"
+        )
+    return lifecycle
+
+
+def bind(spec: Any, default: str = PER_REQUEST) -> Any:
+    """Resolve a class or instance at route registration time.
+
+    Classes that opt into the singleton lifecycle are instantiated once; all
+    other classes are kept as classes and instantiated by
+    ``instance_for_request``.
+    """
+    if isinstance(spec, type) and lifecycle_of(spec, default) == SINGLETON:
+        return spec()
+    return spec
+
+
+def instance_for_request(bound: Any) -> Any:
+    return bound() if isinstance(bound, type) else bound
+
+
+async def _all_allowed(checks: List[Any]) -> bool:
+    if len(checks) == 1:
+        return bool(await checks[0])
+    tasks = [asyncio.ensure_future(check) for check in checks]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.result():
+                    return False
+        return True
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def permissions_allow(scope: dict, permissions: Iterable[Any], user: Optional[Any] = None) -> bool:
+    """Evaluate permissions in order, batching adjacent concurrent ones."""
+    batch: List[Any] = []
+    for bound in permissions:
+        permission = instance_for_request(bound)
+        if getattr(permission, "concurrent", False):
+            batch.append(permission.has_permission(scope, user))
+            continue
+        if batch:
+            allowed = await _all_allowed(batch)
+            batch = []
+            if not allowed:
+                return False
+        if not await permission.has_permission(scope, user):
+            return False
+    if batch:
+        return await _all_allowed(batch)
+    return True
+
+
+__all__ = [
+    "BasePermission",
+    "LIFECYCLES",
+    "PER_REQUEST",
+    "SINGLETON",
+    "bind",
+    "instance_for_request",
+    "lifecycle_of",
+    "permissions_allow",
+]
@@ -1,23 +1,92 @@
 from __future__ import annotations
 
+import asyncio
+import csv
+import io
+import mimetypes
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
 from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from neutronapi.api import exceptions
+from neutronapi.encoders import json_dumps_bytes, json_loads
+from neutronapi.headers import Headers, get_headers, merge_headers
+from neutronapi.streams import SharedReceive
 
 
 HeaderTuples = List[Tuple[bytes, bytes]]
 
 
+class _Flush:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "FLUSH"
+
+
+# Yield this from a StreamingResponse body to send coalesced bytes right away.
+FLUSH = _Flush()
+
+
+# StreamingResponse.from_queryset format -> content type
+_EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _content_disposition(filename: str) -> bytes:
+    quoted = quote(filename)
+    if quoted == filename:
+        return f'attachment; filename="{filename}"'.encode("latin-1")
+    return f"attachment; filename*=utf-8''{quoted}".encode("latin-1")
+
+
+def _as_bytes(chunk: Any) -> bytes:
+    if not isinstance(chunk, bytes):
+        chunk = str(chunk).encode("utf-8")
+    return chunk
+
+
 class StreamingResponse:
-    """Generic async chunked response."""
+    """Generic async chunked response.
+
+    By default every chunk the body yields goes out as its own
+    ``http.response.body`` message. With ``buffer_size`` set, chunks are
+    coalesced until at least that many bytes are pending, and with
+    ``flush_interval`` (seconds) pending bytes are also sent once they are that
+    old, even while the body is idle. Yielding ``FLUSH`` sends pending bytes
+    immediately.
+
+    The body is only advanced after the previous message was sent, so a slow
+    client holds back the producer instead of growing a buffer. The body is
+    cancelled and closed when the client disconnects.
+    """
 
     def __init__(
         self,
         body: AsyncIterator[bytes],
         status: int = 200,
         headers: Optional[Dict[str, Any] | HeaderTuples] = None,
+        *,
+        buffer_size: int = 0,
+        flush_interval: Optional[float] = None,
     ) -> None:
+        if buffer_size < 0:
+            raise ValueError("buffer_size must be >= 0")
+        if flush_interval is not None:
+            if flush_interval <= 0:
+                raise ValueError("flush_interval must be > 0")
+            if not buffer_size:
+                raise ValueError("flush_interval requires buffer_size")
         self.body = body
         self.status = status
         self.headers = self._normalize_headers(headers)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
 
     @staticmethod
     def _normalize_headers(
@@ -32,8 +101,78 @@ class StreamingResponse:
             ]
         return list(headers)
 
+    @staticmethod
+    async def from_queryset(
+        queryset: Any,
+        format: str = "ndjson",
+        *,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: int = 1000,
+        status: int = 200,
+        headers: Optional[Dict[str, Any] | HeaderTuples] = None,
+        filename: Optional[str] = None,
+        buffer_size: int = 64 * 1024,
+    ) -> "StreamingResponse":
+        """Stream every row of ``queryset`` as NDJSON, a JSON array or CSV.
+
+        Rows are read with ``QuerySet.iter_batches`` and each batch is encoded
+        in one pass of the model's compiled serializer, so memory stays
+        proportional to ``batch_size`` however many rows are exported. The
+        first batch is read before returning, so query errors still get a
+        proper status. ``filename`` makes the response a download::
+
+            @API.endpoint("/orders/export", methods=["GET"])
+            async def export(self, scope, receive, send, **kwargs):
+                return await StreamingResponse.from_queryset(
+                    Order.objects.filter(status="paid"), "csv", filename="orders.csv"
+                )
+        """
+        content_type = _EXPORT_FORMATS.get(format)
+        if content_type is None:
+            raise ValueError(f"format must be one of: {', '.join(_EXPORT_FORMATS)}")
+        from neutronapi.serializers import serializer_for
+
+        serializer = serializer_for(queryset.model, tuple(fields) if fields is not None else None)
+        batches = queryset.iter_batches(batch_size)
+        first_batch = await anext(batches, [])
+
+        response = StreamingResponse(
+            _export_rows(serializer, format, first_batch, batches),
+            status=status,
+            headers=headers,
+            buffer_size=buffer_size,
+        )
+        defaults = [(b"content-type", content_type.encode("latin-1"))]
+        if filename is not None:
+            defaults.append((b"content-disposition", _content_disposition(filename)))
+        names = {name for name, _ in response.headers}
+        response.headers[:0] = [header for header in defaults if header[0] not in names]
+        return response
+
     async def __call__(self, scope, receive, send) -> None:
-        await self.send(send)
+        task = asyncio.current_task()
+        disconnected = False
+        # AsyncByteStreams reading the request body from the same receive go
+        # through the watcher's SharedReceive, so no body message is lost.
+        receive = SharedReceive(receive)
+        token = receive.activate()
+
+        async def watch() -> None:
+            nonlocal disconnected
+            if await receive.wait_for_disconnect():
+                disconnected = True
+                task.cancel()
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await self.send(send)
+        except asyncio.CancelledError:
+            # Swallow only our own cancellation, never one from outside.
+            if not disconnected or task.uncancel():
+                raise
+        finally:
+            watcher.cancel()
+            SharedReceive.deactivate(token)
 
     async def send(self, send_callable) -> None:
         await send_callable(
@@ -44,21 +183,344 @@ class StreamingResponse:
             }
         )
 
-        async for chunk in self.body:
-            if not isinstance(chunk, bytes):
-                chunk = str(chunk).encode("utf-8")
-            await send_callable(
-                {
-                    "type": "http.response.body",
-                    "body": chunk,
-                    "more_body": True,
-                }
-            )
+        try:
+            if self.buffer_size:
+                tail = await self._send_coalesced(send_callable)
+            else:
+                tail = b""
+                async for chunk in self.body:
+                    if chunk is FLUSH:
+                        continue
+                    await send_callable(
+                        {
+                            "type": "http.response.body",
+                            "body": _as_bytes(chunk),
+                            "more_body": True,
+                        }
+                    )
+        finally:
+            aclose = getattr(self.body, "aclose", None)
+            if aclose is not None:
+                await aclose()
 
         await send_callable(
             {
                 "type": "http.response.body",
-                "body": b"",
+                "body": tail,
                 "more_body": False,
             }
         )
+
+    async def _send_coalesced(self, send_callable) -> bytes:
+        """Send the body in messages of about ``buffer_size`` bytes.
+
+        Returns the bytes still pending when the body ends, so they can go out
+        with the final message.
+        """
+        iterator = self.body.__aiter__()
+        loop = asyncio.get_running_loop()
+        pending: List[bytes] = []
+        size = 0
+        deadline: Optional[float] = None
+        next_chunk: Optional[asyncio.Future] = None
+
+        async def flush() -> None:
+            nonlocal pending, size, deadline
+            body = b"".join(pending)
+            pending, size, deadline = [], 0, None
+            await send_callable({"type": "http.response.body", "body": body, "more_body": True})
+
+        try:
+            while True:
+                if self.flush_interval is None:
+                    try:
+                        chunk = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                else:
+                    if next_chunk is None:
+                        next_chunk = asyncio.ensure_future(iterator.__anext__())
+                    timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                    await asyncio.wait((next_chunk,), timeout=timeout)
+                    if not next_chunk.done():
+                        # The body is idle; don't let pending bytes go stale.
+                        await flush()
+                        continue
+                    done, next_chunk = next_chunk, None
+                    try:
+                        chunk = done.result()
+                    except StopAsyncIteration:
+                        break
+
+                if chunk is FLUSH:
+                    if pending:
+                        await flush()
+                    continue
+                chunk = _as_bytes(chunk)
+                if not chunk:
+                    continue
+                if deadline is None and self.flush_interval is not None:
+                    deadline = loop.time() + self.flush_interval
+                pending.append(chunk)
+                size += len(chunk)
+                if size >= self.buffer_size or (deadline is not None and loop.time() >= deadline):
+                    await flush()
+        finally:
+            if next_chunk is not None and not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.wait((next_chunk,))
+
+        return b"".join(pending)
+
+
+async def _export_rows(
+    serializer: Any, format: str, batch: List[Any], batches: AsyncIterator[List[Any]]
+) -> AsyncIterator[bytes]:
+    try:
+        if format == "json":
+            sent = False
+            while batch:
+                yield (b"," if sent else b"[") + serializer.dumps_many(batch)[1:-1]
+                sent = True
+                batch = await anext(batches, [])
+            yield b"]" if sent else b"[]"
+        elif format == "ndjson":
+            while batch:
+                yield serializer.dumps_lines(batch)
+                batch = await anext(batches, [])
+        else:
+            names = serializer.fields
+            project = serializer.project
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(names)
+            while batch:
+                for obj in batch:
+                    row = project(obj)
+                    writer.writerow([_csv_value(row[name]) for name in names])
+                yield out.getvalue().encode("utf-8")
+                out.seek(0)
+                out.truncate()
+                batch = await anext(batches, [])
+            if out.tell():
+                yield out.getvalue().encode("utf-8")
+    finally:
+        await batches.aclose()
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None or type(value) in (str, int, float):
+        return value
+    # Everything else is written the way the JSON formats would encode it.
+    tolist = getattr(value, "tolist", None)
+    if tolist is not None:
+        value = tolist()
+    encoded = json_dumps_bytes(value)
+    return json_loads(encoded) if encoded[:1] == b'"' else encoded.decode("utf-8")
+
+
+# _parse_range result for a syntactically valid but unsatisfiable range.
+_UNSATISFIABLE = (-1, -1)
+
+
+def _parse_range(value: bytes, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into ``(start, end)``, end exclusive.
+
+    Returns None for anything to ignore (other units, bad syntax, several
+    ranges), so the full file is sent instead.
+    """
+    unit, _, spec = value.decode("latin-1").partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return _UNSATISFIABLE
+        return max(size - suffix, 0), size
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return _UNSATISFIABLE
+    end = min(int(last) + 1, size) if last else size
+    return start, end
+
+
+def _etag_matches(header: bytes, etag: bytes) -> bool:
+    """Weak ``If-None-Match`` comparison."""
+    if header.strip() == b"*":
+        return True
+    return any(
+        candidate.strip().removeprefix(b"W/") == etag for candidate in header.split(b",")
+    )
+
+
+class FileResponse:
+    """Serve a file from disk without holding it in memory.
+
+    The body goes out as ``http.response.pathsend`` or
+    ``http.response.zerocopy`` when the server lists the extension in
+    ``scope["extensions"]``; otherwise it is streamed in ``chunk_size`` reads
+    done in a worker thread. ``HEAD`` requests never open the file.
+
+    ``ETag``/``Last-Modified`` are derived from the file's stat and
+    conditional ``GET``/``HEAD`` requests get a 304. A single ``Range`` (with
+    ``If-Range``) gets a 206 or 416; requests for several ranges get the
+    whole file.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        status: int = 200,
+        headers: Optional[Dict[str, Any] | HeaderTuples] = None,
+        *,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        chunk_size: int = 64 * 1024,
+        stat_result: Optional[os.stat_result] = None,
+    ) -> None:
+        self.path = os.path.abspath(os.fspath(path))
+        self.status = status
+        self.headers = StreamingResponse._normalize_headers(headers)
+        self.media_type = media_type or mimetypes.guess_type(filename or self.path)[0] or "application/octet-stream"
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.stat_result = stat_result
+
+    def _base_headers(self, stat_result: os.stat_result) -> Tuple[HeaderTuples, bytes, bytes]:
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'.encode("ascii")
+        last_modified = formatdate(stat_result.st_mtime, usegmt=True).encode("ascii")
+        content_type = self.media_type
+        if content_type.startswith("text/") and "charset" not in content_type:
+            content_type += "; charset=utf-8"
+        headers = [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"accept-ranges", b"bytes"),
+            (b"etag", etag),
+            (b"last-modified", last_modified),
+        ]
+        if self.filename is not None:
+            headers.append((b"content-disposition", _content_disposition(self.filename)))
+        return headers, etag, last_modified
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: bytes, mtime: float) -> bool:
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, etag)
+        if_modified_since = request_headers.get(b"if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since.decode("latin-1")).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+
+    @staticmethod
+    def _if_range_matches(request_headers: Headers, etag: bytes, last_modified: bytes) -> bool:
+        if_range = request_headers.get(b"if-range")
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        # Strong comparison: a weak validator never matches.
+        return if_range == etag or if_range == last_modified
+
+    async def __call__(self, scope, receive, send) -> None:
+        stat_result = self.stat_result
+        if stat_result is None:
+            try:
+                stat_result = await asyncio.to_thread(os.stat, self.path)
+            except (FileNotFoundError, NotADirectoryError):
+                raise exceptions.NotFound()
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise exceptions.NotFound()
+
+        headers, etag, last_modified = self._base_headers(stat_result)
+        size = stat_result.st_size
+        start, end = 0, size
+        status = self.status
+        method = scope.get("method", "GET")
+        request_headers = get_headers(scope)
+
+        if status == 200 and method in ("GET", "HEAD"):
+            if self._not_modified(request_headers, etag, stat_result.st_mtime):
+                validators = [(name, value) for name, value in headers if name in (b"etag", b"last-modified")]
+                await send({"type": "http.response.start", "status": 304, "headers": merge_headers(validators, self.headers)})
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            range_header = request_headers.get(b"range")
+            if range_header is not None and self._if_range_matches(request_headers, etag, last_modified):
+                parsed = _parse_range(range_header, size)
+                if parsed is _UNSATISFIABLE:
+                    await send(
+                        {
+                            "type": "http.response.start",
+                            "status": 416,
+                            "headers": [(b"content-range", f"bytes */{size}".encode("ascii"))],
+                        }
+                    )
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    return
+                if parsed is not None:
+                    start, end = parsed
+                    status = 206
+                    headers.append((b"content-range", f"bytes {start}-{end - 1}/{size}".encode("ascii")))
+
+        headers.append((b"content-length", str(end - start).encode("ascii")))
+        headers = merge_headers(headers, self.headers)
+
+        if method == "HEAD":
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if status != 206 and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.pathsend", "path": self.path})
+            return
+
+        if "http.response.zerocopy" in extensions:
+            file = await asyncio.to_thread(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.start", "status": status, "headers": headers})
+                await send(
+                    {
+                        "type": "http.response.zerocopy",
+                        "file": file,
+                        "offset": start,
+                        "count": end - start,
+                        "more_body": False,
+                    }
+                )
+            finally:
+                file.close()
+            return
+
+        body = StreamingResponse(self._read(start, end), status=status, headers=headers)
+        await body(scope, receive, send)
+
+    async def _read(self, start: int, end: int) -> AsyncIterator[bytes]:
+        # Unbuffered, so each read returns its bytes without an extra copy.
+        file = await asyncio.to_thread(open, self.path, "rb", buffering=0)
+        try:
+            if start:
+                file.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = await asyncio.to_thread(file.read, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            file.close()
@@ -0,0 +1,235 @@
+"""Segment-based radix trees used for request routing.
+
+``RouteTree`` resolves a request path to a registered endpoint route in
+O(path depth). ``PrefixTree`` indexes API resources so ``Application`` can
+find every API whose resource is a path prefix without scanning all of them.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_PARAM_RE = re.compile(r"^<(\w+):(\w+)>$")
+_SLUG_RE = re.compile(r"[-a-zA-Z0-9_]+")
+
+
+def _match_int(segment: str) -> bool:
+    return segment.isascii() and segment.isdigit()
+
+
+def _match_slug(segment: str) -> bool:
+    return _SLUG_RE.fullmatch(segment) is not None
+
+
+def _match_str(segment: str) -> bool:
+    return bool(segment)
+
+
+# Converters are tried in this order at every node, most specific first, so an
+# ``<int:...>`` route wins over a ``<str:...>`` route at the same position.
+SEGMENT_CONVERTERS = {
+    "int": _match_int,
+    "slug": _match_slug,
+    "str": _match_str,
+}
+_CONVERTER_PRIORITY = {name: index for index, name in enumerate(SEGMENT_CONVERTERS)}
+PATH_CONVERTER = "path"
+
+
+def split_path(path: str) -> List[str]:
+    """Split a request or route path into segments, ignoring edge slashes."""
+    path = path.strip("/")
+    if not path:
+        return []
+    return path.split("/")
+
+
+def parse_segment(segment: str) -> Optional[Tuple[str, str]]:
+    """Return ``(converter, name)`` for a ``<converter:name>`` segment.
+
+    Raises:
+        ValueError: If the converter is not supported.
+    """
+    if not (segment.startswith("<") and segment.endswith(">")):
+        return None
+    match = _PARAM_RE.match(segment)
+    if match is None:
+        return None
+    converter, name = match.groups()
+    if converter != PATH_CONVERTER and converter not in SEGMENT_CONVERTERS:
+        raise ValueError(
+            f"Unsupported path converter '{converter}' in segment '{segment}'. "
+            f"Use one of: {', '.join([*SEGMENT_CONVERTERS, PATH_CONVERTER])}"
+        )
+    return converter, name
+
+
+class _RouteNode:
+    __slots__ = ("static", "params", "catch_all", "methods")
+
+    def __init__(self) -> None:
+        self.static: Dict[str, _RouteNode] = {}
+        # (converter, name, matcher, node), kept sorted by converter priority
+        self.params: List[Tuple[str, str, Any, _RouteNode]] = []
+        self.catch_all: Optional[Tuple[str, _RouteNode]] = None
+        # method -> route; the first route registered for a method wins
+        self.methods: Dict[str, Any] = {}
+
+
+class RouteTree:
+    """Radix tree mapping ``(path, method)`` to registered routes.
+
+    Static segments take precedence over ``<int:>``, ``<slug:>`` and
+    ``<str:>`` parameters, which take precedence over ``<path:>``. A path that
+    matches a route registered for other methods only yields a 405 instead of
+    a 404.
+    """
+
+    def __init__(self) -> None:
+        self._root = _RouteNode()
+
+    def insert(self, path: str, methods: List[str], route: Any) -> None:
+        """Register ``route`` for ``methods`` at the route pattern ``path``."""
+        node = self._root
+        for segment in split_path(path):
+            param = parse_segment(segment)
+            if param is None:
+                node = node.static.setdefault(segment, _RouteNode())
+                continue
+
+            converter, name = param
+            if converter == PATH_CONVERTER:
+                if node.catch_all is None:
+                    node.catch_all = (name, _RouteNode())
+                elif node.catch_all[0] != name:
+                    raise ValueError(
+                        f"Conflicting <path:> parameters '{node.catch_all[0]}' "
+                        f"and '{name}' in route '{path}'"
+                    )
+                node = node.catch_all[1]
+                continue
+
+            child = next(
+                (
+                    entry[3]
+                    for entry in node.params
+                    if entry[0] == converter and entry[1] == name
+                ),
+                None,
+            )
+            if child is None:
+                child = _RouteNode()
+                node.params.append(
+                    (converter, name, SEGMENT_CONVERTERS[converter], child)
+                )
+                node.params.sort(key=lambda entry: _CONVERTER_PRIORITY[entry[0]])
+            node = child
+
+        for method in methods:
+            node.methods.setdefault(method, route)
+
+    def lookup(
+        self, path: str, method: str
+    ) -> Tuple[Optional[Any], Dict[str, str], bool]:
+        """Resolve ``path`` and ``method``.
+
+        Returns:
+            ``(route, params, path_matched)``. ``route`` is None when no route
+            allows ``method``; ``path_matched`` tells a 405 from a 404 apart.
+        """
+        segments = split_path(path)
+        params: Dict[str, str] = {}
+        state = [False]
+        route = self._search(self._root, segments, 0, method, params, state)
+        return route, (params if route is not None else {}), state[0]
+
+    def _search(
+        self,
+        node: _RouteNode,
+        segments: List[str],
+        index: int,
+        method: str,
+        params: Dict[str, str],
+        state: List[bool],
+    ) -> Optional[Any]:
+        if index == len(segments):
+            if node.methods:
+                state[0] = True
+                return node.methods.get(method)
+            return None
+
+        segment = segments[index]
+
+        child = node.static.get(segment)
+        if child is not None:
+            route = self._search(child, segments, index + 1, method, params, state)
+            if route is not None:
+                return route
+
+        for _converter, name, matcher, child in node.params:
+            if not matcher(segment):
+                continue
+            params[name] = segment
+            route = self._search(child, segments, index + 1, method, params, state)
+            if route is not None:
+                return route
+            del params[name]
+
+        if node.catch_all is not None:
+            name, child = node.catch_all
+            # Greedy like the ``.+`` regex: consume as many segments as possible
+            # and back off until the remainder matches.
+            for end in range(len(segments), index, -1):
+                params[name] = "/".join(segments[index:end])
+                route = self._search(child, segments, end, method, params, state)
+                if route is not None:
+                    return route
+            params.pop(name, None)
+
+        return None
+
+
+class _PrefixNode(Generic[V]):
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _PrefixNode[V]] = {}
+        self.values: List[V] = []
+
+
+class PrefixTree(Generic[V]):
+    """Static segment trie returning every value stored along a path."""
+
+    def __init__(self) -> None:
+        self._root: _PrefixNode[V] = _PrefixNode()
+
+    def insert(self, path: str, value: V) -> None:
+        node = self._root
+        for segment in split_path(path):
+            node = node.children.setdefault(segment, _PrefixNode())
+        node.values.append(value)
+
+    def walk(self, path: str) -> Iterator[Tuple[int, List[V]]]:
+        """Yield ``(depth, values)`` for each stored prefix of ``path``."""
+        node = self._root
+        if node.values:
+            yield 0, node.values
+        for depth, segment in enumerate(split_path(path), start=1):
+            node = node.children.get(segment)
+            if node is None:
+                return
+            if node.values:
+                yield depth, node.values
+
+
+__all__ = [
+    "PATH_CONVERTER",
+    "PrefixTree",
+    "RouteTree",
+    "SEGMENT_CONVERTERS",
+    "parse_segment",
+    "split_path",
+]
@@ -0,0 +1,197 @@
+"""Compiled JSON serializers for ``Model`` instances.
+
+A ``ModelSerializer`` is built once per model class and field selection. It
+generates a projection function specialised to those fields: a single
+expression reading each attribute, converting only the field types orjson
+cannot encode natively (Decimal, binary), so a response is one projection
+pass plus one ``orjson.dumps`` call. Datetimes, enums, JSON values and numpy
+vectors are left to orjson.
+"""
+
+from __future__ import annotations
+
+import base64
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import orjson
+
+from neutronapi.db import fields as model_fields
+from neutronapi.db.models import Model
+from neutronapi.encoders import json_default
+
+_DUMPS_OPTIONS = getattr(orjson, "OPT_SERIALIZE_NUMPY", 0)
+_LINE_OPTIONS = _DUMPS_OPTIONS | orjson.OPT_APPEND_NEWLINE
+
+
+def _convert_decimal(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _convert_binary(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _convert_vector(value: Any) -> Any:
+    # Without numpy support in orjson, fall back to a plain list.
+    if _DUMPS_OPTIONS:
+        return value
+    tolist = getattr(value, "tolist", None)
+    return tolist() if tolist is not None else value
+
+
+_FIELD_CONVERTERS: Tuple[Tuple[type, Callable[[Any], Any]], ...] = (
+    (model_fields.DecimalField, _convert_decimal),
+    (model_fields.BinaryField, _convert_binary),
+    (model_fields.VectorField, _convert_vector),
+)
+
+
+def _converter_for(field: Any) -> Optional[Callable[[Any], Any]]:
+    for field_class, converter in _FIELD_CONVERTERS:
+        if isinstance(field, field_class):
+            return converter
+    return None
+
+
+def fields_from_schema(schema: Optional[Dict[str, Any]]) -> Optional[Tuple[str, ...]]:
+    """Return the property names a response schema exposes, if any.
+
+    Array schemas use their ``items`` schema, so the same projection applies to
+    single objects and lists.
+    """
+    if not isinstance(schema, dict):
+        return None
+    if schema.get("type") == "array" and isinstance(schema.get("items"), dict):
+        schema = schema["items"]
+    properties = schema.get("properties")
+    if not isinstance(properties, dict) or not properties:
+        return None
+    return tuple(properties)
+
+
+class ModelSerializer:
+    """Serialize instances of ``model`` to JSON bytes.
+
+    Args:
+        model: Model class to serialize.
+        fields: Field names to include, in output order. Defaults to every
+            model field.
+        strict: Raise ``ValueError`` for names that are not model fields.
+            When False, such names are skipped; this is how projections
+            derived from ``response_schema`` tolerate computed properties.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        fields: Optional[Sequence[str]] = None,
+        *,
+        strict: bool = True,
+    ) -> None:
+        model_field_map = model._neutronapi_fields_
+        if fields is None:
+            names = list(model_field_map)
+        else:
+            unknown = [name for name in fields if name not in model_field_map]
+            if unknown and strict:
+                raise ValueError(
+                    f"{model.__name__} has no field(s) {', '.join(map(repr, unknown))}"
+                )
+            names = [name for name in fields if name in model_field_map]
+
+        self.model = model
+        self.fields = tuple(names)
+        self.project = self._compile(names, model_field_map)
+
+    @staticmethod
+    def _compile(
+        names: Sequence[str], model_field_map: Dict[str, Any]
+    ) -> Callable[[Any], Dict[str, Any]]:
+        """Generate ``project(obj) -> dict`` as one dict display expression."""
+        namespace: Dict[str, Any] = {}
+        items = []
+        for index, name in enumerate(names):
+            read = f"obj.{name}" if name.isidentifier() else f"getattr(obj, {name!r})"
+            converter = _converter_for(model_field_map[name])
+            if converter is not None:
+                namespace[f"_convert_{index}"] = converter
+                read = f"_convert_{index}({read})"
+            items.append(f"{name!r}: {read}")
+        source = "def project(obj):\n    return {" + ", ".join(items) + "}\n"
+        exec(source, namespace)
+        return namespace["project"]
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(self.project(obj), default=json_default, option=_DUMPS_OPTIONS)
+
+    def dumps_many(self, objs: Iterable[Any]) -> bytes:
+        project = self.project
+        return orjson.dumps(
+            [project(obj) for obj in objs], default=json_default, option=_DUMPS_OPTIONS
+        )
+
+    def dumps_lines(self, objs: Iterable[Any]) -> bytes:
+        """Encode ``objs`` as newline-terminated JSON lines (NDJSON)."""
+        project = self.project
+        dumps = orjson.dumps
+        return b"".join(
+            [dumps(project(obj), default=json_default, option=_LINE_OPTIONS) for obj in objs]
+        )
+
+
+_SERIALIZERS: Dict[Tuple[type, Optional[Tuple[str, ...]], bool], ModelSerializer] = {}
+
+
+def serializer_for(
+    model: type,
+    fields: Optional[Sequence[str]] = None,
+    *,
+    strict: bool = True,
+) -> ModelSerializer:
+    """Return the cached serializer for ``model`` and ``fields``."""
+    key = (model, tuple(fields) if fields is not None else None, strict)
+    serializer = _SERIALIZERS.get(key)
+    if serializer is None:
+        serializer = _SERIALIZERS[key] = ModelSerializer(model, fields, strict=strict)
+    return serializer
+
+
+def is_model_payload(data: Any) -> bool:
+    """True for a Model instance or a non-empty list/tuple of them."""
+    if isinstance(data, Model):
+        return True
+    return type(data) in (list, tuple) and bool(data) and isinstance(data[0], Model)
+
+
+def serialize_models(
+    data: Any,
+    fields: Optional[Sequence[str]] = None,
+    *,
+    strict: bool = True,
+) -> bytes:
+    """Serialize a Model instance or a list of instances to JSON bytes."""
+    if isinstance(data, Model):
+        return serializer_for(type(data), fields, strict=strict).dumps(data)
+
+    model = type(data[0])
+    if all(type(obj) is model for obj in data):
+        return serializer_for(model, fields, strict=strict).dumps_many(data)
+    return orjson.dumps(
+        [serializer_for(type(obj), fields, strict=strict).project(obj) for obj in data],
+        default=json_default,
+        option=_DUMPS_OPTIONS,
+    )
+
+
+__all__ = [
+    "ModelSerializer",
+    "fields_from_schema",
+    "is_model_payload",
+    "serialize_models",
+    "serializer_for",
+]
@@ -0,0 +1,304 @@
+"""Server-sent events responses and a broadcast channel that fans them out.
+
+``EventSourceResponse`` streams ``text/event-stream`` and sends a comment as a
+heartbeat whenever the stream has been idle for ``ping_interval`` seconds.
+
+``Broadcast`` encodes each published event once and hands the same bytes to
+every subscriber. Each subscriber has a bounded queue; one that falls
+``max_queue`` events behind is evicted, which ends its response so the browser
+reconnects and resumes from ``history`` with ``Last-Event-ID``::
+
+    feed = Broadcast(history=500)
+
+    @API.endpoint("/events", methods=["GET"], response_body_mode="streamed")
+    async def stream(self, scope, receive, send, **kwargs):
+        return EventSourceResponse(feed.subscribe(last_event_id(scope)))
+
+    # elsewhere, once: forward matching bus events to every client
+    asyncio.create_task(feed.relay(events.subscribe("order.*")))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from neutronapi.encoders import json_dumps_bytes
+from neutronapi.headers import get_headers
+from neutronapi.responses import HeaderTuples, StreamingResponse
+
+PING = b": ping\n\n"
+
+_DEFAULT_HEADERS = (
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    # Keep reverse proxies such as nginx from buffering the stream.
+    (b"x-accel-buffering", b"no"),
+)
+
+
+def _field(name: str, value: Any) -> bytes:
+    encoded = str(value).encode("utf-8")
+    if b"\n" in encoded or b"\r" in encoded:
+        raise ValueError(f"SSE {name} must not contain line breaks")
+    return encoded
+
+
+def encode_event(
+    data: Any = None,
+    *,
+    event: Optional[str] = None,
+    id: Optional[Any] = None,
+    retry: Optional[int] = None,
+) -> bytes:
+    """Encode one event frame.
+
+    ``str`` and ``bytes`` data are sent as text, split into one ``data:`` line
+    per line; anything else is JSON-encoded.
+    """
+    lines = []
+    if id is not None:
+        lines.append(b"id: " + _field("id", id))
+    if event is not None:
+        lines.append(b"event: " + _field("event", event))
+    if retry is not None:
+        lines.append(b"retry: %d" % retry)
+    if data is not None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif not isinstance(data, bytes):
+            data = json_dumps_bytes(data)
+        lines.extend(b"data: " + line for line in data.splitlines() or (b"",))
+    return b"\n".join(lines) + b"\n\n"
+
+
+@dataclass
+class ServerSentEvent:
+    data: Any = None
+    event: Optional[str] = None
+    id: Optional[Any] = None
+    retry: Optional[int] = None
+
+    def encode(self) -> bytes:
+        return encode_event(self.data, event=self.event, id=self.id, retry=self.retry)
+
+
+def last_event_id(scope: Dict[str, Any]) -> Optional[str]:
+    """Return the ``Last-Event-ID`` a reconnecting client sent, if any."""
+    return get_headers(scope).get_text(b"last-event-id")
+
+
+class Subscription:
+    """One client's view of a ``Broadcast``: a bounded queue of encoded events."""
+
+    __slots__ = ("_broadcast", "_queue", "_waiter", "max_queue", "closed", "evicted")
+
+    def __init__(self, broadcast: "Broadcast", max_queue: int) -> None:
+        self._broadcast = broadcast
+        self._queue: Deque[bytes] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self.max_queue = max_queue
+        self.closed = False
+        self.evicted = False
+
+    def _push(self, chunk: bytes) -> bool:
+        if len(self._queue) >= self.max_queue:
+            return False
+        self._queue.append(chunk)
+        self._wake()
+        return True
+
+    def _wake(self) -> None:
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Return the next encoded event, or None on timeout or once closed."""
+        if not self._queue and not self.closed:
+            loop = asyncio.get_running_loop()
+            waiter = self._waiter = loop.create_future()
+            handle = loop.call_later(timeout, self._wake) if timeout is not None else None
+            try:
+                await waiter
+            finally:
+                self._waiter = None
+                if handle is not None:
+                    handle.cancel()
+        return self._queue.popleft() if self._queue else None
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> bytes:
+        while True:
+            chunk = await self.get()
+            if chunk is not None:
+                return chunk
+            if self.closed:
+                raise StopAsyncIteration
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._broadcast._subscribers.pop(self, None)
+        self._wake()
+
+    def _evict(self) -> None:
+        self.evicted = True
+        self._queue.clear()
+        self.close()
+
+
+class Broadcast:
+    """Publish events once to any number of ``Subscription``s.
+
+    Events without an explicit ``id`` get a sequential one. The last
+    ``history`` events are kept so a subscriber passing ``last_event_id`` gets
+    the ones published after it; an unknown id replays nothing.
+    """
+
+    def __init__(self, *, history: int = 0, max_queue: int = 100) -> None:
+        if max_queue < 1:
+            raise ValueError("max_queue must be >= 1")
+        self.max_queue = max_queue
+        self._history: Deque[Tuple[str, bytes]] = deque(maxlen=history)
+        # dict as an ordered set; subscriptions remove themselves on close.
+        self._subscribers: Dict[Subscription, None] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(
+        self,
+        data: Any = None,
+        *,
+        event: Optional[str] = None,
+        id: Optional[Any] = None,
+        retry: Optional[int] = None,
+    ) -> bytes:
+        """Encode an event and queue it for every subscriber; return its bytes."""
+        if id is None:
+            self._sequence += 1
+            id = self._sequence
+        chunk = encode_event(data, event=event, id=id, retry=retry)
+        if self._history.maxlen:
+            self._history.append((str(id), chunk))
+        for subscription in list(self._subscribers):
+            if not subscription._push(chunk):
+                subscription._evict()
+        return chunk
+
+    def subscribe(self, last_event_id: Optional[str] = None, *, max_queue: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, max_queue or self.max_queue)
+        if last_event_id is not None:
+            ids = [event_id for event_id, _ in self._history]
+            if last_event_id in ids:
+                start = ids.index(last_event_id) + 1
+                # Replay may exceed max_queue; history bounds it anyway.
+                subscription._queue.extend(chunk for _, chunk in list(self._history)[start:])
+        self._subscribers[subscription] = None
+        return subscription
+
+    async def relay(self, source: AsyncIterable[Any]) -> None:
+        """Publish everything ``source`` yields, e.g. an ``EventBus.subscribe`` stream.
+
+        Dataclass events are sent as JSON under their ``event`` name.
+        """
+        async for item in source:
+            self.publish(item, event=getattr(item, "event", None))
+
+
+class EventSourceResponse(StreamingResponse):
+    """Stream ``content`` as server-sent events.
+
+    ``content`` may yield ``ServerSentEvent``s, already-encoded ``bytes``
+    frames (as a ``Subscription`` does) or plain data, which becomes a
+    ``data`` event. ``ping_interval=None`` disables heartbeats.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterable[Any],
+        status: int = 200,
+        headers: Optional[Dict[str, Any] | HeaderTuples] = None,
+        *,
+        ping_interval: Optional[float] = 15.0,
+    ) -> None:
+        if ping_interval is not None and ping_interval <= 0:
+            raise ValueError("ping_interval must be > 0")
+        self.content = content
+        self.ping_interval = ping_interval
+        super().__init__(self._frames(), status=status, headers=headers)
+        names = {name for name, _ in self.headers}
+        self.headers[:0] = [header for header in _DEFAULT_HEADERS if header[0] not in names]
+
+    async def _frames(self) -> AsyncIterator[bytes]:
+        content = self.content
+        try:
+            if isinstance(content, Subscription):
+                while True:
+                    chunk = await content.get(self.ping_interval)
+                    if chunk is not None:
+                        yield chunk
+                    elif content.closed:
+                        return
+                    else:
+                        yield PING
+            elif self.ping_interval is None:
+                async for item in content:
+                    yield _frame(item)
+            else:
+                async for chunk in self._with_heartbeats(content.__aiter__()):
+                    yield chunk
+        finally:
+            close = getattr(content, "aclose", None) or getattr(content, "close", None)
+            if close is not None:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+
+    async def _with_heartbeats(self, iterator: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+        next_item: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if next_item is None:
+                    next_item = asyncio.ensure_future(iterator.__anext__())
+                await asyncio.wait((next_item,), timeout=self.ping_interval)
+                if not next_item.done():
+                    yield PING
+                    continue
+                done, next_item = next_item, None
+                try:
+                    item = done.result()
+                except StopAsyncIteration:
+                    return
+                yield _frame(item)
+        finally:
+            if next_item is not None and not next_item.done():
+                next_item.cancel()
+                await asyncio.wait((next_item,))
+
+
+def _frame(item: Any) -> bytes:
+    if isinstance(item, bytes):
+        return item
+    if isinstance(item, ServerSentEvent):
+        return item.encode()
+    return encode_event(item)
+
+
+__all__ = [
+    "Broadcast",
+    "EventSourceResponse",
+    "PING",
+    "ServerSentEvent",
+    "Subscription",
+    "encode_event",
+    "last_event_id",
+]
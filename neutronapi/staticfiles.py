@@ -0,0 +1,248 @@
+"""Static file serving from an index built once, with a bounded hot-file cache.
+
+``StaticFiles`` walks ``directory`` when loaded (at startup when passed to
+``Application(static_resolver=...)``) and serves only the files it indexed, so
+requests never touch the filesystem to resolve a path and cannot escape the
+directory; symlinks are only served when they resolve inside it. Files added or changed later are picked up by ``reload()``.
+
+Precompressed siblings (``app.js.br``, ``app.js.gz``) are served in place of
+``app.js`` when the client accepts that encoding; nothing is compressed at
+request time. Files of at most ``max_cached_file_size`` bytes are kept in an
+LRU bounded to ``cache_max_bytes``; larger ones go out through
+``FileResponse`` (pathsend, ranges and conditional requests). Names carrying a
+content hash (``app.3f2a9c1b.js``) are sent with an immutable
+``Cache-Control``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import mimetypes
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from neutronapi.api import exceptions
+from neutronapi.base import Response
+from neutronapi.headers import get_headers
+from neutronapi.responses import FileResponse
+
+# ``name.<hash>.ext`` or ``name-<hash>.ext`` with a hex hash of 8+ digits.
+FINGERPRINT_PATTERN = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Sibling suffix -> content-coding, in order of preference.
+_ENCODINGS = ((".br", b"br"), (".gz", b"gzip"))
+
+
+class _Asset:
+    __slots__ = ("path", "stat", "headers", "etag", "last_modified", "encoding")
+
+    def __init__(self, path: str, stat: os.stat_result, headers, etag: bytes, last_modified: bytes, encoding):
+        self.path = path
+        self.stat = stat
+        self.headers = headers
+        self.etag = etag
+        self.last_modified = last_modified
+        self.encoding = encoding
+
+
+class _HotCache:
+    """LRU of file contents bounded by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class StaticFiles:
+    """ASGI app serving the files under ``directory``.
+
+    Usable as an app on its own, or as ``Application(static_hosts=[...],
+    static_resolver=StaticFiles(...))`` to serve whole hosts. ``prefix`` is
+    stripped from request paths; with ``html=True`` ``/dir/`` serves
+    ``dir/index.html``. Dotfiles are never served.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        *,
+        prefix: str = "",
+        html: bool = False,
+        cache_control: Optional[str] = None,
+        fingerprint_pattern: Optional[Pattern[str]] = FINGERPRINT_PATTERN,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+        max_cached_file_size: int = 256 * 1024,
+    ) -> None:
+        self.directory = os.path.realpath(os.fspath(directory))
+        self.prefix = prefix.rstrip("/")
+        self.html = html
+        self.cache_control = cache_control
+        self.fingerprint_pattern = fingerprint_pattern
+        self.max_cached_file_size = max_cached_file_size
+        self.cache = _HotCache(cache_max_bytes)
+        # url path -> variants, preferred encoding first and identity last
+        self._index: Optional[Dict[str, Tuple[_Asset, ...]]] = None
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    async def startup(self) -> None:
+        """Build the index off the event loop."""
+        await asyncio.to_thread(self.reload)
+
+    def reload(self) -> None:
+        """Re-scan ``directory`` and drop cached contents."""
+        index: Dict[str, Tuple[_Asset, ...]] = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            present = set(files)
+            for name in files:
+                if name.startswith("."):
+                    continue
+                if any(name.endswith(suffix) and name[: -len(suffix)] in present for suffix, _ in _ENCODINGS):
+                    continue
+                path = os.path.join(root, name)
+                if not os.path.isfile(path) or not self._contains(path):
+                    continue
+                url = "/" + os.path.relpath(path, self.directory).replace(os.sep, "/")
+                variants = self._variants(path, name, present)
+                index[url] = variants
+                if self.html and name == "index.html":
+                    directory_url = url[: -len("index.html")]
+                    index[directory_url] = variants
+        self.cache.clear()
+        self._index = index
+
+    def _variants(self, path: str, name: str, present: set) -> Tuple[_Asset, ...]:
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        extra: List[Tuple[bytes, bytes]] = []
+        if self.fingerprint_pattern is not None and self.fingerprint_pattern.search(name):
+            extra.append((b"cache-control", IMMUTABLE_CACHE_CONTROL.encode("ascii")))
+        elif self.cache_control:
+            extra.append((b"cache-control", self.cache_control.encode("latin-1")))
+
+        candidates = [
+            (path + suffix, encoding)
+            for suffix, encoding in _ENCODINGS
+            if name + suffix in present and self._contains(path + suffix)
+        ]
+        if candidates:
+            extra.append((b"vary", b"Accept-Encoding"))
+        candidates.append((path, None))
+
+        variants = []
+        for variant_path, encoding in candidates:
+            stat = os.stat(variant_path)
+            headers, etag, last_modified = FileResponse(
+                variant_path, media_type=media_type, stat_result=stat
+            )._base_headers(stat)
+            if encoding is not None:
+                headers.append((b"content-encoding", encoding))
+            headers.extend(extra)
+            variants.append(_Asset(variant_path, stat, headers, etag, last_modified, encoding))
+        return tuple(variants)
+
+    def _contains(self, path: str) -> bool:
+        """True when ``path`` resolves inside ``directory``; symlinks may not point out."""
+        return os.path.commonpath((self.directory, os.path.realpath(path))) == self.directory
+
+    def _load(self) -> Dict[str, Tuple[_Asset, ...]]:
+        if self._index is None:
+            self.reload()
+        return self._index
+
+    async def resolve(self, host: str) -> "StaticFiles":
+        """``static_resolver`` hook: every static host is served from this directory."""
+        return self
+
+    def _lookup(self, scope: Dict[str, Any]) -> Optional[Tuple[_Asset, ...]]:
+        path = scope.get("path", "/")
+        if self.prefix:
+            if path != self.prefix and not path.startswith(self.prefix + "/"):
+                return None
+            path = path[len(self.prefix):] or "/"
+        return self._load().get(path)
+
+    @staticmethod
+    def _select(variants: Tuple[_Asset, ...], scope: Dict[str, Any]) -> _Asset:
+        if len(variants) == 1:
+            return variants[0]
+        accept = get_headers(scope).get(b"accept-encoding") or b""
+        for asset in variants:
+            if asset.encoding is None or asset.encoding in accept:
+                return asset
+        return variants[-1]
+
+    async def __call__(self, scope, receive, send, **kwargs) -> None:
+        method = scope.get("method", "GET")
+        variants = self._lookup(scope)
+        if variants is None:
+            response = Response(body=exceptions.NotFound().to_dict(), status_code=404)
+            await response(scope, receive, send)
+            return
+        if method not in ("GET", "HEAD"):
+            error = exceptions.MethodNotAllowed(method, scope.get("path", "/"))
+            response = Response(body=error.to_dict(), status_code=405, headers=[(b"allow", b"GET, HEAD")])
+            await response(scope, receive, send)
+            return
+
+        asset = self._select(variants, scope)
+        request_headers = get_headers(scope)
+        if asset.stat.st_size > self.max_cached_file_size or b"range" in request_headers:
+            response = FileResponse(asset.path, stat_result=asset.stat, headers=asset.headers)
+            await response(scope, receive, send)
+            return
+
+        if FileResponse._not_modified(request_headers, asset.etag, asset.stat.st_mtime):
+            validators = [(b"etag", asset.etag), (b"last-modified", asset.last_modified)]
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        body = b""
+        if method == "GET":
+            body = self.cache.get(asset.path)
+            if body is None:
+                body = await asyncio.to_thread(_read_file, asset.path)
+                self.cache.set(asset.path, body)
+        headers = [*asset.headers, (b"content-length", str(asset.stat.st_size).encode("ascii"))]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+__all__ = ["FINGERPRINT_PATTERN", "IMMUTABLE_CACHE_CONTROL", "StaticFiles"]
@@ -1,13 +1,204 @@
 from __future__ import annotations
 
+import asyncio
 from collections import deque
-from typing import AsyncIterator, Deque, Optional
+from contextvars import ContextVar, Token
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Union
 
 from neutronapi.api import exceptions
+from neutronapi.encoders import json_loads
+
+DEFAULT_MAX_LINE_SIZE = 1024 * 1024
+
+# Called as ``on_error(line_number, line, error)`` for a record that fails to
+# decode; returning skips the record, raising aborts the request.
+RecordErrorHandler = Callable[[int, bytes, Exception], None]
+
+
+def parse_content_length(headers: Dict[bytes, bytes]) -> Optional[int]:
+    """Return the declared Content-Length, or None when absent."""
+    raw_content_length = headers.get(b"content-length")
+    if not raw_content_length:
+        return None
+    try:
+        content_length = int(raw_content_length.decode("utf-8"))
+    except (TypeError, ValueError):
+        raise exceptions.ValidationError("Invalid Content-Length header")
+    if content_length < 0:
+        raise exceptions.ValidationError("Invalid Content-Length header")
+    return content_length
+
+
+def _request_too_large() -> exceptions.APIException:
+    return exceptions.APIException(
+        "Request body too large",
+        type="request_too_large",
+        status=413,
+    )
+
+
+def _line_too_large() -> exceptions.APIException:
+    return exceptions.APIException(
+        "Request line too large",
+        type="request_too_large",
+        status=413,
+    )
+
+
+def invalid_record(line_number: int, error: Exception) -> exceptions.ValidationError:
+    """The error raised for a JSON-lines record that does not decode."""
+    return exceptions.ValidationError(
+        f"Invalid JSON on line {line_number}",
+        errors=[{"field": f"line {line_number}", "code": "invalid_json", "message": str(error)}],
+    )
+
+
+class SharedReceive:
+    """An ASGI ``receive`` shared by a body reader and a disconnect watcher.
+
+    Request messages reach callers in order, and ``wait_for_disconnect()``
+    watches for ``http.disconnect`` without consuming them. The watcher reads
+    ahead only while nobody else is reading and either nothing is queued or
+    the body is complete, so at most one body message is ever held back.
+
+    While ``activate()``d, every ``AsyncByteStream`` in the current context
+    that wraps the same ``receive`` reads through this instance.
+    """
+
+    __slots__ = (
+        "_receive",
+        "_queue",
+        "_fetch",
+        "_reading",
+        "_waiting",
+        "_idle",
+        "body_complete",
+        "disconnected",
+        "_exhausted",
+    )
+
+    def __init__(self, receive) -> None:
+        self._receive = receive
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._fetch: Optional[asyncio.Future] = None
+        self._reading = False
+        self._waiting = 0
+        self._idle: Optional[asyncio.Future] = None
+        self.body_complete = False
+        self.disconnected = False
+        # The server handed out request messages after the body ended (as
+        # simple test doubles do), so no disconnect will ever arrive.
+        self._exhausted = False
+
+    async def __call__(self) -> Dict[str, Any]:
+        if self._queue:
+            return self._pop()
+        if self._fetch is None and not self._reading:
+            # Nobody else is reading: call receive directly.
+            self._reading = True
+            try:
+                message = await self._receive()
+            finally:
+                self._reading = False
+                self._notify()
+            self._route(message)
+            return message
+        while not self._queue:
+            if self._reading:
+                await self._wait_idle()
+                continue
+            fetch = self._start_fetch()
+            self._waiting += 1
+            try:
+                await asyncio.wait((fetch,))
+            finally:
+                self._waiting -= 1
+            self._collect(fetch)
+        return self._pop()
+
+    def activate(self) -> Token:
+        return _ACTIVE_RECEIVE.set(self)
+
+    @staticmethod
+    def deactivate(token: Token) -> None:
+        _ACTIVE_RECEIVE.reset(token)
+
+    async def wait_for_disconnect(self) -> bool:
+        """Return True once the client disconnects, or False if it never can."""
+        while True:
+            if self.disconnected:
+                return True
+            if self._exhausted:
+                return False
+            if self._reading or (self._queue and not self.body_complete):
+                await self._wait_idle()
+                continue
+            fetch = self._start_fetch()
+            try:
+                await asyncio.wait((fetch,))
+            except asyncio.CancelledError:
+                if self._fetch is fetch and not self._waiting:
+                    self._fetch = None
+                    fetch.cancel()
+                raise
+            self._collect(fetch)
+
+    def _start_fetch(self) -> asyncio.Future:
+        if self._fetch is None:
+            self._fetch = asyncio.ensure_future(self._receive())
+        return self._fetch
+
+    def _collect(self, fetch: asyncio.Future) -> None:
+        if self._fetch is not fetch:
+            # Another waiter already took this message.
+            return
+        self._fetch = None
+        self._notify()
+        message = fetch.result()
+        if self._route(message) or self._waiting:
+            self._queue.append(message)
+
+    def _route(self, message: Dict[str, Any]) -> bool:
+        """Track body and connection state; False for a stray message."""
+        message_type = message.get("type")
+        if message_type == "http.disconnect":
+            self.disconnected = True
+        elif message_type == "http.request":
+            if self.body_complete:
+                self._exhausted = True
+                return False
+            if not message.get("more_body", False):
+                self.body_complete = True
+        return True
+
+    def _pop(self) -> Dict[str, Any]:
+        message = self._queue.popleft()
+        if not self._queue:
+            self._notify()
+        return message
+
+    def _notify(self) -> None:
+        idle, self._idle = self._idle, None
+        if idle is not None and not idle.done():
+            idle.set_result(None)
+
+    async def _wait_idle(self) -> None:
+        if self._idle is None:
+            self._idle = asyncio.get_running_loop().create_future()
+        await self._idle
+
+
+_ACTIVE_RECEIVE: ContextVar[Optional[SharedReceive]] = ContextVar(
+    "neutronapi_active_receive", default=None
+)
 
 
 class AsyncByteStream:
-    """Generic async byte stream wrapping the ASGI receive callable."""
+    """Generic async byte stream wrapping the ASGI receive callable.
+
+    A declared ``content_length`` above ``max_bytes`` is rejected with a 413
+    before any body bytes are received.
+    """
 
     def __init__(
         self,
@@ -16,6 +207,12 @@ class AsyncByteStream:
         content_length: Optional[int] = None,
         max_bytes: Optional[int] = None,
     ) -> None:
+        if (
+            content_length is not None
+            and max_bytes is not None
+            and content_length > max_bytes
+        ):
+            raise _request_too_large()
         self._receive = receive
         self._content_length = content_length
         self._max_bytes = max_bytes
@@ -31,8 +228,14 @@ class AsyncByteStream:
         if self._finished:
             return b""
 
+        receive = self._receive
+        shared = _ACTIVE_RECEIVE.get()
+        if shared is not None and shared._receive is receive:
+            # A StreamingResponse is watching this receive for disconnects.
+            receive = shared
+
         while True:
-            message = await self._receive()
+            message = await receive()
             message_type = message.get("type")
 
             if message_type == "http.disconnect":
@@ -45,11 +248,7 @@ class AsyncByteStream:
             chunk = message.get("body", b"") or b""
             self._bytes_read += len(chunk)
             if self._max_bytes is not None and self._bytes_read > self._max_bytes:
-                raise exceptions.APIException(
-                    "Request body too large",
-                    type="request_too_large",
-                    status=413,
-                )
+                raise _request_too_large()
 
             if not message.get("more_body", False):
                 self._finished = True
@@ -104,3 +303,128 @@ class AsyncByteStream:
             remaining = 0
 
         return b"".join(chunks)
+
+    async def read_body(self) -> Union[bytes, bytearray]:
+        """Read the rest of the body into a single buffer.
+
+        A body delivered in one ASGI message is returned as-is without copying.
+        Otherwise every chunk is copied exactly once: into a ``bytearray``
+        preallocated from Content-Length when it is declared, or into one
+        ``b"".join`` of the received chunks when it is not.
+        """
+        pending: List[bytes] = list(self._buffer)
+        self._buffer.clear()
+        if not pending:
+            chunk = await self._receive_next_chunk()
+            if self._finished:
+                return chunk
+            pending.append(chunk)
+
+        if self._content_length is None:
+            async for chunk in self:
+                pending.append(chunk)
+            return pending[0] if len(pending) == 1 else b"".join(pending)
+
+        body = bytearray(self._content_length)
+        filled = 0
+        for chunk in pending:
+            # Slice assignment copies in place and grows the buffer only when
+            # the client sends more than it declared.
+            body[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        async for chunk in self:
+            body[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        if filled < len(body):
+            del body[filled:]
+        return body
+
+    async def iter_lines(self, *, max_line_size: Optional[int] = DEFAULT_MAX_LINE_SIZE) -> AsyncIterator[bytes]:
+        """Yield the body split on ``\\n`` as chunks arrive, without line endings.
+
+        Only the unfinished tail of a chunk is carried over to the next, so
+        memory stays bounded by ``max_line_size`` plus one chunk. A longer
+        line is rejected with a 413.
+        """
+        pending = bytearray()
+        async for chunk in self:
+            start = 0
+            end = chunk.find(b"\n")
+            if pending:
+                if end < 0:
+                    pending += chunk
+                    if max_line_size is not None and len(pending) > max_line_size:
+                        raise _line_too_large()
+                    continue
+                pending += memoryview(chunk)[:end]
+                line = bytes(pending)
+                pending.clear()
+                start, end = end + 1, chunk.find(b"\n", end + 1)
+                yield _checked_line(line, max_line_size)
+            while end >= 0:
+                yield _checked_line(chunk[start:end], max_line_size)
+                start, end = end + 1, chunk.find(b"\n", end + 1)
+            if start < len(chunk):
+                pending += memoryview(chunk)[start:]
+                if max_line_size is not None and len(pending) > max_line_size:
+                    raise _line_too_large()
+        if pending:
+            yield _checked_line(bytes(pending), max_line_size)
+
+    async def iter_json(
+        self,
+        *,
+        max_line_size: Optional[int] = DEFAULT_MAX_LINE_SIZE,
+        on_error: Optional[RecordErrorHandler] = None,
+    ) -> AsyncIterator[Any]:
+        """Decode a JSON-lines (NDJSON) body one record at a time.
+
+        Blank lines are skipped. A record that fails to decode raises a 400
+        naming its line, unless ``on_error`` is given to report and skip it.
+        """
+        line_number = 0
+        async for line in self.iter_lines(max_line_size=max_line_size):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json_loads(line)
+            except ValueError as error:
+                if on_error is None:
+                    raise invalid_record(line_number, error)
+                on_error(line_number, line, error)
+                continue
+            yield record
+
+    async def iter_json_batches(
+        self,
+        batch_size: int = 500,
+        *,
+        max_line_size: Optional[int] = DEFAULT_MAX_LINE_SIZE,
+        on_error: Optional[RecordErrorHandler] = None,
+    ) -> AsyncIterator[List[Any]]:
+        """Yield ``iter_json`` records in lists of up to ``batch_size``.
+
+        No more than one batch is held at a time, and the next chunk is not
+        received until the consumer asks for the next batch, so awaiting e.g.
+        ``QuerySet.bulk_create(batch)`` applies backpressure to the client::
+
+            async for batch in kwargs["stream"].iter_json_batches(1000):
+                await Event.objects.bulk_create([Event(**row) for row in batch])
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        batch: List[Any] = []
+        async for record in self.iter_json(max_line_size=max_line_size, on_error=on_error):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _checked_line(line: bytes, max_line_size: Optional[int]) -> bytes:
+    if max_line_size is not None and len(line) > max_line_size:
+        raise _line_too_large()
+    return line[:-1] if line.endswith(b"\r") else line
@@ -0,0 +1,219 @@
+import os
+import tempfile
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.crud import CRUD_ACTIONS, READ_ACTIONS, crud_routes
+from neutronapi.db import Model
+from neutronapi.db.connection import setup_databases
+from neutronapi.db.fields import CharField, IntegerField
+from neutronapi.encoders import json_dumps_bytes, json_loads
+
+
+class Book(Model):
+    title = CharField()
+    pages = IntegerField(default=0)
+
+
+class BooksAPI(API):
+    name = "books"
+    resource = "/books"
+    model = Book
+    crud_actions = CRUD_ACTIONS
+    stream_batch_size = 2
+    response_schema = {
+        "type": "object",
+        "properties": {"id": {"type": "string"}, "title": {"type": "string"}, "pages": {}},
+    }
+
+
+class ReadOnlyBooksAPI(API):
+    name = "readonly"
+    resource = "/readonly"
+    model = Book
+    crud_actions = READ_ACTIONS
+
+    @API.endpoint("/", methods=["GET"], name="custom_list")
+    async def custom_list(self, scope, receive, send, **kwargs):
+        return await self.response({"custom": True})
+
+
+class PrivateBooksAPI(API):
+    name = "private"
+    resource = "/private"
+    model = Book
+
+
+class Counter(Model):
+    number = IntegerField(primary_key=True)
+
+
+class CountersAPI(API):
+    name = "counters"
+    resource = "/counters"
+    model = Counter
+    lookup_field = "number"
+    crud_actions = READ_ACTIONS
+
+
+class ShortBooksAPI(API):
+    """Only books under 100 pages, with titles trimmed on the way in."""
+
+    name = "short"
+    resource = "/short"
+    model = Book
+    crud_actions = ("bulk_update",)
+
+    async def get_queryset(self, scope):
+        return (await super().get_queryset(scope)).filter(pages__lt=100)
+
+    async def transform(self, data):
+        if "title" in data:
+            data["title"] = data["title"].strip()
+        return data
+
+
+async def call(app, method, path, payload=None, query=""):
+    messages = []
+    body = json_dumps_bytes(payload) if payload is not None else b""
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(b"content-type", b"application/json")],
+    }
+    await app(scope, receive, send)
+    chunks = [m.get("body", b"") for m in messages[1:]]
+    raw = b"".join(chunks)
+    return messages[0]["status"], (json_loads(raw) if raw else None), len(chunks)
+
+
+class TestGeneratedCrud(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.temp_db.close()
+        self.db_manager = setup_databases(
+            {"default": {"ENGINE": "aiosqlite", "NAME": self.temp_db.name}}
+        )
+
+        from neutronapi.db.migrations import CreateModel
+
+        connection = await self.db_manager.get_connection()
+        await CreateModel("neutronapi.Book", Book._neutronapi_fields_).database_forwards(
+            app_label="neutronapi",
+            provider=connection.provider,
+            from_state=None,
+            to_state=None,
+            connection=connection,
+        )
+        self.app = Application(
+            apis=[BooksAPI(), ReadOnlyBooksAPI(), PrivateBooksAPI(), ShortBooksAPI(), CountersAPI()]
+        )
+
+    async def asyncTearDown(self):
+        await self.db_manager.close_all()
+        os.unlink(self.temp_db.name)
+
+    async def test_create_retrieve_update_destroy(self):
+        status, created, _ = await call(self.app, "POST", "/books", {"title": "Dune", "pages": 412})
+        self.assertEqual(status, 201)
+        book_id = created["id"]
+
+        status, body, _ = await call(self.app, "GET", f"/books/{book_id}")
+        self.assertEqual((status, body["title"]), (200, "Dune"))
+
+        status, body, _ = await call(self.app, "PATCH", f"/books/{book_id}", {"pages": 500})
+        self.assertEqual((body["title"], body["pages"]), ("Dune", 500))
+
+        status, body, _ = await call(self.app, "PUT", f"/books/{book_id}", {"title": "Dune II"})
+        self.assertEqual((body["title"], body["pages"]), ("Dune II", 0))
+
+        status, _, _ = await call(self.app, "DELETE", f"/books/{book_id}")
+        self.assertEqual(status, 204)
+        status, _, _ = await call(self.app, "GET", f"/books/{book_id}")
+        self.assertEqual(status, 404)
+
+    async def test_invalid_payloads(self):
+        status, body, _ = await call(self.app, "POST", "/books", {"pages": 1})
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error"]["errors"][0]["field"], "title")
+
+        status, body, _ = await call(self.app, "POST", "/books", {"title": "x", "isbn": "1"})
+        self.assertEqual(status, 400)
+
+    async def test_bulk_create_and_update(self):
+        status, created, _ = await call(
+            self.app, "POST", "/books/bulk", [{"title": f"B{i}"} for i in range(3)]
+        )
+        self.assertEqual((status, len(created)), (201, 3))
+
+        changes = [{"id": book["id"], "pages": 7} for book in created]
+        status, body, _ = await call(self.app, "PATCH", "/books/bulk", changes)
+        self.assertEqual((status, body), (200, {"updated": 3}))
+
+        status, body, _ = await call(
+            self.app, "PATCH", "/books/bulk", [{"id": created[0]["id"], "pages": 1}, {"id": created[1]["id"]}]
+        )
+        self.assertEqual(status, 400)
+
+    async def test_bulk_update_is_scoped_by_get_queryset(self):
+        await Book.objects.bulk_create(
+            [Book(id="short", title="Short", pages=10), Book(id="long", title="Long", pages=900)]
+        )
+
+        status, body, _ = await call(
+            self.app, "PATCH", "/short/bulk", [{"id": "short", "title": " Tiny "}, {"id": "long", "title": "x"}]
+        )
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error"]["errors"][0]["code"], "not_found")
+        self.assertEqual((await Book.objects.get(id="long")).title, "Long")
+        self.assertEqual((await Book.objects.get(id="short")).title, "Short")
+
+        status, body, _ = await call(self.app, "PATCH", "/short/bulk", [{"id": "short", "title": " Tiny "}])
+        self.assertEqual((status, body), (200, {"updated": 1}))
+        self.assertEqual((await Book.objects.get(id="short")).title, "Tiny")
+
+    async def test_list_streams_batches(self):
+        books = [Book(id=f"b{i}", title=f"Book {i}") for i in range(5)]
+        await Book.objects.bulk_create(books)
+
+        status, body, chunks = await call(self.app, "GET", "/books", query="page_size=4")
+        self.assertEqual(status, 200)
+        self.assertEqual([item["title"] for item in body["data"]], [f"Book {i}" for i in range(4)])
+        self.assertTrue(body["has_more"])
+        # Two batches of two rows, coalesced with the trailer into the final message.
+        self.assertEqual(chunks, 1)
+
+        status, body, _ = await call(self.app, "GET", "/books", query="page_size=4&page=2")
+        self.assertEqual([item["title"] for item in body["data"]], ["Book 4"])
+        self.assertFalse(body["has_more"])
+
+    async def test_declared_endpoints_and_crud_actions(self):
+        status, body, _ = await call(self.app, "GET", "/readonly")
+        self.assertEqual(body, {"custom": True})
+        # Write actions are opt-in.
+        for method, path in (("POST", "/readonly"), ("DELETE", "/readonly/1"), ("POST", "/readonly/bulk")):
+            status, _, _ = await call(self.app, method, path, {"title": "x"})
+            self.assertIn(status, (404, 405))
+
+    async def test_model_alone_generates_no_endpoints(self):
+        status, _, _ = await call(self.app, "GET", "/private")
+        self.assertEqual(status, 404)
+
+    async def test_integer_lookup_uses_int_converter(self):
+        self.assertIn(("retrieve", "/<int:number>", "GET"), [route[:3] for route in crud_routes(CountersAPI())])
+        status, _, _ = await call(self.app, "GET", "/counters/abc")
+        self.assertEqual(status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from neutronapi.commands.test import tag
+from neutronapi.db import Model
+from neutronapi.db.connection import setup_databases
+from neutronapi.db.fields import BooleanField, CharField, DecimalField, IntegerField, JSONField
+from neutronapi.responses import StreamingResponse
+from neutronapi.serializers import serializer_for
+
+
+class ExportRow(Model):
+    name = CharField(null=False)
+    rank = IntegerField(null=False)
+    active = BooleanField(default=True)
+    price = DecimalField(null=True)
+    meta = JSONField(null=True, default=dict)
+
+
+async def collect(response):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await response({"type": "http", "method": "GET", "path": "/"}, receive, send)
+    return messages[0], b"".join(m.get("body", b"") for m in messages[1:])
+
+
+@tag("sqlite")
+class TestExportSQLite(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.temp_db.close()
+        self.db_manager = setup_databases({
+            "default": {"ENGINE": "aiosqlite", "NAME": self.temp_db.name}
+        })
+
+        from neutronapi.db.migrations import CreateModel
+        connection = await self.db_manager.get_connection()
+        op = CreateModel("neutronapi.ExportRow", ExportRow._neutronapi_fields_)
+        await op.database_forwards(
+            app_label="neutronapi",
+            provider=connection.provider,
+            from_state=None,
+            to_state=None,
+            connection=connection,
+        )
+        await ExportRow.objects.bulk_create([
+            ExportRow(id=f"row-{i:03d}", name=f"n{i}", rank=i, price=Decimal("1.50"), meta={"i": i})
+            for i in range(25)
+        ])
+
+    async def asyncTearDown(self):
+        await self.db_manager.close_all()
+        try:
+            os.unlink(self.temp_db.name)
+        except OSError:
+            pass
+
+    async def test_ndjson_rows_stream_in_batches(self):
+        response = await StreamingResponse.from_queryset(
+            ExportRow.objects.order_by("id"), fields=["id", "rank"], batch_size=10, buffer_size=0
+        )
+        start, body = await collect(response)
+
+        self.assertEqual(dict(start["headers"])[b"content-type"], b"application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(rows, [{"id": f"row-{i:03d}", "rank": i} for i in range(25)])
+
+    async def test_ndjson_encodes_each_batch_in_one_call(self):
+        serializer = serializer_for(ExportRow, ("id",))
+        with mock.patch.object(serializer, "dumps_lines", wraps=serializer.dumps_lines) as dumps_lines, \
+                mock.patch.object(serializer, "dumps", side_effect=AssertionError("per-row dumps")):
+            response = await StreamingResponse.from_queryset(
+                ExportRow.objects.order_by("id"), fields=["id"], batch_size=10
+            )
+            _, body = await collect(response)
+
+        self.assertEqual(dumps_lines.call_count, 3)
+        self.assertEqual(len(body.splitlines()), 25)
+
+    async def test_json_array(self):
+        response = await StreamingResponse.from_queryset(ExportRow.objects.filter(rank__lt=3), "json", batch_size=2)
+        _, body = await collect(response)
+
+        rows = json.loads(body)
+        self.assertEqual([row["name"] for row in rows], ["n0", "n1", "n2"])
+        self.assertEqual(rows[0]["price"], "1.50")
+
+        _, body = await collect(await StreamingResponse.from_queryset(ExportRow.objects.filter(rank__lt=0), "json"))
+        self.assertEqual(body, b"[]")
+
+    async def test_csv_download(self):
+        response = await StreamingResponse.from_queryset(
+            ExportRow.objects.filter(rank__lt=2),
+            "csv",
+            fields=["name", "active", "meta"],
+            filename="rows.csv",
+        )
+        start, body = await collect(response)
+
+        headers = dict(start["headers"])
+        self.assertEqual(headers[b"content-type"], b"text/csv; charset=utf-8")
+        self.assertEqual(headers[b"content-disposition"], b'attachment; filename="rows.csv"')
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows, [["name", "active", "meta"], ["n0", "true", '{"i":0}'], ["n1", "true", '{"i":1}']])
+
+    async def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            await StreamingResponse.from_queryset(ExportRow.objects.all(), "xml")
+        with self.assertRaises(ValueError):
+            await StreamingResponse.from_queryset(ExportRow.objects.all(), fields=["missing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
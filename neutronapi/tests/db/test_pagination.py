@@ -0,0 +1,218 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.db import Model
+from neutronapi.db.connection import setup_databases
+from neutronapi.db.fields import CharField, DateTimeField, IntegerField
+from neutronapi.db import pagination
+from neutronapi.db.pagination import Cursor, InvalidCursor, decode_cursor, encode_cursor, paginate
+from neutronapi.encoders import json_loads
+
+
+class Event(Model):
+    name = CharField()
+    rank = IntegerField()
+    created = DateTimeField()
+    note = CharField(null=True)
+
+
+BASE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class TestCursorTokens(unittest.TestCase):
+    def test_round_trip(self):
+        cursor = Cursor(("-created", "id"), ("2024-01-01T00:00:00+00:00", "e1"), previous=True)
+        self.assertEqual(decode_cursor(encode_cursor(cursor, b"k"), b"k"), cursor)
+
+    def test_tampered_or_foreign_tokens_rejected(self):
+        token = encode_cursor(Cursor(("id",), ("e1",)), b"k")
+        payload, signature = token.split(".")
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(token, b"other")
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(payload[:-2] + "AA." + signature, b"k")
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not-a-cursor", b"k")
+
+    def test_missing_secret_key_warns_once(self):
+        with mock.patch.object(pagination, "_fallback_warned", False), \
+                mock.patch("neutronapi.conf.settings.get", return_value=None):
+            with self.assertLogs("neutronapi.pagination", "WARNING") as logs:
+                self.assertEqual(pagination._signing_key(), pagination._FALLBACK_KEY)
+                pagination._signing_key()
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("SECRET_KEY", logs.output[0])
+
+
+class EventsTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.temp_db.close()
+        self.db_manager = setup_databases(
+            {"default": {"ENGINE": "aiosqlite", "NAME": self.temp_db.name}}
+        )
+
+        from neutronapi.db.migrations import CreateModel
+
+        connection = await self.db_manager.get_connection()
+        await CreateModel("neutronapi.Event", Event._neutronapi_fields_).database_forwards(
+            app_label="neutronapi",
+            provider=connection.provider,
+            from_state=None,
+            to_state=None,
+            connection=connection,
+        )
+        # Ranks repeat so the primary key has to break ties.
+        for i in range(7):
+            await Event.objects.create(
+                id=f"e{i}",
+                name=f"Event {i}",
+                rank=i // 2,
+                created=BASE + datetime.timedelta(minutes=i),
+                note=f"n{i}" if i % 2 else None,
+            )
+
+    async def asyncTearDown(self):
+        await self.db_manager.close_all()
+        os.unlink(self.temp_db.name)
+
+
+class TestKeysetPagination(EventsTestCase):
+    async def ids(self, queryset):
+        return [event.id for event in await queryset]
+
+    async def test_keyset_ordering_appends_primary_key(self):
+        self.assertEqual(Event.objects.order_by("-rank").keyset_ordering(), ("-rank", "-id"))
+        self.assertEqual(Event.objects.all().keyset_ordering(), ("id",))
+
+    async def test_after_and_before(self):
+        qs = Event.objects.order_by("rank")
+        cursor = Cursor(("rank", "id"), (1, "e2"))
+
+        self.assertEqual(await self.ids(qs.after(cursor).limit(3)), ["e3", "e4", "e5"])
+        self.assertEqual(await self.ids(qs.before(cursor)), ["e0", "e1"])
+
+    async def test_mixed_directions(self):
+        qs = Event.objects.order_by("-rank", "id")
+        cursor = Cursor(("-rank", "id"), (2, "e4"))
+
+        self.assertEqual(await self.ids(qs.after(cursor)), ["e5", "e2", "e3", "e0", "e1"])
+
+    async def test_datetime_cursor_from_token(self):
+        qs = Event.objects.order_by("-created")
+        token = encode_cursor(Cursor.for_instance(await Event.objects.get(id="e3"), ("-created", "-id")))
+
+        self.assertEqual(await self.ids(qs.after(token)), ["e2", "e1", "e0"])
+
+    async def test_cursor_for_other_ordering_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            Event.objects.order_by("name").after(Cursor(("rank", "id"), (1, "e2")))
+
+    async def test_iter_batches_seeks_between_batches(self):
+        batches = [
+            [event.id for event in batch]
+            async for batch in Event.objects.order_by("-rank").offset(1).limit(5).iter_batches(2)
+        ]
+        self.assertEqual(batches, [["e5", "e4"], ["e3", "e2"], ["e1"]])
+
+    async def test_nullable_ordering_is_not_seeked(self):
+        with self.assertRaises(ValueError):
+            Event.objects.order_by("note").keyset_ordering()
+
+        batches = [batch async for batch in Event.objects.order_by("note").iter_batches(2)]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 2, 1])
+        self.assertEqual(sorted(event.id for batch in batches for event in batch), [f"e{i}" for i in range(7)])
+
+    async def test_paginate_forwards_and_back(self):
+        qs = Event.objects.order_by("rank")
+        pages = []
+        cursor = None
+        while True:
+            page = await paginate(qs, cursor, page_size=3)
+            pages.append([event.id for event in page.items])
+            if not page.next_cursor:
+                break
+            cursor = decode_cursor(page.next_cursor)
+
+        self.assertEqual(pages, [["e0", "e1", "e2"], ["e3", "e4", "e5"], ["e6"]])
+        self.assertFalse(page.has_more)
+
+        back = await paginate(qs, decode_cursor(page.previous_cursor), page_size=3)
+        self.assertEqual([event.id for event in back.items], ["e3", "e4", "e5"])
+        first = await paginate(qs, decode_cursor(back.previous_cursor), page_size=3)
+        self.assertEqual([event.id for event in first.items], ["e0", "e1", "e2"])
+        self.assertIsNone(first.previous_cursor)
+
+
+class EventsAPI(API):
+    name = "events"
+    resource = "/events"
+    model = Event
+    pagination = "cursor"
+    allowed_ordering_fields = ["rank"]
+
+    @API.endpoint("/", methods=["GET"], name="list", response_fields=["id", "rank"])
+    async def list_events(self, scope, receive, send, **kwargs):
+        return await self.response(await self.paginate(scope))
+
+
+class TestCursorPaginatedAPI(EventsTestCase):
+    async def get(self, app, query):
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/events",
+            "query_string": query.encode(),
+            "headers": [],
+        }
+        await app(scope, receive, send)
+        return messages[0]["status"], json_loads(messages[1]["body"])
+
+    async def test_list_endpoint_pages_with_cursors(self):
+        app = Application(apis=[EventsAPI()])
+
+        status, body = await self.get(app, "ordering=-rank&page_size=4")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["data"][0], {"id": "e6", "rank": 3})
+        self.assertTrue(body["has_more"])
+        self.assertIsNone(body["previous_cursor"])
+
+        status, body = await self.get(app, f"ordering=-rank&page_size=4&cursor={body['next_cursor']}")
+        self.assertEqual([item["id"] for item in body["data"]], ["e2", "e1", "e0"])
+        self.assertIsNone(body["next_cursor"])
+
+        status, body = await self.get(app, "cursor=garbage")
+        self.assertEqual(status, 400)
+
+        token = encode_cursor(Cursor(("id",), ("e1",)))
+        status, body = await self.get(app, f"cursor={token}&cursor={token}")
+        self.assertEqual(status, 400)
+
+    async def test_page_pagination_handlers_get_no_cursor_kwarg(self):
+        class PagedAPI(API):
+            name = "paged"
+            resource = "/events"
+
+            @API.endpoint("/", methods=["GET"], name="list")
+            async def list_events(self, scope, receive, send, page, page_size, ordering, params):
+                return await self.response({"page": page})
+
+        status, body = await self.get(Application(apis=[PagedAPI()]), "page=2")
+        self.assertEqual((status, body), (200, {"page": 2}))
+
+
+if __name__ == "__main__":
+    unittest.main()
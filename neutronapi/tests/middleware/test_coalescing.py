@@ -0,0 +1,198 @@
+import asyncio
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.encoders import json_loads
+from neutronapi.middleware.coalescing import CoalescingMiddleware, SingleFlight
+
+
+class SlowAPI(API):
+    name = "slow"
+    resource = "/slow"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    @API.endpoint("/", methods=["GET"], name="list", coalesce=True)
+    async def list_items(self, scope, receive, send, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return await self.response({"calls": self.calls})
+
+    @API.endpoint("/plain", methods=["GET"], name="plain")
+    async def plain(self, scope, receive, send, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return await self.response({"calls": self.calls})
+
+
+async def call(app, path="/slow", query=b"", headers=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query,
+        "headers": headers or [],
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"], json_loads(b"".join(m.get("body", b"") for m in messages[1:]))
+
+
+async def gather_released(api, *calls):
+    tasks = [asyncio.ensure_future(c) for c in calls]
+    await asyncio.sleep(0.01)
+    api.release.set()
+    return await asyncio.gather(*tasks)
+
+
+class TestEndpointCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def test_identical_requests_share_one_execution(self):
+        api = SlowAPI()
+        app = Application(apis=[api])
+
+        results = await gather_released(api, *(call(app) for _ in range(5)))
+
+        self.assertEqual(api.calls, 1)
+        self.assertEqual(results, [(200, {"calls": 1})] * 5)
+
+    async def test_different_queries_and_credentials_run_separately(self):
+        api = SlowAPI()
+        app = Application(apis=[api])
+
+        await gather_released(
+            api,
+            call(app),
+            call(app, query=b"page=2"),
+            call(app, headers=[(b"authorization", b"Bearer a")]),
+            call(app, headers=[(b"host", b"other.example.com")]),
+        )
+
+        self.assertEqual(api.calls, 4)
+
+    async def test_endpoints_without_option_are_not_coalesced(self):
+        api = SlowAPI()
+        app = Application(apis=[api])
+
+        await gather_released(api, call(app, "/slow/plain"), call(app, "/slow/plain"))
+
+        self.assertEqual(api.calls, 2)
+
+
+class TestCoalescingMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def test_middleware_coalesces_any_route(self):
+        api = SlowAPI()
+        middleware = CoalescingMiddleware()
+        app = Application(apis=[api], middlewares=[middleware])
+
+        results = await gather_released(api, *(call(app, "/slow/plain") for _ in range(3)))
+
+        self.assertEqual(api.calls, 1)
+        self.assertEqual({body["calls"] for _, body in results}, {1})
+        self.assertEqual(len(middleware.flights), 0)
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_waiters_run_app_when_leader_fails(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["n"])
+            if scope["n"] == 0:
+                await release.wait()
+                raise RuntimeError("boom")
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok", "more_body": False})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        leader = asyncio.ensure_future(flights.run("k", app, {"n": 0}, None, send))
+        follower = asyncio.ensure_future(flights.run("k", app, {"n": 1}, None, send))
+        await asyncio.sleep(0)
+        release.set()
+
+        with self.assertRaises(RuntimeError):
+            await leader
+        await follower
+
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual(sent[-1]["body"], b"ok")
+        self.assertEqual(len(flights), 0)
+
+    async def test_responses_setting_cookies_are_not_shared(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["n"])
+            if scope["n"] == 0:
+                await release.wait()
+            headers = [
+                (b"set-cookie", f"session={scope['n']}".encode()),
+                (b"x-request-id", str(scope["n"]).encode()),
+            ]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"ok", "more_body": False})
+
+        sent = {0: [], 1: []}
+
+        def sender(n):
+            async def send(message):
+                sent[n].append(message)
+            return send
+
+        leader = asyncio.ensure_future(flights.run("k", app, {"n": 0}, None, sender(0)))
+        follower = asyncio.ensure_future(flights.run("k", app, {"n": 1}, None, sender(1)))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(leader, follower)
+
+        self.assertEqual(calls, [0, 1])
+        self.assertIn((b"set-cookie", b"session=1"), sent[1][0]["headers"])
+
+    async def test_per_request_headers_are_not_replayed(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            headers = [(b"content-type", b"text/plain"), (b"x-request-id", b"leader")]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"ok", "more_body": False})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def discard(message):
+            pass
+
+        leader = asyncio.ensure_future(flights.run("k", app, {}, None, discard))
+        follower = asyncio.ensure_future(flights.run("k", app, {}, None, send))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(leader, follower)
+
+        self.assertEqual(sent[0]["headers"], [(b"content-type", b"text/plain")])
+        self.assertEqual(sent[1]["body"], b"ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
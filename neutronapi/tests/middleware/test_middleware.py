@@ -1,6 +1,10 @@
 import unittest
 
-from neutronapi.middleware.allowed_hosts import AllowedHostsMiddleware
+from neutronapi.middleware.allowed_hosts import (
+    AllowedHostsMiddleware,
+    HostMatcher,
+    is_host_allowed,
+)
 from neutronapi.middleware.cors import CorsMiddleware
 
 
@@ -108,3 +112,53 @@ class TestMiddleware(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(msgs[0]["status"], 200)
         self.assertNotIn(b"Access-Control-Allow-Origin", {k for k, _ in msgs[0].get("headers", [])})
 
+
+class TestHostMatcher(unittest.TestCase):
+    PATTERNS = [
+        ["example.com"],
+        [".example.com"],
+        ["*.example.com"],
+        ["api.example.com:8000", ".internal"],
+        ["*"],
+        ["*.a.example.com", "b.example.com"],
+    ]
+    HOSTS = [
+        "example.com",
+        "example.com:8000",
+        "api.example.com",
+        "api.example.com:8000",
+        "deep.a.example.com",
+        "a.example.com",
+        "b.example.com",
+        "badexample.com",
+        "example.com.evil.com",
+        "svc.internal",
+        "internal",
+        "",
+    ]
+
+    def test_matches_linear_check(self):
+        for patterns in self.PATTERNS:
+            matcher = HostMatcher(patterns)
+            for host in self.HOSTS:
+                with self.subTest(patterns=patterns, host=host):
+                    self.assertEqual(matcher.allows(host), is_host_allowed(host, patterns))
+
+    def test_match_returns_values_for_every_pattern(self):
+        matcher = HostMatcher()
+        matcher.add("*.tenant.example.com", "tenants")
+        matcher.add("acme.tenant.example.com", "acme")
+        matcher.add(".example.com", "all")
+
+        self.assertEqual(
+            set(matcher.match("acme.tenant.example.com")), {"acme", "tenants", "all"}
+        )
+        self.assertEqual(set(matcher.match("tenant.example.com")), {"tenants", "all"})
+        self.assertEqual(matcher.match("other.org"), ())
+
+    def test_resolution_cache_is_bounded(self):
+        matcher = HostMatcher(["*.example.com"], cache_size=2)
+        for host in ("a.example.com", "b.example.com", "c.example.com"):
+            matcher.match(host)
+
+        self.assertEqual(len(matcher._cache), 2)
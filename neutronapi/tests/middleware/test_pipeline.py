@@ -0,0 +1,208 @@
+import gzip
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.middleware.compression import CompressionMiddleware
+from neutronapi.middleware.pipeline import Middleware, Pipeline, fuse_middleware
+
+
+async def call(app, path="/", headers=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": headers or []}
+    await app(scope, receive, send)
+    return messages
+
+
+def chunked_app(*chunks, content_type=b"text/plain", extra_headers=()):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type), *extra_headers],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1}
+            )
+
+    return app
+
+
+class Recorder(Middleware):
+    def __init__(self, name, log, app=None):
+        super().__init__(app)
+        self.name = name
+        self.log = log
+
+    async def on_request(self, scope, exchange):
+        self.log.append(("request", self.name))
+
+    def on_response_start(self, scope, exchange):
+        self.log.append(("start", self.name))
+        exchange.headers.append((b"x-stage", self.name.encode()))
+
+    async def on_complete(self, scope, exchange, error):
+        self.log.append(("complete", self.name, exchange.status, error))
+
+
+class Reject(Middleware):
+    async def on_request(self, scope, exchange):
+        async def forbidden(scope, receive, send):
+            await send({"type": "http.response.start", "status": 403, "headers": []})
+            await send({"type": "http.response.body", "body": b"no"})
+
+        return forbidden
+
+
+class Upper(Middleware):
+    def on_body(self, scope, exchange, body, more_body):
+        return body.upper()
+
+
+class PlainHeader:
+    """An ordinary wrapping ASGI middleware."""
+
+    def __init__(self, app=None):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message["headers"], (b"x-plain", b"1")]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PingAPI(API):
+    name = "ping"
+    resource = "/ping"
+
+    @API.endpoint("/", methods=["GET"], name="ping")
+    async def ping(self, scope, receive, send, **kwargs):
+        scope["_response_headers"] = [(b"x-queued", b"yes")]
+        return await self.response({"text": "pong " * 200})
+
+
+class TestPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_hooks_run_in_onion_order_on_one_header_list(self):
+        log = []
+        pipeline = Pipeline([Recorder("outer", log), Recorder("inner", log)], chunked_app(b"hi"))
+
+        messages = await call(pipeline)
+
+        self.assertEqual(
+            log,
+            [
+                ("request", "outer"),
+                ("request", "inner"),
+                ("start", "inner"),
+                ("start", "outer"),
+                ("complete", "inner", 200, None),
+                ("complete", "outer", 200, None),
+            ],
+        )
+        self.assertEqual(
+            [v for k, v in messages[0]["headers"] if k == b"x-stage"], [b"inner", b"outer"]
+        )
+        self.assertEqual(messages[1]["body"], b"hi")
+
+    async def test_short_circuit_is_seen_only_by_outer_stages(self):
+        log = []
+        pipeline = Pipeline([Recorder("outer", log), Reject(), Recorder("inner", log)], chunked_app(b"hi"))
+
+        messages = await call(pipeline)
+
+        self.assertEqual(messages[0]["status"], 403)
+        self.assertEqual(dict(messages[0]["headers"]), {b"x-stage": b"outer"})
+        self.assertEqual(log[-1], ("complete", "outer", 403, None))
+        self.assertNotIn(("request", "inner"), log)
+
+    async def test_errors_reach_complete_hooks(self):
+        log = []
+
+        async def broken(scope, receive, send):
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            await call(Pipeline([Recorder("outer", log)], broken))
+
+        _, _, status, error = log[-1]
+        self.assertIsNone(status)
+        self.assertIsInstance(error, RuntimeError)
+
+    async def test_middleware_runs_standalone(self):
+        messages = await call(Upper(chunked_app(b"a", b"b")))
+        self.assertEqual([m.get("body") for m in messages[1:]], [b"A", b"B"])
+
+    async def test_plain_middleware_between_hook_stages(self):
+        log = []
+        app = fuse_middleware(
+            [Recorder("outer", log), PlainHeader(), Recorder("inner", log)], chunked_app(b"hi")
+        )
+
+        messages = await call(app)
+
+        headers = messages[0]["headers"]
+        self.assertEqual(
+            [k for k, _ in headers if k in (b"x-stage", b"x-plain")],
+            [b"x-stage", b"x-plain", b"x-stage"],
+        )
+
+
+class TestCompressionStage(unittest.IsolatedAsyncioTestCase):
+    async def test_small_leading_chunks_are_buffered_then_streamed(self):
+        payload = [b"a" * 100, b"b" * 600, b"c" * 50]
+        app = CompressionMiddleware(chunked_app(*payload), minimum_size=500)
+
+        messages = await call(app, headers=[(b"accept-encoding", b"gzip")])
+
+        headers = dict(messages[0]["headers"])
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertNotIn(b"content-length", headers)
+        body = b"".join(m["body"] for m in messages[1:])
+        self.assertEqual(gzip.decompress(body), b"".join(payload))
+
+    async def test_small_streamed_body_is_sent_uncompressed(self):
+        app = CompressionMiddleware(chunked_app(b"a" * 10, b"b" * 10), minimum_size=500)
+
+        messages = await call(app, headers=[(b"accept-encoding", b"gzip")])
+
+        self.assertNotIn(b"content-encoding", dict(messages[0]["headers"]))
+        self.assertEqual(b"".join(m["body"] for m in messages[1:]), b"a" * 10 + b"b" * 10)
+
+    async def test_event_streams_are_not_compressed(self):
+        app = CompressionMiddleware(
+            chunked_app(b"data: x\n\n" * 100, b"", content_type=b"text/event-stream"), minimum_size=10
+        )
+
+        messages = await call(app, headers=[(b"accept-encoding", b"gzip")])
+
+        self.assertNotIn(b"content-encoding", dict(messages[0]["headers"]))
+
+    async def test_application_response_is_compressed_once_with_queued_headers(self):
+        app = Application(apis=[PingAPI()], middlewares=[CompressionMiddleware()])
+
+        messages = await call(app, "/ping", headers=[(b"accept-encoding", b"gzip")])
+
+        headers = dict(messages[0]["headers"])
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(headers[b"content-length"], str(len(body)).encode())
+        self.assertEqual(headers[b"x-queued"], b"yes")
+        self.assertIn(b"x-request-id", headers)
+        self.assertIn(b"pong", gzip.decompress(body))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.encoders import json_loads
+from neutronapi.middleware.response_cache import (
+    RESPONSE_CACHE_SCOPE_KEY,
+    CachePolicy,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    get_response_cache,
+)
+
+
+class ItemsAPI(API):
+    name = "items"
+    resource = "/items"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    @API.endpoint("/", methods=["GET"], name="list", cache=60)
+    async def list_items(self, scope, receive, send, **kwargs):
+        self.calls += 1
+        return await self.response({"calls": self.calls})
+
+    @API.endpoint("/", methods=["POST"], name="create")
+    async def create(self, scope, receive, send, **kwargs):
+        get_response_cache(scope).invalidate_prefix("/items")
+        return await self.response({"ok": True}, status=201)
+
+    @API.endpoint("/uncached", methods=["GET"], name="uncached")
+    async def uncached(self, scope, receive, send, **kwargs):
+        self.calls += 1
+        return await self.response({"calls": self.calls})
+
+    @API.endpoint(
+        "/localized",
+        methods=["GET"],
+        name="localized",
+        cache=CachePolicy(ttl=60, vary=("Accept-Language",)),
+    )
+    async def localized(self, scope, receive, send, **kwargs):
+        self.calls += 1
+        return await self.response({"calls": self.calls})
+
+    @API.endpoint("/private", methods=["GET"], name="private", cache=60)
+    async def private(self, scope, receive, send, **kwargs):
+        self.calls += 1
+        return await self.response(
+            {"calls": self.calls}, headers=[(b"cache-control", b"private")]
+        )
+
+
+async def call(app, method="GET", path="/items", query=b"", headers=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": headers or [],
+    }
+    await app(scope, receive, send)
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start, json_loads(body)
+
+
+def header(start, name):
+    return dict(start["headers"]).get(name)
+
+
+class TestResponseCacheMiddleware(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.api = ItemsAPI()
+        self.middleware = ResponseCacheMiddleware()
+        self.app = Application(apis=[self.api], middlewares=[self.middleware])
+
+    async def test_hit_skips_handler(self):
+        start, body = await call(self.app)
+        self.assertEqual(header(start, b"x-cache"), b"miss")
+        self.assertEqual(body, {"calls": 1})
+
+        start, body = await call(self.app)
+        self.assertEqual(header(start, b"x-cache"), b"hit")
+        self.assertEqual(body, {"calls": 1})
+        self.assertEqual(self.api.calls, 1)
+
+    async def test_query_is_normalized(self):
+        await call(self.app, query=b"a=1&b=2")
+        _, body = await call(self.app, query=b"b=2&a=1")
+        self.assertEqual(body, {"calls": 1})
+
+        _, body = await call(self.app, query=b"a=2")
+        self.assertEqual(body, {"calls": 2})
+
+    async def test_repeated_parameters_keep_their_order(self):
+        await call(self.app, query=b"tag=b&tag=a")
+        _, body = await call(self.app, query=b"tag=a&tag=b")
+        self.assertEqual(body, {"calls": 2})
+
+        await call(self.app, query=b"x=1&tag=a&tag=b")
+        _, body = await call(self.app, query=b"tag=a&x=1&tag=b")
+        self.assertEqual(body, {"calls": 3})
+
+    async def test_endpoints_without_policy_are_not_cached(self):
+        await call(self.app, path="/items/uncached")
+        start, body = await call(self.app, path="/items/uncached")
+        self.assertEqual(body, {"calls": 2})
+        self.assertEqual(header(start, b"x-cache"), b"miss")
+
+    async def test_vary_headers_split_variants(self):
+        en = [(b"accept-language", b"en")]
+        fr = [(b"accept-language", b"fr")]
+
+        await call(self.app, path="/items/localized", headers=en)
+        _, body = await call(self.app, path="/items/localized", headers=fr)
+        self.assertEqual(body, {"calls": 2})
+        _, body = await call(self.app, path="/items/localized", headers=en)
+        self.assertEqual(body, {"calls": 1})
+
+    async def test_credentials_and_private_responses_bypass_cache(self):
+        auth = [(b"authorization", b"Bearer token")]
+        await call(self.app, headers=auth)
+        _, body = await call(self.app, headers=auth)
+        self.assertEqual(body, {"calls": 2})
+
+        await call(self.app, path="/items/private")
+        _, body = await call(self.app, path="/items/private")
+        self.assertEqual(body, {"calls": 4})
+
+    async def test_credentials_are_not_served_anonymous_entries(self):
+        await call(self.app)
+        start, body = await call(self.app, headers=[(b"cookie", b"session=abc")])
+        self.assertEqual(header(start, b"x-cache"), b"miss")
+        self.assertEqual(body, {"calls": 2})
+
+    async def test_entries_are_kept_per_host(self):
+        await call(self.app, headers=[(b"host", b"a.example.com")])
+        start, body = await call(self.app, headers=[(b"host", b"b.example.com")])
+        self.assertEqual(header(start, b"x-cache"), b"miss")
+        self.assertEqual(body, {"calls": 2})
+
+        start, body = await call(self.app, headers=[(b"host", b"A.example.com")])
+        self.assertEqual(header(start, b"x-cache"), b"hit")
+        self.assertEqual(body, {"calls": 1})
+
+        self.assertEqual(self.middleware.cache.invalidate("/items", host="b.example.com"), 1)
+        self.assertEqual(len(self.middleware.cache), 1)
+
+    async def test_per_request_headers_are_not_replayed(self):
+        async def app(scope, receive, send):
+            scope[RESPONSE_CACHE_SCOPE_KEY].policy = CachePolicy(ttl=60)
+            headers = [
+                (b"content-type", b"application/json"),
+                (b"x-request-id", b"req-1"),
+                (b"x-ratelimit-limit", b"10"),
+            ]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        middleware = ResponseCacheMiddleware(app)
+        await call(middleware)
+        start, _ = await call(middleware)
+
+        self.assertEqual(header(start, b"x-cache"), b"hit")
+        self.assertEqual(header(start, b"content-type"), b"application/json")
+        self.assertIsNone(header(start, b"x-request-id"))
+        self.assertIsNone(header(start, b"x-ratelimit-limit"))
+
+    async def test_handler_invalidation(self):
+        await call(self.app)
+        start, _ = await call(self.app, method="POST")
+        self.assertEqual(start["status"], 201)
+
+        _, body = await call(self.app)
+        self.assertEqual(body, {"calls": 2})
+
+
+class TestResponseCache(unittest.TestCase):
+    def _store(self, cache, path, body, ttl=60):
+        return cache.set(
+            (b"", "GET", path, b""),
+            (),
+            {},
+            status=200,
+            response_headers=[],
+            body=body,
+            ttl=ttl,
+        )
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=10, max_entry_bytes=10)
+        self._store(cache, "/a", b"aaaa")
+        self._store(cache, "/b", b"bbbb")
+        self.assertIsNotNone(cache.get((b"", "GET", "/a", b""), {}))
+
+        self._store(cache, "/c", b"cccc")
+
+        self.assertIsNone(cache.get((b"", "GET", "/b", b""), {}))
+        self.assertIsNotNone(cache.get((b"", "GET", "/a", b""), {}))
+        self.assertEqual(cache.size, 8)
+
+    def test_oversized_entries_rejected(self):
+        cache = ResponseCache(max_bytes=100, max_entry_bytes=4)
+        self.assertFalse(self._store(cache, "/a", b"too large"))
+        self.assertEqual(len(cache), 0)
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache()
+        self._store(cache, "/a", b"a", ttl=-1)
+        self.assertIsNone(cache.get((b"", "GET", "/a", b""), {}))
+        self.assertEqual(cache.size, 0)
+
+    def test_policy_coercion(self):
+        self.assertEqual(CachePolicy.coerce(30), CachePolicy(ttl=30))
+        self.assertIsNone(CachePolicy.coerce(None))
+        with self.assertRaises(ValueError):
+            CachePolicy.coerce("30")
+        with self.assertRaises(ValueError):
+            CachePolicy(ttl=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
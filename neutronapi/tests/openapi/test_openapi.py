@@ -596,6 +596,21 @@ class TestOpenAPI(unittest.IsolatedAsyncioTestCase):
         self.assertNotIn("page_size", param_names)
         self.assertNotIn("ordering", param_names)
 
+    async def test_cursor_pagination_documents_cursor_parameter(self):
+        class CursorUsersAPI(UsersAPI):
+            pagination = "cursor"
+
+        gen = OpenAPIGenerator(title="Test Params", version="1.0.0")
+        spec = await gen.generate_from_api(CursorUsersAPI())
+
+        list_get = spec["paths"]["/v1/users/"]["get"]
+        param_names = [p["name"] for p in list_get.get("parameters", [])]
+        self.assertIn("cursor", param_names)
+        self.assertNotIn("page", param_names)
+        schema = list_get["responses"]["200"]["content"]["application/json"]["schema"]
+        self.assertIn("next_cursor", schema["properties"])
+        self.assertIn("previous_cursor", schema["properties"])
+
     async def test_endpoint_metadata_not_overwritten(self):
         """Custom endpoint metadata should not be overwritten by auto-generated values."""
         gen = OpenAPIGenerator(title="Test Meta", version="1.0.0")
@@ -139,7 +139,7 @@ class TestAPIAndApplication(unittest.IsolatedAsyncioTestCase):
         messages = await call_asgi(app, scope)
 
         self.assertEqual(messages[0]["status"], 200)
-        self.assertIn(b'"api": "storage"', messages[1]["body"])
+        self.assertIn(b'"api":"storage"', messages[1]["body"])
 
     async def test_host_scoped_root_api_is_ignored_on_other_hosts(self):
         app = Application(
@@ -156,7 +156,7 @@ class TestAPIAndApplication(unittest.IsolatedAsyncioTestCase):
         messages = await call_asgi(app, scope)
 
         self.assertEqual(messages[0]["status"], 200)
-        self.assertIn(b'"api": "default"', messages[1]["body"])
+        self.assertIn(b'"api":"default"', messages[1]["body"])
 
     async def test_host_scoped_root_api_does_not_expose_control_plane_paths(self):
         app = Application(
@@ -0,0 +1,158 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.middleware.compression import CompressionMiddleware
+from neutronapi.responses import FileResponse
+
+CONTENT = bytes(range(256)) * 40
+
+
+async def call(app, method="GET", headers=None, extensions=None, path="/files/report"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": headers or []}
+    if extensions is not None:
+        scope["extensions"] = extensions
+    await app(scope, receive, send)
+    return messages
+
+
+def body_of(messages):
+    return b"".join(m.get("body", b"") for m in messages[1:])
+
+
+class TestFileResponse(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "report.csv")
+        with open(self.path, "wb") as handle:
+            handle.write(CONTENT)
+        path = self.path
+
+        class FilesAPI(API):
+            name = "files"
+            resource = "/files"
+
+            @API.endpoint("/report", methods=["GET", "HEAD"], name="report", response_body_mode="streamed")
+            async def report(self, scope, receive, send, **kwargs):
+                return FileResponse(path, chunk_size=4096, filename="report 2024.csv")
+
+            @API.endpoint("/missing", methods=["GET"], name="missing", response_body_mode="streamed")
+            async def missing(self, scope, receive, send, **kwargs):
+                return FileResponse(path + ".gone")
+
+        self.api_class = FilesAPI
+        self.app = Application(apis=[FilesAPI()])
+
+    async def test_streams_file_in_chunks_with_validators(self):
+        messages = await call(self.app)
+
+        headers = dict(messages[0]["headers"])
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertEqual(headers[b"content-type"], b"text/csv; charset=utf-8")
+        self.assertEqual(headers[b"content-length"], str(len(CONTENT)).encode())
+        self.assertEqual(headers[b"accept-ranges"], b"bytes")
+        self.assertEqual(headers[b"content-disposition"], b"attachment; filename*=utf-8''report%202024.csv")
+        self.assertIn(b"etag", headers)
+        self.assertIn(b"last-modified", headers)
+        self.assertEqual(body_of(messages), CONTENT)
+        self.assertEqual(len(messages), 5)
+
+    async def test_head_sends_headers_only(self):
+        messages = await call(self.app, "HEAD")
+
+        self.assertEqual(dict(messages[0]["headers"])[b"content-length"], str(len(CONTENT)).encode())
+        self.assertEqual(body_of(messages), b"")
+
+    async def test_conditional_requests_get_304(self):
+        headers = dict((await call(self.app))[0]["headers"])
+
+        for condition in (
+            (b"if-none-match", headers[b"etag"]),
+            (b"if-none-match", b'"other", W/' + headers[b"etag"]),
+            (b"if-modified-since", headers[b"last-modified"]),
+        ):
+            messages = await call(self.app, headers=[condition])
+            self.assertEqual(messages[0]["status"], 304, condition)
+            self.assertEqual(body_of(messages), b"")
+
+        messages = await call(self.app, headers=[(b"if-none-match", b'"other"')])
+        self.assertEqual(messages[0]["status"], 200)
+
+    async def test_ranges(self):
+        cases = [
+            (b"bytes=10-19", 206, CONTENT[10:20], b"bytes 10-19/10240"),
+            (b"bytes=10000-", 206, CONTENT[10000:], b"bytes 10000-10239/10240"),
+            (b"bytes=-5", 206, CONTENT[-5:], b"bytes 10235-10239/10240"),
+            (b"bytes=10200-99999", 206, CONTENT[10200:], b"bytes 10200-10239/10240"),
+            (b"bytes=0-1,5-6", 200, CONTENT, None),
+            (b"items=0-1", 200, CONTENT, None),
+        ]
+        for range_header, status, body, content_range in cases:
+            messages = await call(self.app, headers=[(b"range", range_header)])
+            headers = dict(messages[0]["headers"])
+            self.assertEqual(messages[0]["status"], status, range_header)
+            self.assertEqual(body_of(messages), body, range_header)
+            self.assertEqual(headers.get(b"content-range"), content_range)
+            self.assertEqual(headers[b"content-length"], str(len(body)).encode())
+
+        messages = await call(self.app, headers=[(b"range", b"bytes=20000-")])
+        self.assertEqual(messages[0]["status"], 416)
+        self.assertEqual(dict(messages[0]["headers"])[b"content-range"], b"bytes */10240")
+
+    async def test_if_range(self):
+        etag = dict((await call(self.app))[0]["headers"])[b"etag"]
+
+        matching = await call(self.app, headers=[(b"range", b"bytes=0-3"), (b"if-range", etag)])
+        stale = await call(self.app, headers=[(b"range", b"bytes=0-3"), (b"if-range", b'"stale"')])
+
+        self.assertEqual((matching[0]["status"], body_of(matching)), (206, CONTENT[:4]))
+        self.assertEqual((stale[0]["status"], body_of(stale)), (200, CONTENT))
+
+    async def test_pathsend_and_zerocopy_extensions(self):
+        messages = await call(self.app, extensions={"http.response.pathsend": {}})
+        self.assertEqual(messages[1], {"type": "http.response.pathsend", "path": self.path})
+
+        messages = await call(
+            self.app, headers=[(b"range", b"bytes=5-9")], extensions={"http.response.zerocopy": {}}
+        )
+        zerocopy = messages[1]
+        self.assertEqual(zerocopy["type"], "http.response.zerocopy")
+        self.assertEqual((zerocopy["offset"], zerocopy["count"]), (5, 5))
+        self.assertTrue(zerocopy["file"].closed)
+
+    async def test_missing_file_is_404(self):
+        messages = await call(self.app, path="/files/missing")
+        self.assertEqual(messages[0]["status"], 404)
+
+    async def test_compression_skips_ranges_and_weakens_etag(self):
+        app = Application(apis=[self.api_class()], middlewares=[CompressionMiddleware()])
+        accept = (b"accept-encoding", b"gzip")
+
+        full = await call(app, headers=[accept])
+        partial = await call(app, headers=[accept, (b"range", b"bytes=0-3")])
+
+        headers = dict(full[0]["headers"])
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertTrue(headers[b"etag"].startswith(b'W/"'))
+        self.assertEqual(gzip.decompress(body_of(full)), CONTENT)
+        self.assertNotIn(b"content-encoding", dict(partial[0]["headers"]))
+        self.assertEqual(body_of(partial), CONTENT[:4])
+
+        revalidated = await call(app, headers=[accept, (b"if-none-match", headers[b"etag"])])
+        self.assertEqual(revalidated[0]["status"], 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from neutronapi.headers import HEADERS_SCOPE_KEY, Headers, get_header, get_headers
+from neutronapi.middleware.cors import CorsMiddleware
+
+
+class TestHeaders(unittest.TestCase):
+    def test_lookup_is_case_insensitive(self):
+        headers = Headers([(b"Content-Type", b"application/json")])
+
+        self.assertEqual(headers.get(b"content-type"), b"application/json")
+        self.assertEqual(headers[b"CONTENT-TYPE"], b"application/json")
+        self.assertIn(b"content-type", headers)
+        self.assertNotIn(b"accept", headers)
+
+    def test_repeated_headers_keep_every_value(self):
+        headers = Headers([(b"x-forwarded-for", b"1.1.1.1"), (b"x-forwarded-for", b"2.2.2.2")])
+
+        self.assertEqual(headers.get(b"x-forwarded-for"), b"1.1.1.1")
+        self.assertEqual(headers.getlist(b"x-forwarded-for"), [b"1.1.1.1", b"2.2.2.2"])
+        self.assertEqual(headers.getlist(b"missing"), [])
+        self.assertEqual(len(headers), 1)
+
+    def test_get_text_strips_and_ignores_empty(self):
+        headers = Headers([(b"user-agent", b"  curl/8  "), (b"origin", b"")])
+
+        self.assertEqual(headers.get_text(b"user-agent"), "curl/8")
+        self.assertIsNone(headers.get_text(b"origin"))
+        self.assertIsNone(headers.get_text(b"missing"))
+
+
+class TestScopeCache(unittest.TestCase):
+    def test_index_built_once_per_scope(self):
+        scope = {"type": "http", "headers": [(b"host", b"example.com")]}
+
+        first = get_headers(scope)
+        self.assertIs(scope[HEADERS_SCOPE_KEY], first)
+        self.assertIs(get_headers(scope), first)
+        self.assertEqual(get_header(scope, b"host"), b"example.com")
+
+    def test_replaced_header_list_rebuilds_index(self):
+        scope = {"type": "http", "headers": [(b"host", b"example.com")]}
+        get_headers(scope)
+
+        scope["headers"] = [(b"host", b"other.com")]
+
+        self.assertEqual(get_header(scope, b"host"), b"other.com")
+
+    def test_missing_headers(self):
+        self.assertEqual(len(get_headers({"type": "http"})), 0)
+
+
+class TestMiddlewareSharesIndex(unittest.IsolatedAsyncioTestCase):
+    async def test_downstream_app_sees_cached_index(self):
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen["headers"] = scope.get(HEADERS_SCOPE_KEY)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = CorsMiddleware(app, allow_all_origins=True)
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"origin", b"https://example.com")],
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        await middleware(scope, receive, send)
+
+        self.assertIsNotNone(seen["headers"])
+        self.assertIs(seen["headers"], get_headers(scope))
+
+
+if __name__ == "__main__":
+    unittest.main()
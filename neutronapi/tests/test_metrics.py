@@ -0,0 +1,244 @@
+import os
+import tempfile
+import unittest
+
+from neutronapi.api import exceptions
+from neutronapi.application import Application
+from neutronapi.background import Background, TaskFrequency
+from neutronapi.base import API
+from neutronapi.db.providers import SQLiteProvider
+from neutronapi.metrics import (
+    REGISTRY,
+    MetricsAPI,
+    MetricsRegistry,
+    MultiProcessCollector,
+    merge_snapshots,
+    render_snapshot,
+)
+
+
+async def call_asgi(app, path, method="GET"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "method": method, "path": path, "headers": []}, receive, send)
+    return messages
+
+
+class ItemsAPI(API):
+    name = "items"
+    resource = "/v1/items"
+
+    @API.endpoint("/<int:item_id>", methods=["GET"], name="detail")
+    async def detail(self, scope, receive, send, **kwargs):
+        return await self.response({"id": kwargs["item_id"]})
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        requests = registry.counter("app_requests_total", "Requests.", ("method", "status"))
+        requests.labels("GET", 200).inc()
+        requests.labels("GET", "200").inc(2)
+        registry.gauge("app_queue_depth", "Queued jobs.").set(3)
+        latency = registry.histogram("app_latency_seconds", "Latency.", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            latency.observe(value)
+
+        self.assertEqual(
+            registry.render(),
+            "# HELP app_requests_total Requests.\n"
+            "# TYPE app_requests_total counter\n"
+            'app_requests_total{method="GET",status="200"} 3\n'
+            "# HELP app_queue_depth Queued jobs.\n"
+            "# TYPE app_queue_depth gauge\n"
+            "app_queue_depth 3\n"
+            "# HELP app_latency_seconds Latency.\n"
+            "# TYPE app_latency_seconds histogram\n"
+            'app_latency_seconds_bucket{le="0.1"} 2\n'
+            'app_latency_seconds_bucket{le="1"} 3\n'
+            'app_latency_seconds_bucket{le="+Inf"} 4\n'
+            "app_latency_seconds_sum 3.65\n"
+            "app_latency_seconds_count 4\n",
+        )
+
+    def test_registration_is_idempotent_but_checked(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs.", ("queue",))
+        self.assertIs(registry.counter("jobs_total", "Jobs.", ("queue",)), counter)
+        with self.assertRaises(ValueError):
+            registry.gauge("jobs_total", "Jobs.", ("queue",))
+        with self.assertRaises(ValueError):
+            counter.labels("a", "b")
+        with self.assertRaises(ValueError):
+            counter.labels("a").inc(-1)
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits.", ("route",)).labels('/a"b\\c').inc()
+        self.assertIn('hits_total{route="/a\\"b\\\\c"} 1\n', registry.render())
+
+    def test_merge_snapshots_across_processes(self):
+        snapshots = []
+        for in_flight, observed in ((2, 0.2), (5, 2.0)):
+            registry = MetricsRegistry()
+            registry.counter("req_total", "Requests.", ("route",)).labels("/a").inc()
+            registry.gauge("in_flight", "In flight.").set(in_flight)
+            registry.gauge("peak", "Peak.", aggregate="max").set(in_flight)
+            registry.histogram("lat", "Latency.", buckets=(1,)).observe(observed)
+            snapshots.append(registry.snapshot())
+
+        text = render_snapshot(merge_snapshots(snapshots))
+        self.assertIn('req_total{route="/a"} 2\n', text)
+        self.assertIn("in_flight 7\n", text)
+        self.assertIn("peak 5\n", text)
+        self.assertIn('lat_bucket{le="1"} 1\n', text)
+        self.assertIn("lat_count 2\n", text)
+
+
+class TestMultiProcessCollector(unittest.TestCase):
+    def test_collect_merges_worker_snapshot_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            other = MetricsRegistry()
+            other.counter("req_total", "Requests.").inc(4)
+            with open(os.path.join(directory, "1.json"), "wb") as handle:
+                from neutronapi.encoders import json_dumps_bytes
+
+                handle.write(json_dumps_bytes(other.snapshot()))
+
+            registry = MetricsRegistry()
+            registry.counter("req_total", "Requests.").inc()
+            collector = MultiProcessCollector(directory, registry)
+
+            self.assertIn("req_total 5\n", collector.render())
+            self.assertTrue(collector.path.exists())
+
+
+def restore_enabled(test):
+    test.addCleanup(setattr, REGISTRY, "enabled", REGISTRY.enabled)
+
+
+class TestRequestMetrics(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        restore_enabled(self)
+
+    async def test_requests_are_labelled_by_route_template(self):
+        app = Application(apis=[ItemsAPI(), MetricsAPI()], metrics=True)
+        requests = REGISTRY.get("neutronapi_http_requests_total")
+        detail = requests.labels("GET", "/v1/items/<int:item_id>", "200")
+        unmatched = requests.labels("GET", "<unmatched>", "404")
+        before, before_unmatched = detail.value, unmatched.value
+
+        await call_asgi(app, "/v1/items/1")
+        await call_asgi(app, "/v1/items/2")
+        await call_asgi(app, "/nowhere")
+
+        self.assertEqual(detail.value - before, 2)
+        self.assertEqual(unmatched.value - before_unmatched, 1)
+
+        messages = await call_asgi(app, "/metrics")
+        headers = dict(messages[0]["headers"])
+        body = messages[1]["body"].decode()
+        self.assertEqual(headers[b"content-type"], b"text/plain; version=0.0.4; charset=utf-8")
+        self.assertIn(
+            'neutronapi_http_requests_total{method="GET",route="/v1/items/<int:item_id>",status="200"}',
+            body,
+        )
+        self.assertIn("neutronapi_http_request_duration_seconds_bucket", body)
+        self.assertNotIn("/v1/items/1", body)
+
+    async def test_unknown_methods_share_one_label(self):
+        app = Application(apis=[ItemsAPI()], metrics=True)
+        requests = REGISTRY.get("neutronapi_http_requests_total")
+        other = requests.labels("OTHER", "<unmatched>", "405")
+        before = other.value
+
+        await call_asgi(app, "/v1/items/1", method="FOO1")
+        await call_asgi(app, "/v1/items/1", method="FOO2")
+
+        self.assertEqual(other.value - before, 2)
+        self.assertNotIn("FOO1", render_snapshot(REGISTRY.snapshot()))
+
+    async def test_metrics_are_off_by_default(self):
+        REGISTRY.enabled = False
+        app = Application(apis=[ItemsAPI()])
+        self.assertFalse(REGISTRY.enabled)
+        series = REGISTRY.get("neutronapi_http_requests_total").labels(
+            "GET", "/v1/items/<int:item_id>", "200"
+        )
+        before = series.value
+        await call_asgi(app, "/v1/items/1")
+        self.assertEqual(series.value, before)
+
+    async def test_metrics_api_accepts_authentication(self):
+        class ScraperAuth:
+            async def authorize(self, scope):
+                if dict(scope["headers"]).get(b"authorization") != b"Bearer scrape":
+                    raise exceptions.AuthenticationFailed("Invalid token")
+
+        app = Application(apis=[MetricsAPI(authentication_class=ScraperAuth())])
+        messages = await call_asgi(app, "/metrics")
+        self.assertEqual(messages[0]["status"], 401)
+
+
+class TestTaskAndQueryMetrics(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        restore_enabled(self)
+        REGISTRY.enabled = True
+    async def test_background_task_runs_are_counted(self):
+        async def succeed():
+            return True
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        background = Background()
+        runs = REGISTRY.get("neutronapi_task_runs_total")
+        before = (runs.labels("metrics_ok", "success").value, runs.labels("metrics_bad", "failure").value)
+        for name, func in (("metrics_ok", succeed), ("metrics_bad", fail)):
+            task_id = background.add_task(name=name, func=func, frequency=TaskFrequency.ONCE)
+            await background._execute_task(background.get_task(task_id))
+
+        self.assertEqual(runs.labels("metrics_ok", "success").value - before[0], 1)
+        self.assertEqual(runs.labels("metrics_bad", "failure").value - before[1], 1)
+
+    async def test_provider_calls_are_timed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            provider = SQLiteProvider({"NAME": os.path.join(directory, "metrics.db")})
+            await provider.connect()
+            queries = REGISTRY.get("neutronapi_db_queries_total")
+            ok = queries.labels("sqlite", "fetchone", "success")
+            failed = queries.labels("sqlite", "execute", "error")
+            before = (ok.value, failed.value)
+            try:
+                await provider.fetchone("SELECT 1 AS one")
+                with self.assertRaises(Exception):
+                    await provider.execute("SELECT * FROM missing_table")
+            finally:
+                await provider.disconnect()
+
+        self.assertEqual(ok.value - before[0], 1)
+        self.assertEqual(failed.value - before[1], 1)
+
+    async def test_nothing_is_recorded_while_disabled(self):
+        REGISTRY.enabled = False
+        with tempfile.TemporaryDirectory() as directory:
+            provider = SQLiteProvider({"NAME": os.path.join(directory, "metrics.db")})
+            await provider.connect()
+            ok = REGISTRY.get("neutronapi_db_queries_total").labels("sqlite", "fetchone", "success")
+            before = ok.value
+            try:
+                await provider.fetchone("SELECT 1 AS one")
+            finally:
+                await provider.disconnect()
+
+        self.assertEqual(ok.value, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
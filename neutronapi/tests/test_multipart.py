@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import tracemalloc
+import unittest
+from unittest import mock
+
+from neutronapi.api import exceptions
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.encoders import json_loads
+from neutronapi.parsers import MultiPartParser, UploadFile, close_uploads
+from neutronapi.streams import AsyncByteStream
+
+BOUNDARY = b"----neutronboundary"
+CONTENT_TYPE = b"multipart/form-data; boundary=" + BOUNDARY
+
+
+def field(name, value):
+    return (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="' + name + b'"\r\n\r\n' + value + b"\r\n"
+    )
+
+
+def file_head(name, filename, content_type=b"application/octet-stream"):
+    return (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="' + name + b'"; filename="' + filename + b'"\r\n'
+        b"Content-Type: " + content_type + b"\r\n\r\n"
+    )
+
+
+END = b"--" + BOUNDARY + b"--\r\n"
+
+
+def stream_of(chunks):
+    chunks = iter(list(chunks) + [b""])
+    pending = [next(chunks)]
+
+    async def receive():
+        chunk = pending.pop()
+        try:
+            pending.append(next(chunks))
+            more = True
+        except StopIteration:
+            more = False
+        return {"type": "http.request", "body": chunk, "more_body": more}
+
+    return AsyncByteStream(receive)
+
+
+def scope():
+    return {"type": "http", "headers": [(b"content-type", CONTENT_TYPE)]}
+
+
+class TestStreamedMultipart(unittest.IsolatedAsyncioTestCase):
+    async def test_all_parts_are_exposed(self):
+        body = (
+            field(b"title", b"holiday")
+            + file_head(b"photos", b"a.jpg", b"image/jpeg") + b"AAAA\r\n"
+            + file_head(b"photos", b"b.jpg", b"image/jpeg") + b"BBBBBB\r\n"
+            + END
+        )
+        # Split awkwardly so boundaries and headers straddle chunks.
+        chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+        async with await MultiPartParser(hash_algorithm="sha256").parse_stream(scope(), stream_of(chunks)) as form:
+            self.assertEqual(form.fields, {"title": "holiday"})
+            self.assertEqual([(f.filename, f.size) for f in form.files], [("a.jpg", 4), ("b.jpg", 6)])
+            second = form.files[1]
+            self.assertEqual(second.content_type, "image/jpeg")
+            self.assertEqual(second.digest, hashlib.sha256(b"BBBBBB").hexdigest())
+            self.assertEqual(await form.file("photos").read(), b"AAAA")
+
+    async def test_large_upload_spools_to_disk_with_flat_memory(self):
+        chunk = b"x" * 64 * 1024
+        count = 160  # 10 MiB
+
+        def chunks():
+            yield file_head(b"upload", b"big.bin")
+            for _ in range(count):
+                yield chunk
+            yield b"\r\n" + END
+
+        tracemalloc.start()
+        try:
+            form = await MultiPartParser(spool_max_size=256 * 1024).parse_stream(scope(), stream_of(chunks()))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        upload = form.files[0]
+        self.assertEqual(upload.size, len(chunk) * count)
+        self.assertFalse(upload.in_memory)
+        form.close()
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+    async def test_limits(self):
+        body = file_head(b"upload", b"big.bin") + b"x" * 100 + b"\r\n" + END
+        with self.assertRaises(exceptions.APIException) as ctx:
+            await MultiPartParser(max_file_size=50).parse_stream(scope(), stream_of([body]))
+        self.assertEqual(ctx.exception.status_code, 413)
+
+        body = field(b"a", b"1") + field(b"b", b"2") + END
+        with self.assertRaises(exceptions.ValidationError):
+            await MultiPartParser(max_parts=1).parse_stream(scope(), stream_of([body]))
+
+    async def test_writes_that_spill_to_disk_run_in_a_thread(self):
+        upload = UploadFile("f", "f.bin", None, {}, spool_max_size=10)
+        self.addCleanup(upload.close)
+        with mock.patch("neutronapi.parsers.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            await upload.write(b"x" * 10)
+            self.assertTrue(upload.in_memory)
+            self.assertEqual(to_thread.call_count, 0)
+
+            await upload.write(b"y")
+            self.assertFalse(upload.in_memory)
+            self.assertEqual(to_thread.call_count, 1)
+
+            await upload.seek(0)
+            self.assertEqual(await upload.read(), b"x" * 10 + b"y")
+            self.assertEqual(to_thread.call_count, 3)
+
+    async def test_buffered_parse_reads_spilled_files_in_a_thread(self):
+        body = file_head(b"upload", b"big.bin") + b"x" * 100 + b"\r\n" + END
+        parser = MultiPartParser(spool_max_size=10)
+        with mock.patch("neutronapi.parsers.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            parsed = await parser.parse(scope(), None, raw_body=body, headers=dict(scope()["headers"]))
+        self.addCleanup(close_uploads, parsed)
+
+        self.assertEqual(parsed["file"], b"x" * 100)
+        called = [call.args[0].__name__ for call in to_thread.call_args_list]
+        self.assertIn("read", called)
+        self.assertIn("seek", called)
+
+    async def test_truncated_body_is_rejected(self):
+        body = field(b"a", b"1") + file_head(b"upload", b"x.bin") + b"partial"
+        with self.assertRaises(exceptions.ValidationError):
+            await MultiPartParser().parse_stream(scope(), stream_of([body]))
+
+
+class UploadAPI(API):
+    name = "uploads"
+    resource = "/uploads"
+
+    def __init__(self):
+        super().__init__()
+        self.uploads = []
+
+    @API.endpoint("/", methods=["POST"], name="create", parsers=[MultiPartParser()])
+    async def create(self, scope, receive, send, **kwargs):
+        self.uploads.extend(kwargs["files"])
+        return await self.response(
+            {
+                "file": kwargs["file"].decode(),
+                "files": [[f.field_name, f.filename, (await f.read()).decode()] for f in kwargs["files"]],
+            }
+        )
+
+
+class TestBufferedMultipart(unittest.IsolatedAsyncioTestCase):
+    async def test_every_file_part_is_returned(self):
+        body = (
+            file_head(b"first", b"one.txt", b"text/plain") + b"one\r\n"
+            + file_head(b"second", b"two.txt", b"text/plain") + b"two\r\n"
+            + END
+        )
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await Application(apis=[UploadAPI()])(
+            {"type": "http", "method": "POST", "path": "/uploads", "headers": [(b"content-type", CONTENT_TYPE)]},
+            receive,
+            send,
+        )
+
+        self.assertEqual(messages[0]["status"], 200)
+        payload = json_loads(messages[1]["body"])
+        self.assertEqual(payload["file"], "one")
+        self.assertEqual(payload["files"], [["first", "one.txt", "one"], ["second", "two.txt", "two"]])
+
+    async def test_files_are_closed_after_the_request(self):
+        api = UploadAPI()
+        body = file_head(b"first", b"one.txt", b"text/plain") + b"one\r\n" + END
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            pass
+
+        await Application(apis=[api])(
+            {"type": "http", "method": "POST", "path": "/uploads", "headers": [(b"content-type", CONTENT_TYPE)]},
+            receive,
+            send,
+        )
+
+        self.assertEqual(len(api.uploads), 1)
+        self.assertTrue(api.uploads[0].file.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
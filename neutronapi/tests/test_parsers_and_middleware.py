@@ -359,6 +359,44 @@ class TestParsersAndMiddleware(unittest.IsolatedAsyncioTestCase):
         endpoint_hdrs = [v for (k, v) in msgs[0]["headers"] if k == b"X-Endpoint"]
         self.assertGreaterEqual(len(endpoint_hdrs), 2)
 
+    async def test_endpoint_middleware_isolated_across_concurrent_requests(self):
+        import asyncio
+
+        class SlowEndpointMiddleware:
+            def __init__(self):
+                self.app = None
+
+            async def __call__(self, scope, receive, send):
+                await asyncio.sleep(0.01)
+                await self.app(scope, receive, send)
+
+        class EchoAPI(API):
+            name = "echo"
+            resource = ""
+
+            @API.endpoint("/echo", methods=["POST"], middlewares=[SlowEndpointMiddleware()])
+            async def echo(self, scope, receive, send, **kwargs):
+                return await self.response({"data": kwargs["body"]})
+
+        app = Application(apis=[EchoAPI()])
+
+        def scope():
+            return {
+                "type": "http",
+                "method": "POST",
+                "path": "/echo",
+                "headers": [(b"content-type", b"application/json")],
+            }
+
+        results = await asyncio.gather(
+            *[
+                call_asgi(app, scope(), body=json.dumps({"n": n}).encode("utf-8"))
+                for n in range(5)
+            ]
+        )
+        echoed = [json.loads(msgs[1]["body"].decode())["data"]["n"] for msgs in results]
+        self.assertEqual(echoed, list(range(5)))
+
     async def test_services_singleton_shared_across_apis(self):
         class DummyService:
             def __init__(self, *, id: str):
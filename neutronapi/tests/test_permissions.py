@@ -0,0 +1,179 @@
+import asyncio
+import unittest
+
+from neutronapi.api import exceptions
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.permissions import BasePermission, permissions_allow
+from neutronapi.throttling import BaseThrottle
+
+
+async def call_asgi(app, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+class CountingPermission(BasePermission):
+    created = 0
+
+    def __init__(self):
+        type(self).created += 1
+
+    async def has_permission(self, scope, user):
+        return True
+
+
+class SingletonPermission(CountingPermission):
+    created = 0
+    lifecycle = "singleton"
+
+
+class PlainPermission:
+    created = 0
+
+    def __init__(self):
+        type(self).created += 1
+
+    async def has_permission(self, scope, user):
+        return True
+
+
+class RequestPermission(CountingPermission):
+    created = 0
+
+
+class SingletonThrottle(BaseThrottle):
+    created = 0
+    lifecycle = "singleton"
+
+    def __init__(self):
+        type(self).created += 1
+
+    async def allow_request(self, scope):
+        return True
+
+
+class LifecycleAPI(API):
+    name = "lifecycle"
+    resource = ""
+
+    @API.endpoint(
+        "/check",
+        methods=["GET"],
+        name="check",
+        permission_classes=[SingletonPermission, RequestPermission, PlainPermission],
+        throttle_classes=[SingletonThrottle],
+    )
+    async def check(self, scope, receive, send, **kwargs):
+        return await self.response({"ok": True})
+
+
+class TestLifecycle(unittest.IsolatedAsyncioTestCase):
+    async def test_singletons_are_built_once_per_route(self):
+        app = Application(apis=[LifecycleAPI()])
+        singleton_before = SingletonPermission.created
+        request_before = RequestPermission.created
+        plain_before = PlainPermission.created
+        throttle_before = SingletonThrottle.created
+
+        for _ in range(3):
+            self.assertEqual(await call_asgi(app, "/check"), 200)
+
+        self.assertEqual(SingletonPermission.created, singleton_before)
+        self.assertEqual(SingletonThrottle.created, throttle_before)
+        self.assertEqual(RequestPermission.created, request_before + 3)
+        self.assertEqual(PlainPermission.created, plain_before + 3)
+
+    def test_invalid_lifecycle_rejected_at_registration(self):
+        class Broken(CountingPermission):
+            lifecycle = "forever"
+
+        class BrokenAPI(API):
+            name = "broken"
+            resource = ""
+
+            @API.endpoint("/x", methods=["GET"], name="x", permission_classes=[Broken])
+            async def x(self, scope, receive, send, **kwargs):
+                return await self.response({})
+
+        with self.assertRaises(ValueError):
+            BrokenAPI()
+
+
+class TestConcurrentPermissions(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_permissions_run_together(self):
+        first_started = asyncio.Event()
+        second_started = asyncio.Event()
+
+        class First(BasePermission):
+            concurrent = True
+
+            async def has_permission(self, scope, user):
+                first_started.set()
+                await asyncio.wait_for(second_started.wait(), 1)
+                return True
+
+        class Second(BasePermission):
+            concurrent = True
+
+            async def has_permission(self, scope, user):
+                second_started.set()
+                await asyncio.wait_for(first_started.wait(), 1)
+                return True
+
+        self.assertTrue(await permissions_allow({}, [First(), Second()]))
+
+    async def test_first_denial_cancels_remaining_checks(self):
+        cancelled = asyncio.Event()
+
+        class Slow(BasePermission):
+            concurrent = True
+
+            async def has_permission(self, scope, user):
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return True
+
+        class Deny(BasePermission):
+            concurrent = True
+
+            async def has_permission(self, scope, user):
+                return False
+
+        self.assertFalse(await permissions_allow({}, [Slow(), Deny()]))
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    async def test_sequential_denial_skips_later_checks(self):
+        calls = []
+
+        class Deny(BasePermission):
+            async def has_permission(self, scope, user):
+                calls.append("deny")
+                return False
+
+        class Later(BasePermission):
+            concurrent = True
+
+            async def has_permission(self, scope, user):
+                calls.append("later")
+                return True
+
+        with self.assertRaises(exceptions.PermissionDenied):
+            await API.check_permissions({}, [Deny(), Later()])
+        self.assertEqual(calls, ["deny"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,15 @@ class PingAPI(API):
         return await self.response({"ok": True, "request_id": scope.get("request_id")})
 
 
+class EchoAPI(API):
+    name = "echo"
+    resource = ""
+
+    @API.endpoint("/echo", methods=["POST"])
+    async def echo(self, scope, receive, send, **kwargs):
+        return await self.response(kwargs["body"])
+
+
 class TestRequestLogging(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         logging.getLogger("neutronapi").handlers.clear()
@@ -79,3 +88,41 @@ class TestRequestLogging(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(events["request.completed"]["path"], "/ping")
         self.assertEqual(events["request.completed"]["status"], 200)
         self.assertEqual(events["request.completed"]["idempotency_key"], "idem_123")
+
+    async def test_server_timing_is_off_by_default(self):
+        app = Application(apis=[PingAPI()])
+        messages = await call_asgi(
+            app,
+            {"type": "http", "method": "GET", "path": "/ping", "headers": []},
+        )
+
+        self.assertNotIn(b"server-timing", dict(messages[0]["headers"]))
+
+    async def test_server_timing_header_and_event_phases(self):
+        buf = StringIO()
+        configure_logging(level="INFO", fmt="json", stream=buf)
+
+        app = Application(apis=[EchoAPI()], server_timing=True)
+        messages = await call_asgi(
+            app,
+            {
+                "type": "http",
+                "method": "POST",
+                "path": "/echo",
+                "headers": [(b"content-type", b"application/json")],
+            },
+            body=b'{"a": 1}',
+        )
+
+        header = dict(messages[0]["headers"])[b"server-timing"].decode()
+        names = [entry.split(";", 1)[0] for entry in header.split(", ")]
+        self.assertEqual(
+            names,
+            ["middleware", "routing", "permissions", "body", "parse", "handler", "serialize", "total"],
+        )
+        self.assertRegex(header, r"^middleware;dur=\d+\.\d{3}, ")
+
+        output = [json.loads(line) for line in buf.getvalue().splitlines() if line.strip()]
+        completed = next(entry for entry in output if entry["event"] == "request.completed")
+        self.assertEqual(list(completed["phases"]), names[:-1])
+        self.assertTrue(all(value >= 0 for value in completed["phases"].values()))
@@ -0,0 +1,131 @@
+import unittest
+from unittest import mock
+
+from neutronapi.application import Application
+from neutronapi.base import API, JSON_RENDER_SCOPE_KEY, Response
+from neutronapi.encoders import json_loads
+
+
+async def render(response, scope=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await response(scope or {"type": "http", "query_string": b""}, receive, send)
+    return messages
+
+
+class RenderAPI(API):
+    name = "render"
+    resource = "/render"
+
+    @API.endpoint("/", methods=["GET"], name="default")
+    async def default(self, scope, receive, send, **kwargs):
+        return await self.response({"b": 1, "a": 2})
+
+    @API.endpoint("/pretty", methods=["GET"], name="pretty", json_render="pretty")
+    async def pretty(self, scope, receive, send, **kwargs):
+        return await self.response({"b": 1, "a": 2})
+
+    @API.endpoint("/compact", methods=["GET"], name="compact", json_render="compact")
+    async def compact(self, scope, receive, send, **kwargs):
+        return await self.response({"b": 1, "a": 2})
+
+
+async def get(app, path, query=b""):
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []}
+    return await render(app, scope)
+
+
+class TestResponseRendering(unittest.IsolatedAsyncioTestCase):
+    async def test_compact_by_default_with_content_length(self):
+        start, body = await render(Response({"b": 1, "a": 2}))
+
+        self.assertEqual(body["body"], b'{"b":1,"a":2}')
+        self.assertIn((b"content-length", b"13"), start["headers"])
+
+    async def test_pretty_query_parameter(self):
+        scope = {"type": "http", "query_string": b"pretty=1"}
+        start, body = await render(Response({"b": 1, "a": 2}), scope)
+
+        self.assertEqual(body["body"], b'{\n  "a": 2,\n  "b": 1\n}')
+        self.assertIn((b"content-length", str(len(body["body"])).encode()), start["headers"])
+
+    async def test_debug_enables_pretty_output(self):
+        with mock.patch("neutronapi.base.settings") as settings:
+            settings.get.return_value = True
+            _, body = await render(Response({"a": 1}))
+
+        self.assertEqual(body["body"], b'{\n  "a": 1\n}')
+
+    async def test_compact_mode_ignores_pretty_query(self):
+        scope = {"type": "http", "query_string": b"pretty=1", JSON_RENDER_SCOPE_KEY: "compact"}
+        _, body = await render(Response({"a": 1}), scope)
+
+        self.assertEqual(body["body"], b'{"a":1}')
+
+    async def test_explicit_pretty_argument_wins(self):
+        scope = {"type": "http", "query_string": b"", JSON_RENDER_SCOPE_KEY: "pretty"}
+        _, body = await render(Response({"a": 1}, pretty=False), scope)
+
+        self.assertEqual(body["body"], b'{"a":1}')
+
+    async def test_preserialized_bytes_sent_verbatim(self):
+        payload = b'{"cached": true}'
+        start, body = await render(Response(payload))
+
+        self.assertIs(body["body"], payload)
+        self.assertIn((b"content-length", b"16"), start["headers"])
+
+    async def test_existing_content_length_is_kept(self):
+        response = Response(b"abc", headers=[(b"content-length", b"3")])
+        start, _ = await render(response)
+
+        self.assertEqual(
+            [value for name, value in start["headers"] if name == b"content-length"],
+            [b"3"],
+        )
+
+    async def test_bodiless_statuses_have_no_content_length(self):
+        for status in (101, 204, 304):
+            start, body = await render(Response(None, status_code=status))
+            self.assertFalse(any(name == b"content-length" for name, _ in start["headers"]))
+            self.assertEqual(body["body"], b"")
+
+
+class TestRenderModes(unittest.IsolatedAsyncioTestCase):
+    async def test_endpoint_modes(self):
+        app = Application(apis=[RenderAPI()])
+
+        _, body = await get(app, "/render/pretty")
+        self.assertEqual(body["body"], b'{\n  "a": 2,\n  "b": 1\n}')
+
+        _, body = await get(app, "/render/compact", b"pretty=1")
+        self.assertEqual(body["body"], b'{"b":1,"a":2}')
+
+        _, body = await get(app, "/render", b"pretty=true")
+        self.assertEqual(json_loads(body["body"]), {"a": 2, "b": 1})
+        self.assertIn(b"\n", body["body"])
+
+    async def test_application_mode_with_endpoint_override(self):
+        app = Application(apis=[RenderAPI()], json_render="pretty")
+
+        _, body = await get(app, "/render")
+        self.assertIn(b"\n", body["body"])
+
+        _, body = await get(app, "/render/compact")
+        self.assertEqual(body["body"], b'{"b":1,"a":2}')
+
+    def test_invalid_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            Application(apis=[RenderAPI()], json_render="fancy")
+        with self.assertRaises(ValueError):
+            API.endpoint("/x", json_render="fancy")
+
+
+if __name__ == "__main__":
+    unittest.main()
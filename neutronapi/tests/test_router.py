@@ -0,0 +1,166 @@
+import unittest
+
+from neutronapi.api import exceptions
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.router import RouteTree
+
+
+class ItemsAPI(API):
+    name = "items"
+    resource = "/v1/items"
+
+    @API.endpoint("/", methods=["GET"], name="list")
+    async def list_items(self, scope, receive, send, **kwargs):
+        return await self.response({"route": "list"})
+
+    @API.endpoint("/latest", methods=["GET"], name="latest")
+    async def latest(self, scope, receive, send, **kwargs):
+        return await self.response({"route": "latest"})
+
+    @API.endpoint("/<int:item_id>", methods=["GET", "DELETE"], name="detail")
+    async def detail(self, scope, receive, send, **kwargs):
+        return await self.response({"route": "detail"})
+
+    @API.endpoint("/<slug:item_slug>", methods=["GET"], name="by_slug")
+    async def by_slug(self, scope, receive, send, **kwargs):
+        return await self.response({"route": "slug"})
+
+    @API.endpoint("/files/<path:file_path>/meta", methods=["POST"], name="file_meta")
+    async def file_meta(self, scope, receive, send, **kwargs):
+        return await self.response({"route": "file_meta"})
+
+    @API.endpoint("/files/<path:file_path>", methods=["GET"], name="file")
+    async def file(self, scope, receive, send, **kwargs):
+        return await self.response({"route": "file"})
+
+    @API.websocket("/<str:room>/live")
+    async def live(self, scope, receive, send, **kwargs):
+        pass
+
+
+class TestRouteTree(unittest.TestCase):
+    def test_static_routes_win_over_parameters(self):
+        tree = RouteTree()
+        tree.insert("/items/<str:name>", ["GET"], "dynamic")
+        tree.insert("/items/latest", ["GET"], "static")
+
+        self.assertEqual(tree.lookup("/items/latest", "GET"), ("static", {}, True))
+        self.assertEqual(
+            tree.lookup("/items/other", "GET"),
+            ("dynamic", {"name": "other"}, True),
+        )
+
+    def test_method_mismatch_reports_matched_path(self):
+        tree = RouteTree()
+        tree.insert("/items", ["GET"], "list")
+
+        self.assertEqual(tree.lookup("/items", "POST"), (None, {}, True))
+        self.assertEqual(tree.lookup("/missing", "GET"), (None, {}, False))
+
+    def test_falls_back_to_parameter_branch_for_method(self):
+        tree = RouteTree()
+        tree.insert("/items/latest", ["GET"], "static")
+        tree.insert("/items/<str:name>", ["DELETE"], "dynamic")
+
+        route, params, _ = tree.lookup("/items/latest", "DELETE")
+        self.assertEqual(route, "dynamic")
+        self.assertEqual(params, {"name": "latest"})
+
+    def test_unsupported_converter_rejected(self):
+        tree = RouteTree()
+        with self.assertRaises(ValueError):
+            tree.insert("/items/<uuid:item_id>", ["GET"], "detail")
+
+
+class TestAPIMatch(unittest.IsolatedAsyncioTestCase):
+    async def test_converters(self):
+        api = ItemsAPI()
+
+        handler, kwargs, *_ = await api.match("/v1/items/42", "GET")
+        self.assertEqual(handler.__name__, "detail")
+        self.assertEqual(kwargs, {"item_id": "42"})
+
+        handler, kwargs, *_ = await api.match("/v1/items/my-item", "GET")
+        self.assertEqual(handler.__name__, "by_slug")
+        self.assertEqual(kwargs, {"item_slug": "my-item"})
+
+        handler, _, *_ = await api.match("/v1/items/latest", "GET")
+        self.assertEqual(handler.__name__, "latest")
+
+    async def test_path_converter_backtracks(self):
+        api = ItemsAPI()
+
+        handler, kwargs, *_ = await api.match("/v1/items/files/a/b/meta", "GET")
+        self.assertEqual(handler.__name__, "file")
+        self.assertEqual(kwargs, {"file_path": "a/b/meta"})
+
+        handler, kwargs, *_ = await api.match("/v1/items/files/a/b/meta", "POST")
+        self.assertEqual(handler.__name__, "file_meta")
+        self.assertEqual(kwargs, {"file_path": "a/b"})
+
+    async def test_not_found_and_method_not_allowed(self):
+        api = ItemsAPI()
+
+        with self.assertRaises(exceptions.MethodNotAllowed):
+            await api.match("/v1/items/42", "POST")
+        with self.assertRaises(exceptions.NotFound):
+            await api.match("/v1/items/a/b", "GET")
+
+    async def test_websocket_pseudo_method(self):
+        api = ItemsAPI()
+
+        handler, kwargs, *_ = await api.match("/v1/items/lobby/live", "WEBSOCKET")
+        self.assertEqual(handler.__name__, "live")
+        self.assertEqual(kwargs, {"room": "lobby"})
+        with self.assertRaises(exceptions.MethodNotAllowed):
+            await api.match("/v1/items/lobby/live", "GET")
+
+
+class RootAPI(API):
+    name = "root"
+    resource = ""
+
+    @API.endpoint("/v1/items/<int:item_id>", methods=["GET"], name="detail")
+    async def detail(self, scope, receive, send, **kwargs):
+        return await self.response({"api": "root"})
+
+
+class TenantAPI(API):
+    name = "tenant"
+    resource = "/v1/items"
+    hosts = ["*.tenant.example.com"]
+    excluded_path_prefixes = ["/v1/items/private"]
+
+    @API.endpoint("/<int:item_id>", methods=["GET"], name="detail")
+    async def detail(self, scope, receive, send, **kwargs):
+        return await self.response({"api": "tenant"})
+
+
+class TestApplicationSelection(unittest.TestCase):
+    def setUp(self):
+        self.items = ItemsAPI()
+        self.root = RootAPI()
+        self.tenant = TenantAPI()
+        self.app = Application(apis=[self.root, self.items, self.tenant])
+
+    def _select(self, path, host=""):
+        return self.app._select_api(path, host)
+
+    def test_exact_resource_beats_earlier_prefix(self):
+        self.assertIs(self._select("/v1/items"), self.items)
+        # Deeper paths resolve to the first registered prefix match.
+        self.assertIs(self._select("/v1/items/1"), self.root)
+
+    def test_host_scoped_apis_take_over_matching_hosts(self):
+        self.assertIs(self._select("/v1/items/1", "acme.tenant.example.com"), self.tenant)
+        self.assertIsNone(self._select("/other", "acme.tenant.example.com"))
+
+    def test_excluded_prefixes_are_skipped(self):
+        self.assertIsNone(
+            self._select("/v1/items/private/1", "acme.tenant.example.com")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import datetime
+import enum
+import unittest
+from decimal import Decimal
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.db.fields import (
+    BinaryField,
+    BooleanField,
+    CharField,
+    DateTimeField,
+    DecimalField,
+    EnumField,
+    IntegerField,
+    JSONField,
+)
+from neutronapi.db.models import Model
+from neutronapi.encoders import json_loads
+from neutronapi.serializers import ModelSerializer, fields_from_schema, serialize_models
+
+
+class Status(enum.Enum):
+    ACTIVE = "active"
+    ARCHIVED = "archived"
+
+
+class Product(Model):
+    id = CharField(primary_key=True)
+    name = CharField(null=True)
+    stock = IntegerField(default=0)
+    price = DecimalField(null=True)
+    featured = BooleanField(default=False)
+    status = EnumField(Status, null=True)
+    created = DateTimeField(null=True)
+    meta = JSONField(null=True)
+    blob = BinaryField(null=True)
+
+
+def make_product(pk="p1", **kwargs):
+    values = {
+        "id": pk,
+        "name": "Widget \"XL\"",
+        "stock": 3,
+        "price": Decimal("9.90"),
+        "featured": True,
+        "status": Status.ACTIVE,
+        "created": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        "meta": {"tags": ["a"], "weight": 1.5},
+        "blob": b"\x00\x01",
+    }
+    values.update(kwargs)
+    return Product(**values)
+
+
+class TestModelSerializer(unittest.TestCase):
+    def test_all_field_types(self):
+        encoded = ModelSerializer(Product).dumps(make_product())
+
+        self.assertEqual(
+            json_loads(encoded),
+            {
+                "id": "p1",
+                "name": "Widget \"XL\"",
+                "stock": 3,
+                "price": "9.90",
+                "featured": True,
+                "status": "active",
+                "created": "2024-01-02T03:04:05+00:00",
+                "meta": {"tags": ["a"], "weight": 1.5},
+                "blob": "AAE=",
+            },
+        )
+
+    def test_field_selection_and_nulls(self):
+        serializer = ModelSerializer(Product, ["stock", "id", "price"])
+        encoded = serializer.dumps(make_product(price=None))
+
+        self.assertEqual(encoded, b'{"stock":3,"id":"p1","price":null}')
+
+    def test_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            ModelSerializer(Product, ["id", "missing"])
+        self.assertEqual(ModelSerializer(Product, ["id", "missing"], strict=False).fields, ("id",))
+
+    def test_lists(self):
+        products = [make_product("p1"), make_product("p2")]
+
+        encoded = serialize_models(products, ["id"])
+
+        self.assertEqual(encoded, b'[{"id":"p1"},{"id":"p2"}]')
+
+    def test_json_lines(self):
+        serializer = ModelSerializer(Product, ["id", "price"])
+        encoded = serializer.dumps_lines([make_product("p1"), make_product("p2", price=None)])
+
+        self.assertEqual(encoded, b'{"id":"p1","price":"9.90"}\n{"id":"p2","price":null}\n')
+        self.assertEqual(serializer.dumps_lines([]), b"")
+
+    def test_fields_from_schema(self):
+        item = {"type": "object", "properties": {"id": {}, "name": {}}}
+        self.assertEqual(fields_from_schema(item), ("id", "name"))
+        self.assertEqual(fields_from_schema({"type": "array", "items": item}), ("id", "name"))
+        self.assertIsNone(fields_from_schema({"type": "object"}))
+
+
+class ProductsAPI(API):
+    name = "products"
+    resource = "/products"
+
+    @API.endpoint("/", methods=["GET"], name="list", response_fields=["id", "stock"])
+    async def list_products(self, scope, receive, send, **kwargs):
+        return await self.response([make_product("p1"), make_product("p2")])
+
+    @API.endpoint(
+        "/<str:pk>",
+        methods=["GET"],
+        name="detail",
+        response_schema={
+            "type": "object",
+            "properties": {"id": {"type": "string"}, "name": {"type": "string"}, "url": {}},
+        },
+    )
+    async def detail(self, scope, receive, send, **kwargs):
+        return await self.response(make_product(kwargs["pk"]))
+
+    @API.endpoint("/<str:pk>/raw", methods=["GET"], name="raw")
+    async def raw(self, scope, receive, send, **kwargs):
+        return await self.response(make_product(kwargs["pk"]), fields=["id"])
+
+
+async def get(app, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+    await app(scope, receive, send)
+    return messages[1]["body"]
+
+
+class TestModelResponses(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.app = Application(apis=[ProductsAPI()])
+
+    async def test_endpoint_response_fields(self):
+        body = await get(self.app, "/products")
+        self.assertEqual(body, b'[{"id":"p1","stock":3},{"id":"p2","stock":3}]')
+
+    async def test_response_schema_projection(self):
+        body = await get(self.app, "/products/p9")
+        self.assertEqual(body, b'{"id":"p9","name":"Widget \\"XL\\""}')
+
+    async def test_explicit_fields(self):
+        body = await get(self.app, "/products/p9/raw")
+        self.assertEqual(body, b'{"id":"p9"}')
+
+
+if __name__ == "__main__":
+    unittest.main()
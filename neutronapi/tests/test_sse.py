@@ -0,0 +1,171 @@
+import asyncio
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.event_bus import EventBus
+from neutronapi.events import RequestReceived
+from neutronapi.sse import (
+    PING,
+    Broadcast,
+    EventSourceResponse,
+    ServerSentEvent,
+    encode_event,
+    last_event_id,
+)
+
+feed = Broadcast(history=10, max_queue=2)
+
+
+class FeedAPI(API):
+    name = "feed"
+    resource = "/feed"
+
+    @API.endpoint("/", methods=["GET"], name="events", response_body_mode="streamed")
+    async def events(self, scope, receive, send, **kwargs):
+        return EventSourceResponse(feed.subscribe(last_event_id(scope)), ping_interval=None)
+
+
+async def drain(response):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await response({"type": "http"}, receive, send)
+    return messages[0], b"".join(m.get("body", b"") for m in messages[1:])
+
+
+class TestEncoding(unittest.TestCase):
+    def test_encode_event_fields_and_multiline_data(self):
+        self.assertEqual(
+            encode_event("a\nb", event="note", id=7, retry=1000),
+            b"id: 7\nevent: note\nretry: 1000\ndata: a\ndata: b\n\n",
+        )
+        self.assertEqual(encode_event({"x": 1}), b'data: {"x":1}\n\n')
+        self.assertEqual(ServerSentEvent("").encode(), b"data: \n\n")
+        with self.assertRaises(ValueError):
+            encode_event("x", event="a\nb")
+
+
+class TestEventSourceResponse(unittest.IsolatedAsyncioTestCase):
+    async def test_items_are_framed_and_headers_set(self):
+        async def content():
+            yield {"n": 1}
+            yield ServerSentEvent("hi", event="greet")
+            yield b"data: raw\n\n"
+
+        start, body = await drain(EventSourceResponse(content(), headers={"cache-control": "no-store"}))
+
+        headers = dict(start["headers"])
+        self.assertEqual(headers[b"content-type"], b"text/event-stream")
+        self.assertEqual(headers[b"cache-control"], b"no-store")
+        self.assertEqual(body, b'data: {"n":1}\n\nevent: greet\ndata: hi\n\ndata: raw\n\n')
+
+    async def test_idle_stream_sends_heartbeats(self):
+        async def content():
+            await asyncio.sleep(0.05)
+            yield "late"
+
+        _, body = await drain(EventSourceResponse(content(), ping_interval=0.01))
+
+        self.assertTrue(body.startswith(PING))
+        self.assertTrue(body.endswith(b"data: late\n\n"))
+
+    async def test_subscription_heartbeats_without_events(self):
+        broadcast = Broadcast()
+        subscription = broadcast.subscribe()
+        response = EventSourceResponse(subscription, ping_interval=0.01)
+        task = asyncio.ensure_future(drain(response))
+        await asyncio.sleep(0.035)
+        subscription.close()
+        _, body = await task
+
+        self.assertGreaterEqual(body.count(PING), 2)
+        self.assertEqual(len(broadcast), 0)
+
+
+class TestBroadcast(unittest.IsolatedAsyncioTestCase):
+    async def test_events_are_encoded_once_and_shared(self):
+        broadcast = Broadcast()
+        first, second = broadcast.subscribe(), broadcast.subscribe()
+
+        chunk = broadcast.publish({"price": 10}, event="tick")
+
+        self.assertEqual(chunk, b'id: 1\nevent: tick\ndata: {"price":10}\n\n')
+        self.assertIs(await first.get(), chunk)
+        self.assertIs(await second.get(), chunk)
+
+    async def test_slow_subscriber_is_evicted(self):
+        broadcast = Broadcast(max_queue=2)
+        slow, fast = broadcast.subscribe(), broadcast.subscribe()
+        for n in range(2):
+            broadcast.publish(n)
+            await fast.get()
+        broadcast.publish(2)
+
+        self.assertTrue(slow.evicted)
+        self.assertFalse(fast.evicted)
+        self.assertEqual(len(broadcast), 1)
+        self.assertEqual([chunk async for chunk in slow], [])
+
+    async def test_resume_from_last_event_id(self):
+        broadcast = Broadcast(history=3)
+        for n in range(5):
+            broadcast.publish(n)
+
+        resumed = broadcast.subscribe("3")
+        self.assertEqual(await resumed.get(), b"id: 4\ndata: 3\n\n")
+        self.assertEqual(await resumed.get(), b"id: 5\ndata: 4\n\n")
+        self.assertIsNone(await resumed.get(timeout=0))
+        # Ids that fell out of history replay nothing.
+        self.assertIsNone(await broadcast.subscribe("1").get(timeout=0))
+
+    async def test_relay_from_event_bus(self):
+        bus = EventBus()
+        broadcast = Broadcast()
+        subscription = broadcast.subscribe()
+        relay = asyncio.ensure_future(broadcast.relay(bus.subscribe("request.*")))
+        try:
+            await bus.emit(RequestReceived(request_id="req_1", method="GET", path="/"))
+            chunk = await asyncio.wait_for(subscription.get(), 1)
+        finally:
+            relay.cancel()
+
+        self.assertTrue(chunk.startswith(b"id: 1\nevent: request.received\ndata: {"))
+        self.assertIn(b'"request_id":"req_1"', chunk)
+
+    async def test_endpoint_resumes_with_last_event_id_header(self):
+        app = Application(apis=[FeedAPI()])
+        for n in range(3):
+            feed.publish(n, id=f"e{n}")
+        messages = []
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message.get("body"):
+                disconnected.set()
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/feed",
+            "headers": [(b"last-event-id", b"e1")],
+        }
+        await asyncio.wait_for(app(scope, receive, send), 1)
+
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertEqual(messages[1]["body"], b"id: e2\ndata: 2\n\n")
+        self.assertEqual(len(feed), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
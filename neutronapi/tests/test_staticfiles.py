@@ -0,0 +1,137 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from neutronapi.application import Application
+from neutronapi.staticfiles import IMMUTABLE_CACHE_CONTROL, StaticFiles
+
+
+async def call(app, path, method="GET", headers=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": headers or []}
+    await app(scope, receive, send)
+    headers = dict(messages[0]["headers"])
+    return messages[0]["status"], headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def write(root, name, data):
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+class TestStaticFiles(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.script = b"console.log('hi');\n" * 50
+        write(self.root, "app.js", self.script)
+        write(self.root, "app.js.gz", gzip.compress(self.script))
+        write(self.root, "app.js.br", b"not really brotli")
+        write(self.root, "assets/site.3f2a9c1b.css", b"body{}")
+        write(self.root, "docs/index.html", b"<h1>docs</h1>")
+        write(self.root, "big.bin", b"x" * 5000)
+        write(self.root, ".env", b"SECRET=1")
+
+    async def test_serves_indexed_files_only(self):
+        static = StaticFiles(self.root, html=True)
+
+        status, headers, body = await call(static, "/docs/")
+        self.assertEqual((status, body), (200, b"<h1>docs</h1>"))
+        self.assertEqual(headers[b"content-type"], b"text/html; charset=utf-8")
+
+        for path in ("/.env", "/../etc/passwd", "/missing.js", "/app.js.gz"):
+            status, _, _ = await call(static, path)
+            self.assertEqual(status, 404, path)
+
+        status, headers, _ = await call(static, "/app.js", method="POST")
+        self.assertEqual((status, headers[b"allow"]), (405, b"GET, HEAD"))
+
+    async def test_symlinks_must_resolve_inside_the_directory(self):
+        outside = tempfile.TemporaryDirectory()
+        self.addCleanup(outside.cleanup)
+        write(outside.name, "secret.txt", b"secret")
+        os.symlink(os.path.join(outside.name, "secret.txt"), os.path.join(self.root, "leak.txt"))
+        os.symlink(os.path.join(self.root, "app.js"), os.path.join(self.root, "alias.js"))
+        static = StaticFiles(self.root)
+
+        status, _, _ = await call(static, "/leak.txt")
+        self.assertEqual(status, 404)
+        status, _, body = await call(static, "/alias.js")
+        self.assertEqual((status, body), (200, self.script))
+
+    async def test_precompressed_variants_follow_accept_encoding(self):
+        static = StaticFiles(self.root)
+
+        status, headers, body = await call(static, "/app.js", headers=[(b"accept-encoding", b"gzip")])
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(headers[b"vary"], b"Accept-Encoding")
+        self.assertEqual(gzip.decompress(body), self.script)
+
+        _, headers, body = await call(static, "/app.js", headers=[(b"accept-encoding", b"gzip, br")])
+        self.assertEqual((headers[b"content-encoding"], body), (b"br", b"not really brotli"))
+
+        _, headers, body = await call(static, "/app.js")
+        self.assertNotIn(b"content-encoding", headers)
+        self.assertEqual(body, self.script)
+
+    async def test_hot_cache_and_conditional_requests(self):
+        static = StaticFiles(self.root, max_cached_file_size=1024, cache_control="no-cache")
+
+        _, headers, _ = await call(static, "/assets/site.3f2a9c1b.css")
+        self.assertEqual(headers[b"cache-control"], IMMUTABLE_CACHE_CONTROL.encode())
+        self.assertEqual(len(static.cache), 1)
+
+        # The cached copy is served even after the file changes on disk.
+        write(self.root, "assets/site.3f2a9c1b.css", b"body{color:red}")
+        _, _, body = await call(static, "/assets/site.3f2a9c1b.css")
+        self.assertEqual(body, b"body{}")
+
+        status, _, body = await call(
+            static, "/assets/site.3f2a9c1b.css", headers=[(b"if-none-match", headers[b"etag"])]
+        )
+        self.assertEqual((status, body), (304, b""))
+
+        _, headers, body = await call(static, "/big.bin")
+        self.assertEqual((headers[b"cache-control"], len(body)), (b"no-cache", 5000))
+        self.assertEqual(len(static.cache), 1)
+
+        status, headers, body = await call(static, "/big.bin", headers=[(b"range", b"bytes=0-9")])
+        self.assertEqual((status, body), (206, b"x" * 10))
+
+        static.reload()
+        self.assertEqual(len(static.cache), 0)
+
+    def test_cache_is_bounded_by_bytes(self):
+        static = StaticFiles(self.root, cache_max_bytes=10)
+        static.cache.set("a", b"12345")
+        static.cache.set("b", b"12345")
+        static.cache.get("a")
+        static.cache.set("c", b"123")
+        self.assertEqual((static.cache.get("b"), static.cache.size), (None, 8))
+
+    async def test_static_hosts_and_prefix(self):
+        static = StaticFiles(self.root, prefix="/static")
+        app = Application(apis=[], static_hosts=["cdn.example.com"], static_resolver=static)
+        await app.on_startup[0]()
+
+        status, _, body = await call(
+            app, "/static/assets/site.3f2a9c1b.css", headers=[(b"host", b"cdn.example.com")]
+        )
+        self.assertEqual((status, body), (200, b"body{}"))
+        status, _, _ = await call(app, "/assets/site.3f2a9c1b.css", headers=[(b"host", b"cdn.example.com")])
+        self.assertEqual(status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
+import asyncio
 import json
 import unittest
 
+from neutronapi.api import exceptions
 from neutronapi.base import API
-from neutronapi.responses import StreamingResponse
+from neutronapi.parsers import NDJSONParser
+from neutronapi.responses import FLUSH, StreamingResponse
+from neutronapi.streams import AsyncByteStream
 
 
 async def call_api(api, scope, body_chunks=None):
@@ -165,3 +169,337 @@ class StreamingTests(unittest.IsolatedAsyncioTestCase):
         )
 
         self.assertEqual(messages[0]["status"], 413)
+
+
+def idle_receive():
+    """A receive that, like a server, blocks after the request body until disconnect."""
+    disconnected = asyncio.Event()
+    delivered = False
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    return receive, disconnected
+
+
+class CoalescingTests(unittest.IsolatedAsyncioTestCase):
+    async def run_response(self, response, send=None):
+        messages = []
+        receive, _ = idle_receive()
+
+        async def record(message):
+            messages.append(message)
+
+        await response({"type": "http"}, receive, send or record)
+        return [(m["body"], m["more_body"]) for m in messages[1:]]
+
+    async def test_small_chunks_are_coalesced_by_size(self):
+        async def rows():
+            for i in range(10):
+                yield f"{i},row\n"
+
+        body = await self.run_response(StreamingResponse(rows(), buffer_size=24))
+
+        self.assertEqual(
+            body,
+            [(b"0,row\n1,row\n2,row\n3,row\n", True), (b"4,row\n5,row\n6,row\n7,row\n", True), (b"8,row\n9,row\n", False)],
+        )
+
+    async def test_flush_sends_pending_bytes(self):
+        async def chunks():
+            yield b"a"
+            yield FLUSH
+            yield b"b"
+            yield FLUSH
+            yield FLUSH
+
+        self.assertEqual(
+            await self.run_response(StreamingResponse(chunks(), buffer_size=1024)),
+            [(b"a", True), (b"b", True), (b"", False)],
+        )
+        # Without coalescing the marker is simply skipped.
+        self.assertEqual(
+            await self.run_response(StreamingResponse(chunks())),
+            [(b"a", True), (b"b", True), (b"", False)],
+        )
+
+    async def test_pending_bytes_are_flushed_while_body_is_idle(self):
+        release = asyncio.Event()
+        sent = []
+
+        async def chunks():
+            yield b"early"
+            await release.wait()
+            yield b"late"
+
+        async def send(message):
+            sent.append(message)
+            if message.get("body") == b"early":
+                release.set()
+
+        await self.run_response(StreamingResponse(chunks(), buffer_size=1024, flush_interval=0.01), send)
+
+        self.assertEqual([m.get("body") for m in sent[1:]], [b"early", b"late"])
+
+    async def test_slow_client_holds_back_the_body(self):
+        produced = 0
+        release = asyncio.Event()
+
+        async def chunks():
+            nonlocal produced
+            for _ in range(100):
+                produced += 1
+                yield b"x" * 10
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                await release.wait()
+
+        task = asyncio.ensure_future(
+            self.run_response(StreamingResponse(chunks(), buffer_size=30, flush_interval=1), send)
+        )
+        await asyncio.sleep(0.01)
+        # One message worth of chunks plus at most one read ahead.
+        self.assertLessEqual(produced, 4)
+        release.set()
+        await task
+        self.assertEqual(produced, 100)
+
+    async def test_disconnect_cancels_the_body(self):
+        receive, disconnected = idle_receive()
+        closed = asyncio.Event()
+
+        async def forever():
+            try:
+                while True:
+                    yield b"tick"
+                    await asyncio.sleep(0)
+            finally:
+                closed.set()
+
+        async def send(message):
+            if message.get("body") == b"tick":
+                disconnected.set()
+
+        response = StreamingResponse(forever())
+        await asyncio.wait_for(response({"type": "http"}, receive, send), 1)
+
+        self.assertTrue(closed.is_set())
+
+    def test_invalid_settings(self):
+        async def chunks():
+            yield b""
+
+        with self.assertRaises(ValueError):
+            StreamingResponse(chunks(), flush_interval=0.1)
+        with self.assertRaises(ValueError):
+            StreamingResponse(chunks(), buffer_size=-1)
+
+
+def make_receive(chunks):
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    return receive
+
+
+class ReadBodyTests(unittest.IsolatedAsyncioTestCase):
+    async def test_single_message_body_is_returned_without_copy(self):
+        chunk = b'{"value": 1}'
+        stream = AsyncByteStream(make_receive([chunk]), content_length=len(chunk))
+        self.assertIs(await stream.read_body(), chunk)
+
+    async def test_declared_length_preallocates_buffer(self):
+        stream = AsyncByteStream(make_receive([b"ab", b"cd", b"ef"]), content_length=6)
+        body = await stream.read_body()
+        self.assertIsInstance(body, bytearray)
+        self.assertEqual(body, b"abcdef")
+
+    async def test_body_shorter_or_longer_than_declared(self):
+        short = AsyncByteStream(make_receive([b"ab", b"c"]), content_length=6)
+        self.assertEqual(await short.read_body(), b"abc")
+        long = AsyncByteStream(make_receive([b"ab", b"cdef"]), content_length=3)
+        self.assertEqual(await long.read_body(), b"abcdef")
+
+    async def test_chunked_body_is_joined_once(self):
+        stream = AsyncByteStream(make_receive([b"ab", b"cd"]))
+        self.assertEqual(await stream.read_body(), b"abcd")
+
+    async def test_declared_length_over_limit_rejected_before_reading(self):
+        async def receive():
+            raise AssertionError("body must not be read")
+
+        with self.assertRaises(exceptions.APIException) as ctx:
+            AsyncByteStream(receive, content_length=11, max_bytes=10)
+        self.assertEqual(ctx.exception.status_code, 413)
+
+    async def test_buffered_route_rejects_oversized_content_length(self):
+        class LimitedAPI(API):
+            resource = "/v1/limited"
+
+            @API.endpoint("/", methods=["POST"], max_request_body_bytes=3)
+            async def post(self, scope, receive, send, **kwargs):
+                return await self.response({"ok": True})
+
+        messages = await call_api(
+            LimitedAPI(),
+            {
+                "type": "http",
+                "method": "POST",
+                "path": "/v1/limited",
+                "query_string": b"",
+                "headers": [(b"content-length", b"4")],
+            },
+            body_chunks=[b"ab", b"cd"],
+        )
+
+        self.assertEqual(messages[0]["status"], 413)
+
+
+class JSONLinesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_lines_are_split_across_chunk_boundaries(self):
+        stream = AsyncByteStream(make_receive([b"one\r\ntw", b"o", b"\n\nthr", b"ee"]))
+        self.assertEqual([line async for line in stream.iter_lines()], [b"one", b"two", b"", b"three"])
+
+    async def test_overlong_line_is_rejected(self):
+        stream = AsyncByteStream(make_receive([b"abc", b"def", b"ghi\n"]))
+        with self.assertRaises(exceptions.APIException) as ctx:
+            [line async for line in stream.iter_lines(max_line_size=5)]
+        self.assertEqual(ctx.exception.status_code, 413)
+
+    async def test_records_are_batched(self):
+        body = b"".join(b'{"n": %d}\n' % n for n in range(5))
+        stream = AsyncByteStream(make_receive([body[:7], body[7:30], body[30:]]))
+        batches = [batch async for batch in stream.iter_json_batches(2)]
+        self.assertEqual([[row["n"] for row in batch] for batch in batches], [[0, 1], [2, 3], [4]])
+
+    async def test_bad_records_are_reported_by_line(self):
+        body = [b'{"n": 1}\n{"n": \n\n{"n": 3}\n']
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            [record async for record in AsyncByteStream(make_receive(body)).iter_json()]
+        self.assertEqual(ctx.exception.errors[0]["field"], "line 2")
+
+        skipped = []
+        stream = AsyncByteStream(make_receive(body))
+        records = [record async for record in stream.iter_json(on_error=lambda n, line, error: skipped.append(n))]
+        self.assertEqual(records, [{"n": 1}, {"n": 3}])
+        self.assertEqual(skipped, [2])
+
+    async def test_streaming_response_can_consume_the_request_body(self):
+        body = [b'{"n": %d}\n' % n for n in range(5)]
+        messages = [
+            {"type": "http.request", "body": chunk, "more_body": index < len(body) - 1}
+            for index, chunk in enumerate(body)
+        ]
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await asyncio.sleep(0)
+            if messages:
+                return messages.pop(0)
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def echo(records):
+            async for record in records:
+                yield b"%d," % record["n"]
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        response = StreamingResponse(echo(AsyncByteStream(receive).iter_json()))
+        await response({"type": "http"}, receive, send)
+        disconnect.set()
+
+        self.assertEqual(b"".join(m.get("body", b"") for m in sent[1:]), b"0,1,2,3,4,")
+
+    async def test_buffered_endpoint_gets_a_list_of_records(self):
+        class IngestAPI(API):
+            resource = "/v1/ingest"
+
+            @API.endpoint("/", methods=["POST"], parsers=[NDJSONParser()])
+            async def post(self, scope, receive, send, **kwargs):
+                return await self.response({"count": len(kwargs["body"])})
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/v1/ingest",
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        }
+        messages = await call_api(IngestAPI(), scope, body_chunks=[b'{"a": 1}\n{"a": 2}\n'])
+        self.assertEqual(json.loads(messages[1]["body"]), {"count": 2})
+
+        messages = await call_api(IngestAPI(), scope, body_chunks=[b'{"a": 1}\nnope\n'])
+        self.assertEqual(messages[0]["status"], 400)
+        self.assertEqual(json.loads(messages[1]["body"])["error"]["errors"][0]["field"], "line 2")
+
+
+class LazyBodyTests(unittest.IsolatedAsyncioTestCase):
+    def _scope(self, path):
+        return {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/json")],
+        }
+
+    async def test_lazy_body_parses_once_on_first_await(self):
+        class LazyAPI(API):
+            resource = "/v1/lazy"
+
+            @API.endpoint("/", methods=["POST"], request_body_mode="lazy")
+            async def post(self, scope, receive, send, **kwargs):
+                body = kwargs["body"]
+                first = await body
+                second = await body
+                return await self.response(
+                    {"value": first["value"], "same": first is second}
+                )
+
+        messages = await call_api(
+            LazyAPI(),
+            self._scope("/v1/lazy"),
+            body_chunks=[b'{"val', b'ue": 7}'],
+        )
+
+        payload = json.loads(messages[1]["body"].decode("utf-8"))
+        self.assertEqual(payload, {"value": 7, "same": True})
+
+    async def test_lazy_body_never_read_when_handler_rejects_early(self):
+        received = []
+
+        async def receive():
+            received.append(True)
+            return {"type": "http.request", "body": b"not json", "more_body": False}
+
+        class LazyAPI(API):
+            resource = "/v1/lazy"
+
+            @API.endpoint("/", methods=["POST"], request_body_mode="lazy")
+            async def post(self, scope, receive, send, **kwargs):
+                raise exceptions.PermissionDenied()
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await LazyAPI().handle(self._scope("/v1/lazy"), receive, send)
+
+        self.assertEqual(messages[0]["status"], 403)
+        self.assertEqual(received, [])
@@ -0,0 +1,236 @@
+import unittest
+
+from neutronapi.api import exceptions
+from neutronapi.application import Application
+from neutronapi.base import API
+from neutronapi.encoders import json_dumps_bytes, json_loads
+from neutronapi.validation import compile_schema
+
+USER_SCHEMA = {
+    "type": "object",
+    "required": ["name", "age"],
+    "additionalProperties": False,
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 20},
+        "age": {"type": "integer", "minimum": 0, "maximum": 150},
+        "role": {"enum": ["admin", "member"]},
+        "email": {"type": "string", "pattern": "^[^@]+@[^@]+$", "nullable": True},
+        "tags": {
+            "type": "array",
+            "maxItems": 3,
+            "uniqueItems": True,
+            "items": {"type": "string"},
+        },
+        "address": {
+            "type": "object",
+            "required": ["city"],
+            "properties": {"city": {"type": "string"}, "zip": {"type": ["string", "integer"]}},
+        },
+        "score": {"type": "number", "exclusiveMinimum": 0, "multipleOf": 0.5},
+    },
+}
+
+
+class TestCompileSchema(unittest.TestCase):
+    def setUp(self):
+        self.validate = compile_schema(USER_SCHEMA)
+
+    def errors_for(self, body):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            self.validate(body)
+        return {(error["field"], error["code"]) for error in ctx.exception.errors}
+
+    def test_valid_body(self):
+        self.validate(
+            {
+                "name": "Ada",
+                "age": 36,
+                "role": "admin",
+                "email": None,
+                "tags": ["a", "b"],
+                "address": {"city": "London", "zip": 12345},
+                "score": 1.5,
+            }
+        )
+
+    def test_required_and_unexpected_fields(self):
+        self.assertEqual(
+            self.errors_for({"nickname": "x"}),
+            {("name", "required"), ("age", "required"), ("nickname", "unexpected")},
+        )
+
+    def test_scalar_constraints(self):
+        self.assertEqual(
+            self.errors_for(
+                {
+                    "name": "",
+                    "age": 200,
+                    "role": "owner",
+                    "email": "nope",
+                    "score": 0,
+                }
+            ),
+            {
+                ("name", "min_length"),
+                ("age", "maximum"),
+                ("role", "enum"),
+                ("email", "pattern"),
+                ("score", "minimum"),
+            },
+        )
+
+    def test_types_are_strict(self):
+        self.assertEqual(
+            self.errors_for({"name": 1, "age": True, "score": "1"}),
+            {("name", "invalid_type"), ("age", "invalid_type"), ("score", "invalid_type")},
+        )
+        self.assertEqual(self.errors_for([]), {("", "invalid_type")})
+
+    def test_nested_paths(self):
+        self.assertEqual(
+            self.errors_for(
+                {
+                    "name": "Ada",
+                    "age": 1,
+                    "tags": ["a", 2, "a", "b"],
+                    "address": {"zip": 1.5},
+                }
+            ),
+            {
+                ("tags", "max_items"),
+                ("tags[1]", "invalid_type"),
+                ("tags", "unique_items"),
+                ("address.city", "required"),
+                ("address.zip", "invalid_type"),
+            },
+        )
+
+    def test_multiple_of_tolerates_float_representation(self):
+        validate = compile_schema({"type": "number", "multipleOf": 0.1})
+        for value in (0.3, 0.7, 1.1, 3, 0):
+            validate(value)
+        with self.assertRaises(exceptions.ValidationError):
+            validate(0.35)
+
+    def test_booleans_do_not_equal_numbers(self):
+        with self.assertRaises(exceptions.ValidationError):
+            compile_schema({"enum": [1, 2]})(True)
+        with self.assertRaises(exceptions.ValidationError):
+            compile_schema({"const": 0})(False)
+        compile_schema({"enum": [1, True]})(1.0)
+        compile_schema({"type": "array", "uniqueItems": True})([1, True, 0, False, [1], [True]])
+        with self.assertRaises(exceptions.ValidationError):
+            compile_schema({"type": "array", "uniqueItems": True})([{"a": 1}, {"a": 1.0}])
+
+    def test_error_payload(self):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            self.validate({"name": "Ada"})
+
+        body = ctx.exception.to_dict()["error"]
+        self.assertEqual(body["type"], "validation_error")
+        self.assertEqual(body["message"], "Invalid request body. age: This field is required")
+        self.assertEqual(
+            body["errors"],
+            [{"field": "age", "code": "required", "message": "This field is required"}],
+        )
+
+    def test_unchecked_keywords_accept_anything(self):
+        validate = compile_schema({"type": "object", "properties": {"x": {"$ref": "#/x"}}})
+        validate({"x": object()})
+
+    def test_unknown_type_is_not_checked(self):
+        with self.assertLogs("neutronapi.validation", "WARNING"):
+            validate = compile_schema(
+                {"type": "object", "properties": {"upload": {"type": "file-upload"}}}
+            )
+        validate({"upload": b"raw"})
+        validate({"upload": 1})
+
+    def test_docs_only_types_do_not_break_api_construction(self):
+        class UploadAPI(API):
+            name = "upload"
+            resource = "/upload"
+
+            @API.endpoint("/", methods=["POST"], name="upload", request_schema={"type": "file"})
+            async def upload(self, scope, receive, send, **kwargs):
+                return await self.response({})
+
+        with self.assertLogs("neutronapi.validation", "WARNING"):
+            UploadAPI()
+
+
+class UsersAPI(API):
+    name = "users"
+    resource = "/users"
+
+    @API.endpoint("/", methods=["POST"], name="create", request_schema=USER_SCHEMA)
+    async def create(self, scope, receive, send, **kwargs):
+        return await self.response({"created": kwargs["body"]["name"]})
+
+    @API.endpoint(
+        "/lazy",
+        methods=["POST"],
+        name="create_lazy",
+        request_schema=USER_SCHEMA,
+        request_body_mode="lazy",
+    )
+    async def create_lazy(self, scope, receive, send, **kwargs):
+        body = await kwargs["body"]
+        return await self.response({"created": body["name"]})
+
+    @API.endpoint(
+        "/docs-only",
+        methods=["POST"],
+        name="docs_only",
+        request_schema=USER_SCHEMA,
+        validate_request=False,
+    )
+    async def docs_only(self, scope, receive, send, **kwargs):
+        return await self.response({"ok": True})
+
+
+async def post(app, path, payload):
+    messages = []
+    body = json_dumps_bytes(payload)
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"], json_loads(messages[1]["body"])
+
+
+class TestEndpointValidation(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.app = Application(apis=[UsersAPI()])
+
+    async def test_valid_body_reaches_handler(self):
+        status, body = await post(self.app, "/users", {"name": "Ada", "age": 36})
+        self.assertEqual((status, body), (200, {"created": "Ada"}))
+
+    async def test_invalid_body_rejected_before_handler(self):
+        status, body = await post(self.app, "/users", {"name": "Ada"})
+        self.assertEqual(status, 400)
+        self.assertEqual(body["error"]["errors"][0]["field"], "age")
+
+    async def test_lazy_body_validated_on_await(self):
+        status, _ = await post(self.app, "/users/lazy", {"age": 3})
+        self.assertEqual(status, 400)
+
+    async def test_validation_can_be_disabled(self):
+        status, _ = await post(self.app, "/users/docs-only", {})
+        self.assertEqual(status, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,23 @@ import time
 from collections import defaultdict
 from typing import Dict, List, Optional, Tuple
 
+from neutronapi.permissions import PER_REQUEST
+
 
 class BaseThrottle(abc.ABC):
     """Abstract throttle that endpoint throttle classes must implement.
 
     Subclasses own their own configuration (rate, window, backend, etc.).
     The framework calls allow_request(scope) per request — no rate argument.
+
+    Throttles report wait() and get_headers() for the request they just
+    checked, so they are instantiated per request by default. Subclasses
+    that keep no per-request state can set ``lifecycle = "singleton"`` to be
+    built once per route.
     """
 
+    lifecycle: str = PER_REQUEST
+
     @abc.abstractmethod
     async def allow_request(self, scope: dict) -> bool:
         """Return True if the request should be allowed, False to throttle."""
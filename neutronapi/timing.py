@@ -0,0 +1,55 @@
+"""Opt-in per-request phase timing.
+
+When enabled (``Application(server_timing=True)``), ``RequestLoggingMiddleware``
+puts a ``PhaseTimer`` in the scope. ``API.handle``, the endpoint app and
+``Response`` call ``mark()`` at each phase boundary; each mark charges the
+time since the previous one to the named phase. The breakdown is sent as a
+``Server-Timing`` header and attached to ``RequestCompleted.phases``.
+
+When disabled the scope holds no timer and each phase boundary costs a single
+``is not None`` check.
+"""
+
+from __future__ import annotations
+
+from time import perf_counter_ns
+from typing import Any, Dict, Optional
+
+TIMING_SCOPE_KEY = "_neutronapi_timing"
+
+
+class PhaseTimer:
+    """Accumulate nanoseconds per named phase between successive marks."""
+
+    __slots__ = ("started", "last", "phases")
+
+    def __init__(self) -> None:
+        self.started = self.last = perf_counter_ns()
+        self.phases: Dict[str, int] = {}
+
+    def mark(self, phase: str) -> None:
+        """Charge the time since the previous mark to ``phase``."""
+        now = perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last
+        self.last = now
+
+    def total_ns(self) -> int:
+        return perf_counter_ns() - self.started
+
+    def as_ms(self) -> Dict[str, float]:
+        """Phase durations in milliseconds, in the order phases first ran."""
+        return {phase: round(ns / 1_000_000, 3) for phase, ns in self.phases.items()}
+
+    def header_value(self) -> str:
+        """Render the phases plus ``total`` as a ``Server-Timing`` value."""
+        parts = [f"{phase};dur={ns / 1_000_000:.3f}" for phase, ns in self.phases.items()]
+        parts.append(f"total;dur={self.total_ns() / 1_000_000:.3f}")
+        return ", ".join(parts)
+
+
+def get_timer(scope: Dict[str, Any]) -> Optional[PhaseTimer]:
+    """Return the request's timer, or None when timing is disabled."""
+    return scope.get(TIMING_SCOPE_KEY)
+
+
+__all__ = ["PhaseTimer", "TIMING_SCOPE_KEY", "get_timer"]
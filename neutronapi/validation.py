@@ -0,0 +1,380 @@
+"""Compile JSON schemas into request body validators.
+
+``compile_schema`` walks a schema once and returns a closure specialised to
+it: keyword lookups, regex compilation and type dispatch all happen at
+compile time, so validating a body is a chain of direct checks.
+
+Supported keywords: ``type`` (including lists of types and OpenAPI
+``nullable``), ``enum``, ``const``, ``required``, ``properties``,
+``additionalProperties``, ``minProperties``/``maxProperties``,
+``minLength``/``maxLength``, ``pattern``, ``minimum``/``maximum``,
+``exclusiveMinimum``/``exclusiveMaximum``, ``multipleOf``, ``items``,
+``minItems``/``maxItems``, ``uniqueItems`` and ``allOf``. Subschemas using
+``$ref``, ``anyOf``, ``oneOf`` or ``not`` are accepted without checks, and
+annotation keywords such as ``format`` or ``description`` are ignored. A
+``type`` outside JSON Schema (``file`` in docs-only schemas, for example) is
+not checked; a warning is logged once per type name.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional
+
+from neutronapi.api import exceptions
+
+ErrorList = List[Dict[str, str]]
+Check = Callable[[Any, str, ErrorList], None]
+
+MAX_REPORTED_ERRORS = 20
+
+_UNCHECKED_KEYWORDS = ("$ref", "anyOf", "oneOf", "not")
+
+logger = logging.getLogger("neutronapi.validation")
+_warned_types: set = set()
+
+
+def _is_integer(value: Any) -> bool:
+    return type(value) is int or (type(value) is float and value.is_integer())
+
+
+def _is_number(value: Any) -> bool:
+    return type(value) is int or type(value) is float
+
+
+def _is_multiple(value: Any, step: Decimal) -> bool:
+    # Compare decimal spellings so 0.3 is a multiple of 0.1 despite float error.
+    try:
+        return Decimal(str(value)) % step == 0
+    except InvalidOperation:
+        return _is_integer(value / float(step))
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    """JSON equality: booleans never equal numbers, 1 equals 1.0."""
+    if type(left) is bool or type(right) is bool:
+        return type(left) is type(right) and left == right
+    if _is_number(left) and _is_number(right):
+        return left == right
+    if type(left) is not type(right):
+        return False
+    if type(left) is list:
+        return len(left) == len(right) and all(map(_json_equal, left, right))
+    if type(left) is dict:
+        return left.keys() == right.keys() and all(_json_equal(left[key], right[key]) for key in left)
+    return left == right
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: type(value) is str,
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda value: type(value) is bool,
+    "object": lambda value: type(value) is dict,
+    "array": lambda value: type(value) is list,
+    "null": lambda value: value is None,
+}
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _error(errors: ErrorList, path: str, code: str, message: str) -> None:
+    errors.append({"field": path, "code": code, "message": message})
+
+
+def _compile_type(schema: Dict[str, Any]) -> Optional[Check]:
+    declared = schema.get("type")
+    if declared is None:
+        return None
+    names = [declared] if isinstance(declared, str) else list(declared)
+    if schema.get("nullable") and "null" not in names:
+        names.append("null")
+    unknown = [name for name in names if name not in _TYPE_CHECKS]
+    if unknown:
+        for name in unknown:
+            if name not in _warned_types:
+                _warned_types.add(name)
+                logger.warning("Schema type %r is not supported; values are not type-checked", name)
+        return None
+    expected = " or ".join(names)
+
+    if len(names) == 1:
+        test = _TYPE_CHECKS[names[0]]
+    else:
+        tests = tuple(_TYPE_CHECKS[name] for name in names)
+
+        def test(value: Any) -> bool:
+            return any(check(value) for check in tests)
+
+    def check_type(value: Any, path: str, errors: ErrorList) -> None:
+        if not test(value):
+            _error(errors, path, "invalid_type", f"Expected {expected}")
+
+    return check_type
+
+
+def _compile_string(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = schema.get("pattern")
+
+    if min_length is not None:
+        def check_min_length(value, path, errors):
+            if type(value) is str and len(value) < min_length:
+                _error(errors, path, "min_length", f"Must be at least {min_length} characters")
+        checks.append(check_min_length)
+
+    if max_length is not None:
+        def check_max_length(value, path, errors):
+            if type(value) is str and len(value) > max_length:
+                _error(errors, path, "max_length", f"Must be at most {max_length} characters")
+        checks.append(check_max_length)
+
+    if pattern is not None:
+        search = re.compile(pattern).search
+
+        def check_pattern(value, path, errors):
+            if type(value) is str and search(value) is None:
+                _error(errors, path, "pattern", f"Must match pattern {pattern!r}")
+        checks.append(check_pattern)
+
+    return checks
+
+
+def _compile_number(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    exclusive_minimum = schema.get("exclusiveMinimum")
+    exclusive_maximum = schema.get("exclusiveMaximum")
+    multiple_of = schema.get("multipleOf")
+
+    # OpenAPI 3.0 spells exclusive bounds as booleans next to minimum/maximum.
+    if exclusive_minimum is True:
+        exclusive_minimum, minimum = minimum, None
+    elif exclusive_minimum is False:
+        exclusive_minimum = None
+    if exclusive_maximum is True:
+        exclusive_maximum, maximum = maximum, None
+    elif exclusive_maximum is False:
+        exclusive_maximum = None
+
+    def bound(limit, code, message, failed):
+        def check_bound(value, path, errors):
+            if _is_number(value) and failed(value, limit):
+                _error(errors, path, code, message)
+        return check_bound
+
+    if minimum is not None:
+        checks.append(bound(minimum, "minimum", f"Must be >= {minimum}", lambda v, lim: v < lim))
+    if maximum is not None:
+        checks.append(bound(maximum, "maximum", f"Must be <= {maximum}", lambda v, lim: v > lim))
+    if exclusive_minimum is not None:
+        checks.append(
+            bound(exclusive_minimum, "minimum", f"Must be > {exclusive_minimum}", lambda v, lim: v <= lim)
+        )
+    if exclusive_maximum is not None:
+        checks.append(
+            bound(exclusive_maximum, "maximum", f"Must be < {exclusive_maximum}", lambda v, lim: v >= lim)
+        )
+    if multiple_of is not None:
+        checks.append(
+            bound(
+                Decimal(str(multiple_of)),
+                "multiple_of",
+                f"Must be a multiple of {multiple_of}",
+                lambda v, step: not _is_multiple(v, step),
+            )
+        )
+    return checks
+
+
+def _compile_object(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    required = tuple(schema.get("required") or ())
+    properties = tuple(
+        (name, _compile_node(subschema))
+        for name, subschema in (schema.get("properties") or {}).items()
+    )
+    properties = tuple((name, check) for name, check in properties if check is not None)
+    additional = schema.get("additionalProperties", True)
+    min_properties = schema.get("minProperties")
+    max_properties = schema.get("maxProperties")
+
+    if required:
+        def check_required(value, path, errors):
+            if type(value) is dict:
+                for name in required:
+                    if name not in value:
+                        _error(errors, _join(path, name), "required", "This field is required")
+        checks.append(check_required)
+
+    if properties:
+        def check_properties(value, path, errors):
+            if type(value) is dict:
+                for name, check in properties:
+                    if name in value:
+                        check(value[name], _join(path, name), errors)
+        checks.append(check_properties)
+
+    if additional is not True:
+        known = frozenset((schema.get("properties") or {}).keys())
+        extra_check = _compile_node(additional) if isinstance(additional, dict) else None
+
+        def check_additional(value, path, errors):
+            if type(value) is not dict:
+                return
+            for name in value:
+                if name in known:
+                    continue
+                if extra_check is not None:
+                    extra_check(value[name], _join(path, name), errors)
+                elif additional is False:
+                    _error(errors, _join(path, name), "unexpected", "Unexpected field")
+        checks.append(check_additional)
+
+    if min_properties is not None or max_properties is not None:
+        def check_size(value, path, errors):
+            if type(value) is not dict:
+                return
+            if min_properties is not None and len(value) < min_properties:
+                _error(errors, path, "min_properties", f"Must have at least {min_properties} fields")
+            if max_properties is not None and len(value) > max_properties:
+                _error(errors, path, "max_properties", f"Must have at most {max_properties} fields")
+        checks.append(check_size)
+
+    return checks
+
+
+def _compile_array(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    items = schema.get("items")
+    item_check = _compile_node(items) if isinstance(items, dict) else None
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    unique = schema.get("uniqueItems", False)
+
+    if min_items is not None or max_items is not None:
+        def check_length(value, path, errors):
+            if type(value) is not list:
+                return
+            if min_items is not None and len(value) < min_items:
+                _error(errors, path, "min_items", f"Must contain at least {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                _error(errors, path, "max_items", f"Must contain at most {max_items} items")
+        checks.append(check_length)
+
+    if item_check is not None:
+        def check_items(value, path, errors):
+            if type(value) is list:
+                for index, item in enumerate(value):
+                    item_check(item, f"{path}[{index}]", errors)
+        checks.append(check_items)
+
+    if unique:
+        def check_unique(value, path, errors):
+            if type(value) is not list:
+                return
+            seen = []
+            for item in value:
+                if any(_json_equal(item, other) for other in seen):
+                    _error(errors, path, "unique_items", "Items must be unique")
+                    return
+                seen.append(item)
+        checks.append(check_unique)
+
+    return checks
+
+
+def _compile_node(schema: Any) -> Optional[Check]:
+    """Compile one schema node; None means the node accepts any value."""
+    if not isinstance(schema, dict) or any(key in schema for key in _UNCHECKED_KEYWORDS):
+        return None
+
+    checks: List[Check] = []
+    type_check = _compile_type(schema)
+    if type_check is not None:
+        checks.append(type_check)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed or not any(_json_equal(value, item) for item in allowed):
+                _error(errors, path, "enum", f"Must be one of {allowed!r}")
+        checks.append(check_enum)
+
+    if "const" in schema:
+        constant = schema["const"]
+
+        def check_const(value, path, errors):
+            if not _json_equal(value, constant):
+                _error(errors, path, "const", f"Must equal {constant!r}")
+        checks.append(check_const)
+
+    checks.extend(_compile_string(schema))
+    checks.extend(_compile_number(schema))
+    checks.extend(_compile_object(schema))
+    checks.extend(_compile_array(schema))
+    for subschema in schema.get("allOf") or ():
+        sub_check = _compile_node(subschema)
+        if sub_check is not None:
+            checks.append(sub_check)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    if type_check is None:
+        checks_tuple = tuple(checks)
+
+        def check_all(value, path, errors):
+            for check in checks_tuple:
+                check(value, path, errors)
+        return check_all
+
+    # Skip value checks once the type is wrong: they would only add noise.
+    rest = tuple(checks[1:])
+
+    def check_typed(value, path, errors):
+        before = len(errors)
+        type_check(value, path, errors)
+        if len(errors) == before:
+            for check in rest:
+                check(value, path, errors)
+    return check_typed
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], None]:
+    """Compile ``schema`` into a validator raising ``ValidationError``.
+
+    Raises:
+        ValueError: If the schema declares an unknown ``type``.
+    """
+    check = _compile_node(schema)
+
+    if check is None:
+        def accept(value: Any) -> None:
+            return None
+        return accept
+
+    def validate(value: Any) -> None:
+        errors: ErrorList = []
+        check(value, "", errors)
+        if errors:
+            first = errors[0]
+            where = f"{first['field']}: " if first["field"] else ""
+            raise exceptions.ValidationError(
+                f"Invalid request body. {where}{first['message']}",
+                errors=errors[:MAX_REPORTED_ERRORS],
+            )
+
+    return validate
+
+
+__all__ = ["compile_schema"]